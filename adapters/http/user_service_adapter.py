@@ -1,6 +1,15 @@
-from typing import Optional, Any, Dict, Union, List
+from typing import Optional, Any, Dict, Union, List, Tuple, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from utils.ttl_cache import TTLCache
+from utils.single_flight import SingleFlight, AsyncSingleFlight
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from adapters.security.session_token_verifier import verify_session_token_locally, TOKEN_VALID, TOKEN_INVALID
+import threading
+import hashlib
+import time
 import logging
 import httpx
 import os
@@ -11,50 +20,488 @@ logger = logging.getLogger(__name__)
 
 USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://localhost:8000")
 
+# Configuración del cliente HTTP compartido con el servicio de usuarios
+USER_SERVICE_TIMEOUT = float(os.getenv("USER_SERVICE_TIMEOUT", "5.0"))
+USER_SERVICE_MAX_CONNECTIONS = int(os.getenv("USER_SERVICE_MAX_CONNECTIONS", "100"))
+USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+USER_SERVICE_KEEPALIVE_EXPIRY = float(os.getenv("USER_SERVICE_KEEPALIVE_EXPIRY", "30.0"))
+USER_SERVICE_HTTP2 = os.getenv("USER_SERVICE_HTTP2", "false").lower() == "true"
+
+# Caché de verificaciones de token de sesión (positivas y negativas)
+SESSION_CACHE_MAX_SIZE = int(os.getenv("SESSION_CACHE_MAX_SIZE", "10000"))
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("SESSION_NEGATIVE_CACHE_TTL_SECONDS", "5"))
+
+# Caché de dispositivos por usuario. Las listas vencidas se conservan DEVICE_CACHE_STALE_TTL_SECONDS
+# más para seguir enviando mientras el servicio de usuarios no responde
+DEVICE_CACHE_MAX_SIZE = int(os.getenv("DEVICE_CACHE_MAX_SIZE", "10000"))
+DEVICE_CACHE_TTL_SECONDS = float(os.getenv("DEVICE_CACHE_TTL_SECONDS", "300"))
+DEVICE_CACHE_STALE_TTL_SECONDS = float(os.getenv("DEVICE_CACHE_STALE_TTL_SECONDS", "3600"))
+
+# Circuit breaker: tras N fallos consecutivos (errores de red o 5xx) se deja de llamar
+# al servicio de usuarios durante el tiempo de enfriamiento
+USER_SERVICE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("USER_SERVICE_CIRCUIT_FAILURE_THRESHOLD", "5"))
+USER_SERVICE_CIRCUIT_RESET_TIMEOUT_SECONDS = float(os.getenv("USER_SERVICE_CIRCUIT_RESET_TIMEOUT_SECONDS", "30"))
+USER_SERVICE_CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("USER_SERVICE_CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# Consulta de dispositivos de muchos usuarios
+DEVICE_BATCH_SIZE = int(os.getenv("DEVICE_BATCH_SIZE", "500"))
+DEVICE_LOOKUP_CONCURRENCY = int(os.getenv("DEVICE_LOOKUP_CONCURRENCY", "10"))
+DEVICE_BATCH_ROUTE_RETRY_SECONDS = float(os.getenv("DEVICE_BATCH_ROUTE_RETRY_SECONDS", "300"))
+
+# Códigos con los que el servicio de usuarios indica que no expone la ruta por lotes
+_BATCH_ROUTE_UNAVAILABLE_STATUSES = (404, 405, 501)
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+# Cliente asíncrono para los endpoints async; se crea dentro del bucle de eventos de la aplicación
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+_session_cache: TTLCache[Dict[str, Any]] = TTLCache(SESSION_CACHE_MAX_SIZE, SESSION_CACHE_TTL_SECONDS)
+_invalid_session_cache: TTLCache[bool] = TTLCache(SESSION_CACHE_MAX_SIZE, SESSION_NEGATIVE_CACHE_TTL_SECONDS)
+
+_device_cache: TTLCache[List[Dict[str, Any]]] = TTLCache(
+    DEVICE_CACHE_MAX_SIZE, DEVICE_CACHE_TTL_SECONDS, stale_ttl=DEVICE_CACHE_STALE_TTL_SECONDS
+)
+
+user_service_circuit = CircuitBreaker(
+    "user-service",
+    failure_threshold=USER_SERVICE_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=USER_SERVICE_CIRCUIT_RESET_TIMEOUT_SECONDS,
+    half_open_max_calls=USER_SERVICE_CIRCUIT_HALF_OPEN_MAX_CALLS
+)
+
+# Mientras sea mayor que el reloj, las consultas por lotes van directo a la ruta por usuario
+_batch_route_unavailable_until = 0.0
+
+# Llamadas concurrentes idénticas comparten una sola solicitud en curso
+_session_flight = SingleFlight()
+_devices_flight = SingleFlight()
+_async_session_flight = AsyncSingleFlight()
+_async_devices_flight = AsyncSingleFlight()
+
+class DeviceLookupError(Exception):
+    """La lista de dispositivos no se pudo obtener y no hay una lista conocida"""
+    pass
+
 class UserResponse(BaseModel):
     user_id: int
     name: str
     email: str
 
+def _http2_enabled() -> bool:
+    """HTTP/2 requiere el paquete opcional h2 (pip install httpx[http2])"""
+    if not USER_SERVICE_HTTP2:
+        return False
+    if find_spec("h2") is None:
+        logger.warning("USER_SERVICE_HTTP2 está activo pero el paquete 'h2' no está instalado; se usará HTTP/1.1")
+        return False
+    return True
+
+def get_http_client() -> httpx.Client:
+    """
+    Retorna el cliente HTTP compartido con el servicio de usuarios, creándolo la primera vez.
+
+    El cliente mantiene un pool de conexiones keep-alive, de modo que las solicitudes
+    reutilizan conexiones TCP/TLS ya abiertas en lugar de establecer una nueva por llamada.
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(**_client_settings())
+    return _http_client
+
+def close_http_client() -> None:
+    """Cierra el cliente HTTP compartido y sus conexiones (se llama al apagar la aplicación)"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+def _client_settings() -> Dict[str, Any]:
+    return {
+        "timeout": USER_SERVICE_TIMEOUT,
+        "limits": httpx.Limits(
+            max_connections=USER_SERVICE_MAX_CONNECTIONS,
+            max_keepalive_connections=USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=USER_SERVICE_KEEPALIVE_EXPIRY
+        ),
+        "http2": _http2_enabled()
+    }
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Retorna el cliente HTTP asíncrono compartido con el servicio de usuarios, creándolo la primera vez.
+    Usa la misma configuración de pool y timeout que el cliente síncrono.
+    """
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(**_client_settings())
+    return _async_http_client
+
+async def close_async_http_client() -> None:
+    """Cierra el cliente HTTP asíncrono compartido (se llama al apagar la aplicación)"""
+    global _async_http_client
+    client, _async_http_client = _async_http_client, None
+    if client is not None:
+        await client.aclose()
+
+def _call_user_service(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Realiza una solicitud al servicio de usuarios a través del circuit breaker.
+
+    Los errores de red y las respuestas 5xx cuentan como fallos; cualquier otra
+    respuesta, incluidas las 4xx, indica que el servicio está disponible.
+
+    Raises:
+        CircuitOpenError: Si el circuito está abierto y la solicitud no se envía.
+    """
+    if not user_service_circuit.allow_request():
+        raise CircuitOpenError("El servicio de usuarios no está disponible (circuito abierto)")
+    try:
+        response = get_http_client().request(method, url, **kwargs)
+    except Exception:
+        user_service_circuit.record_failure()
+        raise
+    _record_response(response)
+    return response
+
+async def _call_user_service_async(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Versión asíncrona de _call_user_service; comparte el mismo circuit breaker"""
+    if not user_service_circuit.allow_request():
+        raise CircuitOpenError("El servicio de usuarios no está disponible (circuito abierto)")
+    try:
+        response = await get_async_http_client().request(method, url, **kwargs)
+    except Exception:
+        user_service_circuit.record_failure()
+        raise
+    _record_response(response)
+    return response
+
+def _record_response(response: httpx.Response) -> None:
+    if response.status_code >= 500:
+        user_service_circuit.record_failure()
+    else:
+        user_service_circuit.record_success()
+
+def get_user_service_circuit_state() -> Dict[str, Any]:
+    """Estado actual del circuit breaker del servicio de usuarios, para monitoreo"""
+    return user_service_circuit.snapshot()
+
+def _session_cache_key(session_token: str) -> str:
+    """Los tokens nunca se guardan en claro: la caché usa su hash SHA-256"""
+    return hashlib.sha256(session_token.encode("utf-8")).hexdigest()
+
+def _fetch_session_user(session_token: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Verifica el token contra el servicio de usuarios.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], bool]: Los datos del usuario (o None) y si la
+        respuesta es definitiva. Los errores de red y 5xx no lo son, para no cachear
+        como inválido un token que podría ser válido.
+    """
+    try:
+        response = _call_user_service("POST", f"{USER_SERVICE_URL}/users-service/session-token-verification", json={"session_token": session_token})
+        return _parse_session_response(response)
+    except CircuitOpenError as e:
+        logger.debug(f"Verificación de token omitida: {e}")
+    except Exception as e:
+        logger.error(f"Error al verificar el token de sesión: {e}")
+    return None, False
+
+async def _fetch_session_user_async(session_token: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Versión asíncrona de _fetch_session_user"""
+    try:
+        response = await _call_user_service_async("POST", f"{USER_SERVICE_URL}/users-service/session-token-verification", json={"session_token": session_token})
+        return _parse_session_response(response)
+    except CircuitOpenError as e:
+        logger.debug(f"Verificación de token omitida: {e}")
+    except Exception as e:
+        logger.error(f"Error al verificar el token de sesión: {e}")
+    return None, False
+
+def _parse_session_response(response: httpx.Response) -> Tuple[Optional[Dict[str, Any]], bool]:
+    if response.status_code == 200:
+        data = response.json()
+        if data.get("status") == "success" and "user" in data.get("data", {}):
+            return data["data"]["user"], True
+    logger.warning(f"Token inválido o error en la verificación: {response.text}")
+    return None, response.status_code < 500
+
+def _store_session_result(cache_key: str, user: Optional[Dict[str, Any]], definitive: bool) -> None:
+    if user:
+        _session_cache.set(cache_key, user)
+    elif definitive:
+        _invalid_session_cache.set(cache_key, True)
+
 def verify_session_token(session_token: str) -> Optional[Union[Dict[str, Any], UserResponse]]:
     """
     Verifica el token de sesión haciendo una solicitud al servicio de usuarios.
     Retorna un diccionario con los datos del usuario si es válido, o None si no lo es.
+
+    Con SESSION_TOKEN_VERIFICATION_MODE=local los tokens firmados se validan en el
+    proceso y solo los tokens opacos o heredados se consultan de forma remota.
+
+    Las verificaciones remotas exitosas se cachean durante SESSION_CACHE_TTL_SECONDS y
+    los tokens rechazados durante SESSION_NEGATIVE_CACHE_TTL_SECONDS.
     """
+    local_result, user = verify_session_token_locally(session_token)
+    if local_result == TOKEN_VALID:
+        return user
+    if local_result == TOKEN_INVALID:
+        return None
+
+    cache_key = _session_cache_key(session_token)
+    user = _session_cache.get(cache_key)
+    if user is not None:
+        return user
+    if cache_key in _invalid_session_cache:
+        return None
+
+    def fetch_and_cache() -> Optional[Dict[str, Any]]:
+        user, definitive = _fetch_session_user(session_token)
+        _store_session_result(cache_key, user, definitive)
+        return user
+
+    return _session_flight.do(cache_key, fetch_and_cache)
+
+async def verify_session_token_async(session_token: str) -> Optional[Union[Dict[str, Any], UserResponse]]:
+    """
+    Versión asíncrona de verify_session_token para los endpoints async.
+    Comparte la verificación local, las cachés y el circuit breaker con la versión síncrona.
+    """
+    local_result, user = verify_session_token_locally(session_token)
+    if local_result == TOKEN_VALID:
+        return user
+    if local_result == TOKEN_INVALID:
+        return None
+
+    cache_key = _session_cache_key(session_token)
+    user = _session_cache.get(cache_key)
+    if user is not None:
+        return user
+    if cache_key in _invalid_session_cache:
+        return None
+
+    async def fetch_and_cache() -> Optional[Dict[str, Any]]:
+        user, definitive = await _fetch_session_user_async(session_token)
+        _store_session_result(cache_key, user, definitive)
+        return user
+
+    return await _async_session_flight.do(cache_key, fetch_and_cache)
+
+def invalidate_session_token(session_token: str) -> None:
+    """Elimina un token de la caché de sesiones (por ejemplo, al cerrar sesión)"""
+    cache_key = _session_cache_key(session_token)
+    _session_cache.delete(cache_key)
+    _invalid_session_cache.delete(cache_key)
+
+def clear_session_cache() -> None:
+    """Vacía por completo la caché de sesiones"""
+    _session_cache.clear()
+    _invalid_session_cache.clear()
+
+def _fetch_user_devices(user_id: int) -> Optional[List[Dict[str, Any]]]:
+    """Consulta los dispositivos del usuario en el servicio de usuarios. Retorna None si la consulta falla."""
     try:
-        with httpx.Client(timeout=5.0) as client:
-            response = client.post(f"{USER_SERVICE_URL}/users-service/session-token-verification", json={"session_token": session_token})
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "success" and "user" in data.get("data", {}):
-                    return data["data"]["user"]
-            logger.warning(f"Token inválido o error en la verificación: {response.text}")
+        response = _call_user_service("GET", f"{USER_SERVICE_URL}/users-service/users/{user_id}/devices")
+        return _parse_devices_response(response, user_id)
+    except CircuitOpenError as e:
+        logger.debug(f"Consulta de dispositivos del usuario {user_id} omitida: {e}")
     except Exception as e:
-        logger.error(f"Error al verificar el token de sesión: {e}")
+        logger.error(f"Error al conectarse al servicio de usuarios para obtener dispositivos: {e}")
+    
+    return None
+
+async def _fetch_user_devices_async(user_id: int) -> Optional[List[Dict[str, Any]]]:
+    """Versión asíncrona de _fetch_user_devices"""
+    try:
+        response = await _call_user_service_async("GET", f"{USER_SERVICE_URL}/users-service/users/{user_id}/devices")
+        return _parse_devices_response(response, user_id)
+    except CircuitOpenError as e:
+        logger.debug(f"Consulta de dispositivos del usuario {user_id} omitida: {e}")
+    except Exception as e:
+        logger.error(f"Error al conectarse al servicio de usuarios para obtener dispositivos: {e}")
+
     return None
 
-def get_user_devices_by_user_id(user_id: int) -> List[Dict[str, Any]]:
+def _parse_devices_response(response: httpx.Response, user_id: int) -> Optional[List[Dict[str, Any]]]:
+    if response.status_code == 200:
+        data = response.json()
+        if data.get("status") == "success" and "data" in data:
+            return data["data"]
+        logger.warning(f"Respuesta inesperada al obtener dispositivos: {response.text}")
+    else:
+        logger.warning(f"Error al obtener dispositivos del usuario {user_id}: {response.status_code} - {response.text}")
+    return None
+
+def _store_devices_result(user_id: int, devices: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Cachea la lista obtenida o, si la consulta falló, recurre a la última lista conocida.
+    Retorna None si la consulta falló y no hay ninguna lista conocida.
+    """
+    if devices is None:
+        stale_devices = _device_cache.get_stale(user_id)
+        if stale_devices is not None:
+            logger.info(f"Usando la lista de dispositivos vencida del usuario {user_id}")
+        return stale_devices
+    _device_cache.set(user_id, devices)
+    return devices
+
+def _devices_or_empty(user_id: int, devices: Optional[List[Dict[str, Any]]], raise_on_error: bool) -> List[Dict[str, Any]]:
+    if devices is not None:
+        return devices
+    if raise_on_error:
+        raise DeviceLookupError(f"No se pudieron obtener los dispositivos del usuario {user_id}")
+    return []
+
+def get_user_devices_by_user_id(user_id: int, raise_on_error: bool = False) -> List[Dict[str, Any]]:
     """
     Obtiene la lista de dispositivos del usuario desde el servicio de usuarios.
+
+    Las listas obtenidas se cachean durante DEVICE_CACHE_TTL_SECONDS y las consultas
+    concurrentes para el mismo usuario comparten una sola solicitud. Si el servicio
+    de usuarios falla o su circuito está abierto, se usa la última lista conocida.
     
     Args:
         user_id (int): ID del usuario
+        raise_on_error (bool): Si la consulta falla y no hay lista conocida, lanza
+            DeviceLookupError en lugar de retornar una lista vacía
         
     Returns:
         List[Dict[str, Any]]: Lista de dispositivos con user_device_id, user_id y fcm_token
     """
+    devices = _device_cache.get(user_id)
+    if devices is not None:
+        return devices
+
+    def fetch_and_cache() -> Optional[List[Dict[str, Any]]]:
+        return _store_devices_result(user_id, _fetch_user_devices(user_id))
+
+    return _devices_or_empty(user_id, _devices_flight.do(user_id, fetch_and_cache), raise_on_error)
+
+async def get_user_devices_by_user_id_async(user_id: int, raise_on_error: bool = False) -> List[Dict[str, Any]]:
+    """
+    Versión asíncrona de get_user_devices_by_user_id.
+    Comparte la caché de dispositivos y el circuit breaker con la versión síncrona.
+    """
+    devices = _device_cache.get(user_id)
+    if devices is not None:
+        return devices
+
+    async def fetch_and_cache() -> Optional[List[Dict[str, Any]]]:
+        return _store_devices_result(user_id, await _fetch_user_devices_async(user_id))
+
+    return _devices_or_empty(user_id, await _async_devices_flight.do(user_id, fetch_and_cache), raise_on_error)
+
+def _group_devices_by_user(data: Any, user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Normaliza la respuesta de la ruta por lotes, que puede ser un objeto
+    {user_id: [dispositivos]} o una lista plana de dispositivos con su user_id.
+    Los usuarios pedidos que no aparecen en la respuesta no tienen dispositivos.
+    """
+    devices_by_user: Dict[int, List[Dict[str, Any]]] = {user_id: [] for user_id in user_ids}
+    if isinstance(data, dict):
+        for user_id, devices in data.items():
+            if int(user_id) in devices_by_user:
+                devices_by_user[int(user_id)] = list(devices or [])
+    else:
+        for device in data:
+            user_id = device.get("user_id")
+            if user_id in devices_by_user:
+                devices_by_user[user_id].append(device)
+    return devices_by_user
+
+def _fetch_devices_batch(user_ids: List[int]) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    """
+    Consulta los dispositivos de varios usuarios en una sola solicitud.
+    Retorna None si la consulta falla o si la ruta por lotes no está disponible.
+    """
+    global _batch_route_unavailable_until
     try:
-        with httpx.Client(timeout=5.0) as client:
-            response = client.get(f"{USER_SERVICE_URL}/users-service/users/{user_id}/devices")
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "success" and "data" in data:
-                    return data["data"]
-                else:
-                    logger.warning(f"Respuesta inesperada al obtener dispositivos: {response.text}")
-            else:
-                logger.warning(f"Error al obtener dispositivos del usuario {user_id}: {response.status_code} - {response.text}")
+        response = _call_user_service("POST", f"{USER_SERVICE_URL}/users-service/users/devices/batch", json={"user_ids": user_ids})
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("status") == "success" and "data" in data:
+                return _group_devices_by_user(data["data"], user_ids)
+            logger.warning(f"Respuesta inesperada al obtener dispositivos por lotes: {response.text}")
+        elif response.status_code in _BATCH_ROUTE_UNAVAILABLE_STATUSES:
+            logger.warning(f"El servicio de usuarios no expone la consulta de dispositivos por lotes ({response.status_code}); se usarán consultas por usuario")
+            _batch_route_unavailable_until = time.monotonic() + DEVICE_BATCH_ROUTE_RETRY_SECONDS
+        else:
+            logger.warning(f"Error al obtener dispositivos por lotes: {response.status_code} - {response.text}")
+    except CircuitOpenError as e:
+        logger.debug(f"Consulta de dispositivos por lotes omitida: {e}")
     except Exception as e:
-        logger.error(f"Error al conectarse al servicio de usuarios para obtener dispositivos: {e}")
-    
-    return [] 
\ No newline at end of file
+        logger.error(f"Error al conectarse al servicio de usuarios para obtener dispositivos por lotes: {e}")
+
+    return None
+
+def _get_devices_per_user(user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Consulta los dispositivos usuario por usuario con concurrencia acotada"""
+    with ThreadPoolExecutor(max_workers=max(1, min(DEVICE_LOOKUP_CONCURRENCY, len(user_ids)))) as executor:
+        return dict(zip(user_ids, executor.map(get_user_devices_by_user_id, user_ids)))
+
+def get_devices_by_user_ids(user_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Obtiene los dispositivos de muchos usuarios.
+
+    Los usuarios con su lista en caché no se consultan. El resto se piden en lotes de
+    DEVICE_BATCH_SIZE a la ruta por lotes del servicio de usuarios; si esa ruta no existe
+    o un lote falla, esos usuarios se consultan uno a uno con hasta
+    DEVICE_LOOKUP_CONCURRENCY solicitudes simultáneas.
+
+    Args:
+        user_ids (Iterable[int]): IDs de los usuarios
+
+    Returns:
+        Dict[int, List[Dict[str, Any]]]: Dispositivos de cada usuario (lista vacía si no tiene)
+    """
+    devices_by_user: Dict[int, List[Dict[str, Any]]] = {}
+    missing: List[int] = []
+    for user_id in dict.fromkeys(user_ids):
+        devices = _device_cache.get(user_id)
+        if devices is None:
+            missing.append(user_id)
+        else:
+            devices_by_user[user_id] = devices
+
+    fallback: List[int] = []
+    for start in range(0, len(missing), max(1, DEVICE_BATCH_SIZE)):
+        chunk = missing[start:start + max(1, DEVICE_BATCH_SIZE)]
+        if _batch_route_unavailable_until > time.monotonic():
+            fallback.extend(chunk)
+            continue
+        batch = _fetch_devices_batch(chunk)
+        if batch is None:
+            fallback.extend(chunk)
+            continue
+        for user_id, devices in batch.items():
+            _device_cache.set(user_id, devices)
+        devices_by_user.update(batch)
+
+    if fallback:
+        devices_by_user.update(_get_devices_per_user(fallback))
+    return devices_by_user
+
+def invalidate_user_devices(user_id: int) -> None:
+    """Elimina de la caché los dispositivos de un usuario (al registrar o eliminar un dispositivo)"""
+    _device_cache.delete(user_id)
+
+def evict_device_tokens(user_id: int, fcm_tokens: Iterable[str]) -> None:
+    """Quita de la lista cacheada de un usuario los tokens que FCM reportó como inválidos"""
+    stale_tokens = set(fcm_tokens)
+    devices = _device_cache.get(user_id)
+    if devices is None or not stale_tokens:
+        return
+    _device_cache.replace(user_id, [device for device in devices if device.get("fcm_token") not in stale_tokens])
+
+def clear_device_cache() -> None:
+    """Vacía por completo la caché de dispositivos y vuelve a probar la ruta por lotes"""
+    global _batch_route_unavailable_until
+    _device_cache.clear()
+    _batch_route_unavailable_until = 0.0
@@ -0,0 +1,211 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import os
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+from models.models import Notifications, NotificationStates, NotificationTypes
+from domain.repositories.notification_repository import AsyncNotificationRepositoryInterface
+from adapters.persistence.notification_repository import (
+    build_notification,
+    build_outbox_entry,
+    bulk_insert_statements,
+    notifications_export_query,
+    delete_by_invitations_statement,
+    group_deleted_by_invitation,
+    update_state_statement,
+    insert_notification_statement,
+    ordered_insert_statement,
+    bulk_update_state_statement,
+    notifications_by_invitations_query,
+    user_feed_rows_query,
+    feed_rows_to_dicts,
+    notification_by_id_query,
+    resolve_invitation_type_id,
+    notification_by_invitation_query,
+)
+from adapters.persistence.reference_data_cache import reference_data
+
+
+# Filas que se traen del cursor del servidor en cada lote al exportar notificaciones
+NOTIFICATION_EXPORT_BATCH_SIZE = int(os.getenv("NOTIFICATION_EXPORT_BATCH_SIZE", "1000"))
+
+
+class AsyncNotificationRepository(AsyncNotificationRepositoryInterface):
+    """Repository for handling notification data persistence on an asyncio session"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_notification_rows_by_user_id(self, user_id: int, limit: int,
+                                               after: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Read-optimized feed: one keyset page of a user's notifications, newest first, as
+        plain dicts straight from a Core projection, without ORM objects.
+        """
+        await reference_data.ensure_fresh_async(self.db)
+        names_cached = reference_data.is_loaded
+        result = await self.db.execute(user_feed_rows_query(user_id, names_cached, limit, after))
+        return feed_rows_to_dicts(result.all(), names_cached)
+
+    async def get_all_notification_states(self) -> List[NotificationStates]:
+        """Get all notification states"""
+        result = await self.db.execute(select(NotificationStates))
+        return list(result.scalars().all())
+
+    async def get_all_notification_types(self) -> List[NotificationTypes]:
+        """Get all notification types"""
+        result = await self.db.execute(select(NotificationTypes))
+        return list(result.scalars().all())
+
+    async def get_all_notifications(self) -> List[Notifications]:
+        """Get all notifications"""
+        # Callers only use the type and state ids
+        result = await self.db.execute(
+            select(Notifications).options(noload(Notifications.notification_type), noload(Notifications.state))
+        )
+        return list(result.scalars().all())
+
+    async def get_notification_by_invitation(self, invitation_id: int) -> Optional[Notifications]:
+        """Get notification by invitation ID"""
+        await reference_data.ensure_fresh_async(self.db)
+        invitation_type_id = resolve_invitation_type_id()
+        if invitation_type_id is None:
+            return None
+        result = await self.db.execute(notification_by_invitation_query(invitation_id, invitation_type_id))
+        return result.scalars().first()
+
+    async def get_notifications_by_invitations(self, invitation_ids: List[int]) -> Dict[int, Optional[int]]:
+        """Look up the notification of many invitations with one query; invitation_id -> notification_id or None"""
+        invitation_ids = list(dict.fromkeys(invitation_ids))
+        notification_ids: Dict[int, Optional[int]] = dict.fromkeys(invitation_ids)
+        if not invitation_ids:
+            return notification_ids
+        await reference_data.ensure_fresh_async(self.db)
+        invitation_type_id = resolve_invitation_type_id()
+        if invitation_type_id is None:
+            return notification_ids
+
+        result = await self.db.execute(notifications_by_invitations_query(invitation_ids, invitation_type_id))
+        notification_ids.update(result.all())
+        return notification_ids
+
+    async def delete_notifications_by_invitation(self, invitation_id: int) -> int:
+        """Delete notifications by invitation ID and return count of deleted notifications"""
+        return len((await self.delete_notifications_by_invitations([invitation_id]))[invitation_id])
+
+    async def delete_notifications_by_invitations(self, invitation_ids: List[int]) -> Dict[int, List[int]]:
+        """Delete the notifications of many invitations with one DELETE ... RETURNING"""
+        invitation_ids = list(dict.fromkeys(invitation_ids))
+        if not invitation_ids:
+            return {}
+        await reference_data.ensure_fresh_async(self.db)
+        invitation_type_id = resolve_invitation_type_id()
+        if invitation_type_id is None:
+            return group_deleted_by_invitation(invitation_ids, [])
+
+        result = await self.db.execute(delete_by_invitations_statement(invitation_ids, invitation_type_id))
+        deleted = group_deleted_by_invitation(invitation_ids, result.all())
+        await self.db.commit()
+        return deleted
+
+    async def update_notification_state(self, notification_id: int, notification_state_id: int) -> Optional[Notifications]:
+        """Update notification state with one UPDATE ... RETURNING; None if the notification does not exist"""
+        result = await self.db.execute(update_state_statement(notification_id, notification_state_id))
+        notification = result.scalars().first()
+        if notification is None:
+            await self.db.rollback()
+            return None
+        await self.db.commit()
+        return notification
+
+    async def update_notifications_state(self, notification_state_id: int, notification_ids: Optional[List[int]] = None,
+                                         user_id: Optional[int] = None, from_state_id: Optional[int] = None) -> List[int]:
+        """Move many notifications to a new state with one UPDATE ... RETURNING; returns the ids that changed"""
+        result = await self.db.execute(
+            bulk_update_state_statement(notification_state_id, notification_ids, user_id, from_state_id)
+        )
+        updated_ids = sorted(result.scalars().all())
+        await self.db.commit()
+        return updated_ids
+
+    async def _reload_notification(self, notification: Notifications) -> Notifications:
+        """Load a just-committed notification with its relationships"""
+        await reference_data.ensure_fresh_async(self.db)
+        result = await self.db.execute(
+            notification_by_id_query(notification.notification_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def create_notification(self, message: str, user_id: int, notification_type_id: int,
+                                  invitation_id: int, notification_state_id: int) -> Notifications:
+        """Create a new notification with a single INSERT ... RETURNING"""
+        await reference_data.ensure_fresh_async(self.db)
+        result = await self.db.execute(insert_notification_statement(
+            message, user_id, notification_type_id, invitation_id, notification_state_id
+        ))
+        new_notification = result.scalars().one()
+        await self.db.commit()
+        if not reference_data.is_loaded:
+            # Without cached names, reload with the relationships joined
+            return await self._reload_notification(new_notification)
+        return new_notification
+
+    async def create_notification_with_outbox(self, message: str, user_id: int, notification_type_id: int,
+                                              invitation_id: int, notification_state_id: int,
+                                              fcm_title: Optional[str], fcm_body: Optional[str],
+                                              fcm_token: Optional[str] = None) -> Notifications:
+        """Create a new notification and its pending FCM delivery in a single transaction"""
+        new_notification = build_notification(
+            message, user_id, notification_type_id, invitation_id, notification_state_id
+        )
+        self.db.add(new_notification)
+        await self.db.flush()  # Assigns notification_id without committing
+
+        self.db.add(build_outbox_entry(new_notification.notification_id, user_id, fcm_title, fcm_body, fcm_token))
+        await self.db.commit()
+
+        return await self._reload_notification(new_notification)
+
+    async def create_notifications_batch(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert notifications with different values (see notification_values) in one statement and one commit; ids in input order"""
+        result = await self.db.execute(ordered_insert_statement(), rows)
+        notification_ids = list(result.scalars().all())
+        await self.db.commit()
+        return notification_ids
+
+    async def create_notifications_bulk(self, message: str, user_ids: List[int], notification_type_id: int,
+                                        invitation_id: int, notification_state_id: int) -> Dict[int, int]:
+        """Create the same notification for many users with multi-row INSERT ... RETURNING in one transaction"""
+        notification_ids: Dict[int, int] = {}
+        statements = bulk_insert_statements(
+            message, user_ids, notification_type_id, invitation_id, notification_state_id
+        )
+        for statement in statements:
+            result = await self.db.execute(statement)
+            for user_id, notification_id in result:
+                notification_ids[user_id] = notification_id
+        await self.db.commit()
+        return notification_ids
+
+    async def get_notification_by_id(self, notification_id: int) -> Optional[Notifications]:
+        """Get notification by ID"""
+        await reference_data.ensure_fresh_async(self.db)
+        result = await self.db.execute(notification_by_id_query(notification_id))
+        return result.scalars().first()
+
+    async def stream_notifications(self, notification_type_id: Optional[int] = None,
+                                   notification_state_id: Optional[int] = None,
+                                   date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream matching notifications through a server-side cursor, NOTIFICATION_EXPORT_BATCH_SIZE rows at a time.
+        Only the current batch is held in memory.
+        """
+        statement = notifications_export_query(
+            notification_type_id, notification_state_id, date_from, date_to
+        ).execution_options(yield_per=NOTIFICATION_EXPORT_BATCH_SIZE)
+        result = await self.db.stream(statement)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
@@ -1,115 +1,308 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Integer, any_, bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import joinedload, noload
 from datetime import datetime
 import pytz
-from models.models import Notifications, NotificationStates, NotificationTypes
-from domain.repositories.notification_repository import NotificationRepositoryInterface
-
-
-class NotificationRepository(NotificationRepositoryInterface):
-    """Repository for handling notification data persistence"""
-    
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def get_notifications_by_user_id(self, user_id: int) -> List[Notifications]:
-        """Get all notifications for a specific user"""
-        return (self.db.query(Notifications)
-                .options(joinedload(Notifications.notification_type), joinedload(Notifications.state))
-                .filter(Notifications.user_id == user_id)
-                .all())
-    
-    def get_all_notification_states(self) -> List[NotificationStates]:
-        """Get all notification states"""
-        return self.db.query(NotificationStates).all()
-    
-    def get_all_notification_types(self) -> List[NotificationTypes]:
-        """Get all notification types"""
-        return self.db.query(NotificationTypes).all()
-    
-    def get_all_notifications(self) -> List[Notifications]:
-        """Get all notifications"""
-        return (self.db.query(Notifications)
-                .options(joinedload(Notifications.notification_type), joinedload(Notifications.state))
-                .all())
-    
-    def get_notification_by_invitation(self, invitation_id: int) -> Optional[Notifications]:
-        """Get notification by invitation ID"""
-        notification_type = self.db.query(NotificationTypes).filter(
-            NotificationTypes.name == "Invitation"
-        ).first()
-        
-        if not notification_type:
-            return None
-            
-        return self.db.query(Notifications).filter(
-            Notifications.notification_type_id == notification_type.notification_type_id,
-            Notifications.invitation_id == invitation_id
-        ).first()
-    
-    def delete_notifications_by_invitation(self, invitation_id: int) -> int:
-        """Delete notifications by invitation ID and return count of deleted notifications"""
-        invitation_notification_type = self.db.query(NotificationTypes).filter(
-            NotificationTypes.name == "Invitation" 
-        ).first()
-
-        if not invitation_notification_type:
-            return 0
-
-        notifications_to_delete = self.db.query(Notifications).filter(
-            Notifications.invitation_id == invitation_id,
-            Notifications.notification_type_id == invitation_notification_type.notification_type_id
-        ).all()
-
-        if not notifications_to_delete:
-            return 0
-
-        deleted_count = 0
-        for notif in notifications_to_delete:
-            self.db.delete(notif)
-            deleted_count += 1
-        
-        self.db.commit()
-        return deleted_count
-    
-    def update_notification_state(self, notification_id: int, notification_state_id: int) -> Optional[Notifications]:
-        """Update notification state and return the updated notification"""
-        notification = self.db.query(Notifications).filter(
-            Notifications.notification_id == notification_id
-        ).first()
-        
-        if not notification:
-            return None
-            
-        notification.notification_state_id = notification_state_id
-        self.db.commit()
-        return notification
-    
-    def create_notification(self, message: str, user_id: int, notification_type_id: int, 
-                          invitation_id: int, notification_state_id: int) -> Notifications:
-        """Create a new notification"""
-        bogota_tz = pytz.timezone("America/Bogota")
-        new_notification = Notifications(
-            message=message,
-            notification_date=datetime.now(bogota_tz),
-            invitation_id=invitation_id,
-            notification_type_id=notification_type_id,
-            notification_state_id=notification_state_id,
-            user_id=user_id
+from models.models import Notifications, NotificationStates, NotificationTypes, NotificationOutbox
+from domain.repositories.outbox_repository import OUTBOX_PENDING
+from adapters.persistence.reference_data_cache import reference_data, INVITATION_TYPE_NAME
+
+
+# Filas por sentencia INSERT multi-fila (PostgreSQL admite hasta 65535 parámetros por sentencia)
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+def notification_values(message: str, user_id: int, notification_type_id: int,
+                        invitation_id: int, notification_state_id: int) -> Dict:
+    """Column values of a new notification stamped with the current Bogota time"""
+    bogota_tz = pytz.timezone("America/Bogota")
+    return {
+        "message": message,
+        "notification_date": datetime.now(bogota_tz),
+        "invitation_id": invitation_id,
+        "notification_type_id": notification_type_id,
+        "notification_state_id": notification_state_id,
+        "user_id": user_id
+    }
+
+
+def build_notification(message: str, user_id: int, notification_type_id: int,
+                       invitation_id: int, notification_state_id: int) -> Notifications:
+    """Build a new notification stamped with the current Bogota time"""
+    return Notifications(**notification_values(
+        message, user_id, notification_type_id, invitation_id, notification_state_id
+    ))
+
+
+def insert_notification_statement(message: str, user_id: int, notification_type_id: int,
+                                  invitation_id: int, notification_state_id: int):
+    """
+    Single INSERT ... RETURNING of a new notification with all its columns. With the
+    reference data cached, type and state are left unloaded (noload) and their names
+    come from memory.
+    """
+    statement = (insert(Notifications)
+                 .values(**notification_values(
+                     message, user_id, notification_type_id, invitation_id, notification_state_id
+                 ))
+                 .returning(Notifications))
+    if reference_data.is_loaded:
+        statement = statement.options(*notification_relation_options())
+    return statement
+
+
+def build_outbox_entry(notification_id: int, user_id: int, fcm_title: Optional[str],
+                       fcm_body: Optional[str], fcm_token: Optional[str]) -> NotificationOutbox:
+    """Build the pending FCM delivery of a notification"""
+    return NotificationOutbox(
+        notification_id=notification_id,
+        user_id=user_id,
+        fcm_title=fcm_title,
+        fcm_body=fcm_body,
+        fcm_token=fcm_token,
+        status=OUTBOX_PENDING,
+        attempts=0
+    )
+
+
+def ordered_insert_statement():
+    """
+    INSERT ... RETURNING notification_id for an executemany of rows with different values.
+    SQLAlchemy sends the rows as one multi-row statement and returns the ids in parameter order.
+    """
+    return insert(Notifications).returning(Notifications.notification_id, sort_by_parameter_order=True)
+
+
+def bulk_insert_statements(message: str, user_ids: List[int], notification_type_id: int,
+                           invitation_id: int, notification_state_id: int):
+    """Yield multi-row INSERT ... RETURNING (user_id, notification_id) statements of BULK_INSERT_CHUNK_SIZE rows"""
+    notification_date = datetime.now(pytz.timezone("America/Bogota"))
+    rows = [
+        {
+            "message": message,
+            "notification_date": notification_date,
+            "invitation_id": invitation_id,
+            "notification_type_id": notification_type_id,
+            "notification_state_id": notification_state_id,
+            "user_id": user_id
+        }
+        for user_id in user_ids
+    ]
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        yield (insert(Notifications)
+               .values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+               .returning(Notifications.user_id, Notifications.notification_id))
+
+
+def notification_relation_options():
+    """
+    Loader options for the type and state of notifications. With the reference data
+    cached their names come from memory, so the lookup tables are not joined.
+    """
+    if reference_data.is_loaded:
+        return (noload(Notifications.notification_type), noload(Notifications.state))
+    return (joinedload(Notifications.notification_type), joinedload(Notifications.state))
+
+
+def notifications_with_relations():
+    """
+    SELECT of notifications whose type and state are either taken from the reference data
+    cache or eagerly joined (lazy loads are not allowed under asyncio)
+    """
+    return select(Notifications).options(*notification_relation_options())
+
+
+def notification_by_id_query(notification_id: int):
+    """A notification with its type and state"""
+    return notifications_with_relations().where(Notifications.notification_id == notification_id)
+
+
+def resolve_invitation_type_id():
+    """
+    Id of the "Invitation" type: a literal from the reference data cache, or a scalar subquery
+    when the cache could not be loaded. None if the type does not exist.
+    """
+    if reference_data.is_loaded:
+        return reference_data.type_id(INVITATION_TYPE_NAME)
+    return (select(NotificationTypes.notification_type_id)
+            .where(NotificationTypes.name == INVITATION_TYPE_NAME)
+            .scalar_subquery())
+
+
+def notification_by_invitation_query(invitation_id: int, invitation_type_id):
+    """The "Invitation" notification of one invitation; the oldest one, like notifications_by_invitations_query"""
+    return (select(Notifications)
+            .where(
+                Notifications.notification_type_id == invitation_type_id,
+                Notifications.invitation_id == invitation_id
+            )
+            .order_by(Notifications.notification_id)
+            .limit(1))
+
+
+def invitation_notifications_filter(invitation_ids: List[int], invitation_type_id):
+    """
+    "Invitation" notifications of the given invitations. The ids go in one array parameter
+    (invitation_id = ANY(:invitation_ids)), so the SQL is the same for any number of ids.
+    """
+    return (
+        Notifications.invitation_id == any_(bindparam("invitation_ids", list(invitation_ids), type_=ARRAY(Integer))),
+        Notifications.notification_type_id == invitation_type_id
+    )
+
+
+def delete_by_invitations_statement(invitation_ids: List[int], invitation_type_id):
+    """
+    Single DELETE of the "Invitation" notifications of the given invitations,
+    RETURNING (invitation_id, notification_id) of every deleted row
+    """
+    return (delete(Notifications)
+            .where(*invitation_notifications_filter(invitation_ids, invitation_type_id))
+            .returning(Notifications.invitation_id, Notifications.notification_id))
+
+
+def notifications_by_invitations_query(invitation_ids: List[int], invitation_type_id):
+    """(invitation_id, notification_id) of the "Invitation" notification of each invitation that has one"""
+    return (select(Notifications.invitation_id, func.min(Notifications.notification_id))
+            .where(*invitation_notifications_filter(invitation_ids, invitation_type_id))
+            .group_by(Notifications.invitation_id))
+
+
+def group_deleted_by_invitation(invitation_ids: List[int], deleted_rows) -> Dict[int, List[int]]:
+    """invitation_id -> deleted notification ids, with an empty list for invitations that had none"""
+    deleted: Dict[int, List[int]] = {invitation_id: [] for invitation_id in invitation_ids}
+    for invitation_id, notification_id in deleted_rows:
+        deleted[invitation_id].append(notification_id)
+    return deleted
+
+
+def update_state_statement(notification_id: int, notification_state_id: int):
+    """Single UPDATE of a notification's state, RETURNING the updated row"""
+    return (update(Notifications)
+            .where(Notifications.notification_id == notification_id)
+            .values(notification_state_id=notification_state_id)
+            .returning(Notifications))
+
+
+def bulk_update_state_statement(notification_state_id: int, notification_ids: Optional[List[int]] = None,
+                                user_id: Optional[int] = None, from_state_id: Optional[int] = None):
+    """
+    Single UPDATE of the state of the notifications selected by id, or by user and optionally
+    by current state. Rows already in the target state are left alone, so RETURNING gives
+    only the ids that actually changed.
+    """
+    if notification_ids is None and user_id is None:
+        raise ValueError("A bulk state update needs notification_ids or user_id")
+    conditions = [Notifications.notification_state_id != notification_state_id]
+    if notification_ids is not None:
+        conditions.append(Notifications.notification_id.in_(notification_ids))
+    if user_id is not None:
+        conditions.append(Notifications.user_id == user_id)
+    if from_state_id is not None:
+        conditions.append(Notifications.notification_state_id == from_state_id)
+    return (update(Notifications)
+            .where(*conditions)
+            .values(notification_state_id=notification_state_id)
+            .returning(Notifications.notification_id))
+
+
+def keyset_page(statement, limit: int, after: Optional[Tuple[datetime, int]] = None):
+    """
+    Newest-first keyset page ordered by (notification_date, notification_id). `after` is the
+    position of the last row of the previous page; the cost does not grow with the offset.
+    """
+    if after is not None:
+        statement = statement.where(
+            tuple_(Notifications.notification_date, Notifications.notification_id) < tuple_(*after)
         )
-        self.db.add(new_notification)
-        self.db.commit()
-        
-        # Refresh to get the relationships loaded
-        self.db.refresh(new_notification)
-        return (self.db.query(Notifications)
-                .options(joinedload(Notifications.notification_type), joinedload(Notifications.state))
-                .filter(Notifications.notification_id == new_notification.notification_id)
-                .first())
-    
-    def get_notification_by_id(self, notification_id: int) -> Optional[Notifications]:
-        """Get notification by ID"""
-        return (self.db.query(Notifications)
-                .options(joinedload(Notifications.notification_type), joinedload(Notifications.state))
-                .filter(Notifications.notification_id == notification_id)
-                .first()) 
\ No newline at end of file
+    return (statement
+            .order_by(Notifications.notification_date.desc(), Notifications.notification_id.desc())
+            .limit(limit))
+
+
+# Columnas del feed que se leen tal cual de notifications
+FEED_COLUMNS = (
+    Notifications.notification_id,
+    Notifications.message,
+    Notifications.notification_date,
+    Notifications.invitation_id,
+)
+
+
+def user_feed_rows_query(user_id: int, names_cached: bool, limit: Optional[int] = None,
+                         after: Optional[Tuple[datetime, int]] = None):
+    """
+    Core projection of a user's feed: only the columns of NotificationResponse, as plain rows.
+    With the reference data cached the type/state ids are selected and named from memory;
+    otherwise the names are joined in. With `limit`, one keyset page; without it (benchmarks only)
+    every notification of the user, unordered.
+    """
+    if names_cached:
+        statement = select(*FEED_COLUMNS, Notifications.notification_type_id, Notifications.notification_state_id)
+    else:
+        statement = (select(*FEED_COLUMNS, NotificationTypes.name, NotificationStates.name)
+                     .outerjoin(NotificationTypes,
+                                Notifications.notification_type_id == NotificationTypes.notification_type_id)
+                     .outerjoin(NotificationStates,
+                                Notifications.notification_state_id == NotificationStates.notification_state_id))
+    statement = statement.where(Notifications.user_id == user_id)
+    if limit is None:
+        return statement
+    return keyset_page(statement, limit, after)
+
+
+def feed_rows_to_dicts(rows, names_cached: bool) -> List[Dict[str, Any]]:
+    """Rows of user_feed_rows_query as NotificationResponse-shaped dicts that orjson serializes as is"""
+    if names_cached:
+        type_name, state_name = reference_data.type_name, reference_data.state_name
+        return [
+            {
+                "notification_id": notification_id,
+                "message": message,
+                "notification_date": notification_date,
+                "invitation_id": invitation_id,
+                "notification_type": type_name(notification_type_id),
+                "notification_state": state_name(notification_state_id),
+            }
+            for notification_id, message, notification_date, invitation_id, notification_type_id, notification_state_id in rows
+        ]
+    return [
+        {
+            "notification_id": notification_id,
+            "message": message,
+            "notification_date": notification_date,
+            "invitation_id": invitation_id,
+            "notification_type": notification_type,
+            "notification_state": notification_state,
+        }
+        for notification_id, message, notification_date, invitation_id, notification_type, notification_state in rows
+    ]
+
+
+def notifications_export_query(notification_type_id: Optional[int] = None,
+                               notification_state_id: Optional[int] = None,
+                               date_from: Optional[datetime] = None,
+                               date_to: Optional[datetime] = None):
+    """
+    Plain-column SELECT of notifications for exports, ordered by notification_id.
+    date_from is inclusive and date_to exclusive. No ORM entities or relationship joins are involved.
+    """
+    statement = select(
+        Notifications.notification_id,
+        Notifications.message,
+        Notifications.notification_date,
+        Notifications.invitation_id,
+        Notifications.notification_type_id,
+        Notifications.notification_state_id,
+        Notifications.user_id
+    )
+    if notification_type_id is not None:
+        statement = statement.where(Notifications.notification_type_id == notification_type_id)
+    if notification_state_id is not None:
+        statement = statement.where(Notifications.notification_state_id == notification_state_id)
+    if date_from is not None:
+        statement = statement.where(Notifications.notification_date >= date_from)
+    if date_to is not None:
+        statement = statement.where(Notifications.notification_date < date_to)
+    return statement.order_by(Notifications.notification_id)
@@ -0,0 +1,88 @@
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from models.models import NotificationOutbox
+from domain.repositories.outbox_repository import (
+    OutboxRepositoryInterface,
+    OUTBOX_PENDING,
+    OUTBOX_DONE,
+    OUTBOX_FAILED,
+)
+
+
+class OutboxRepository(OutboxRepositoryInterface):
+    """Repository for the transactional outbox of FCM deliveries"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def claim_batch(self, limit: int, lease_seconds: float) -> List[NotificationOutbox]:
+        """
+        Lease up to `limit` due entries and commit the claim before they are delivered.
+        
+        The due rows are picked with SELECT ... FOR UPDATE SKIP LOCKED and their available_at
+        is pushed `lease_seconds` ahead in the same UPDATE ... RETURNING, so several dispatchers
+        (threads or replicas) can drain the outbox without double-sending. The row locks only
+        last for that statement: no lock or transaction is held while the pushes are sent.
+        An entry that is not settled before its lease expires (e.g. the dispatcher crashed)
+        becomes due again and is retried.
+        
+        The returned entries are detached; mark_done / mark_failed attach them again.
+        """
+        due = (
+            select(NotificationOutbox.outbox_id)
+            .where(
+                NotificationOutbox.status == OUTBOX_PENDING,
+                NotificationOutbox.available_at <= func.now()
+            )
+            .order_by(NotificationOutbox.outbox_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.outbox_id.in_(due.scalar_subquery()))
+            .values(available_at=func.now() + timedelta(seconds=lease_seconds))
+            .returning(NotificationOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        entries = sorted(self.db.scalars(statement).all(), key=lambda entry: entry.outbox_id)
+        for entry in entries:
+            # Detached objects are not expired by the commit, so they stay readable without a new transaction
+            self.db.expunge(entry)
+        self.db.commit()
+        return entries
+    
+    def mark_done(self, entry: NotificationOutbox, devices_notified: int) -> None:
+        """Mark an entry as delivered"""
+        self.db.add(entry)
+        entry.status = OUTBOX_DONE
+        entry.attempts = (entry.attempts or 0) + 1
+        entry.devices_notified = devices_notified
+        entry.last_error = None
+        entry.processed_at = datetime.now(timezone.utc)
+    
+    def mark_failed(self, entry: NotificationOutbox, error: str, max_attempts: int, retry_delay_seconds: float) -> None:
+        """Record a failed attempt with exponential backoff, giving up after max_attempts"""
+        self.db.add(entry)
+        entry.attempts = (entry.attempts or 0) + 1
+        entry.last_error = error
+        now = datetime.now(timezone.utc)
+        if entry.attempts >= max_attempts:
+            entry.status = OUTBOX_FAILED
+            entry.processed_at = now
+        else:
+            entry.available_at = now + timedelta(seconds=retry_delay_seconds * 2 ** (entry.attempts - 1))
+    
+    def commit(self) -> None:
+        self.db.commit()
+    
+    def rollback(self) -> None:
+        self.db.rollback()
+    
+    def get_by_notification_id(self, notification_id: int) -> Optional[NotificationOutbox]:
+        """Get the outbox entry of a notification"""
+        return self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.notification_id == notification_id
+        ).first()
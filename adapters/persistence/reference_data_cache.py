@@ -0,0 +1,171 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import NotificationStates, NotificationTypes
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto se vuelven a leer los tipos y estados de notificación
+REFERENCE_DATA_REFRESH_SECONDS = float(os.getenv("REFERENCE_DATA_REFRESH_SECONDS", "300"))
+# Espera antes de reintentar una recarga fallida
+REFERENCE_DATA_RETRY_SECONDS = float(os.getenv("REFERENCE_DATA_RETRY_SECONDS", "30"))
+# Tiempo máximo que el arranque espera la precarga antes de seguir sin ella
+REFERENCE_DATA_PRELOAD_TIMEOUT_SECONDS = float(os.getenv("REFERENCE_DATA_PRELOAD_TIMEOUT_SECONDS", "5"))
+
+INVITATION_TYPE_NAME = "Invitation"
+
+
+def _types_query():
+    return select(NotificationTypes.notification_type_id, NotificationTypes.name)
+
+
+def _states_query():
+    return select(NotificationStates.notification_state_id, NotificationStates.name)
+
+
+class ReferenceDataCache:
+    """
+    Process-wide copy of the notification types and states lookup tables.
+
+    Both tables are tiny and almost never change, so repositories resolve
+    id <-> name from memory instead of querying or joining them. The data is
+    reloaded every `refresh_interval` seconds by the next repository call that
+    notices it is stale, or explicitly with refresh()/refresh_async(). A failed
+    reload keeps the previous data and is retried after `retry_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = REFERENCE_DATA_REFRESH_SECONDS,
+        retry_interval: float = REFERENCE_DATA_RETRY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._type_names: Dict[int, str] = {}
+        self._type_ids: Dict[str, int] = {}
+        self._state_names: Dict[int, str] = {}
+        self._state_ids: Dict[str, int] = {}
+        self._loaded = False
+        self._next_refresh_at = 0.0
+        self._refreshing = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def is_stale(self) -> bool:
+        return self._clock() >= self._next_refresh_at
+
+    def load(self, types: Iterable[Tuple[int, str]], states: Iterable[Tuple[int, str]]) -> None:
+        """Replace the cached data with (id, name) pairs"""
+        type_names = {type_id: name for type_id, name in types}
+        state_names = {state_id: name for state_id, name in states}
+        with self._lock:
+            self._type_names = type_names
+            self._type_ids = {name: type_id for type_id, name in type_names.items()}
+            self._state_names = state_names
+            self._state_ids = {name: state_id for state_id, name in state_names.items()}
+            self._loaded = True
+            self._next_refresh_at = self._clock() + self.refresh_interval
+        logger.info(f"Datos de referencia cargados: {len(type_names)} tipos y {len(state_names)} estados de notificación")
+
+    def clear(self) -> None:
+        """Forget the cached data; the next repository call reloads it"""
+        with self._lock:
+            self._type_names, self._type_ids = {}, {}
+            self._state_names, self._state_ids = {}, {}
+            self._loaded = False
+            self._next_refresh_at = 0.0
+
+    def type_name(self, notification_type_id: int) -> Optional[str]:
+        return self._type_names.get(notification_type_id)
+
+    def type_id(self, name: str) -> Optional[int]:
+        return self._type_ids.get(name)
+
+    def state_name(self, notification_state_id: int) -> Optional[str]:
+        return self._state_names.get(notification_state_id)
+
+    def state_id(self, name: str) -> Optional[int]:
+        return self._state_ids.get(name)
+
+    def _begin_refresh(self, force: bool) -> bool:
+        """Claim the refresh. While loaded data exists, only one caller reloads it at a time."""
+        with self._lock:
+            if not force and not self.is_stale():
+                return False
+            if self._refreshing and self._loaded:
+                return False
+            self._refreshing = True
+            return True
+
+    def _refresh_failed(self, error: Exception) -> bool:
+        with self._lock:
+            self._next_refresh_at = self._clock() + self.retry_interval
+        logger.error(f"Error cargando los datos de referencia de notificaciones: {error}")
+        return False
+
+    def _end_refresh(self) -> None:
+        with self._lock:
+            self._refreshing = False
+
+    def refresh(self, db: Session, force: bool = True) -> bool:
+        """Reload types and states with a sync session. Returns True if the data was reloaded."""
+        if not self._begin_refresh(force):
+            return False
+        try:
+            types = db.execute(_types_query()).all()
+            states = db.execute(_states_query()).all()
+            self.load(types, states)
+            return True
+        except Exception as e:
+            return self._refresh_failed(e)
+        finally:
+            self._end_refresh()
+
+    async def refresh_async(self, db: AsyncSession, force: bool = True) -> bool:
+        """Reload types and states with an asyncio session. Returns True if the data was reloaded."""
+        if not self._begin_refresh(force):
+            return False
+        try:
+            types = (await db.execute(_types_query())).all()
+            states = (await db.execute(_states_query())).all()
+            self.load(types, states)
+            return True
+        except Exception as e:
+            return self._refresh_failed(e)
+        finally:
+            self._end_refresh()
+
+    async def preload_async(self, db: AsyncSession, timeout: float = REFERENCE_DATA_PRELOAD_TIMEOUT_SECONDS) -> bool:
+        """
+        Startup load with a deadline, so a slow or unreachable database does not hold up
+        startup. On timeout the data stays stale and the first repository call loads it.
+        """
+        try:
+            return await asyncio.wait_for(self.refresh_async(db), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Los datos de referencia no se cargaron en {timeout} s; se cargarán con la primera consulta")
+            return False
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Reload the data if it was never loaded or its refresh interval has passed"""
+        if self.is_stale():
+            self.refresh(db, force=False)
+
+    async def ensure_fresh_async(self, db: AsyncSession) -> None:
+        if self.is_stale():
+            await self.refresh_async(db, force=False)
+
+
+# Caché compartida por todo el proceso
+reference_data = ReferenceDataCache()
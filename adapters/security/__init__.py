@@ -0,0 +1,5 @@
+"""
+Security adapters.
+
+This module contains adapters that verify credentials locally, without calling other services.
+"""
@@ -0,0 +1,86 @@
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from jose import jwt, JWTError
+import logging
+import os
+
+load_dotenv(override=True, encoding="utf-8")
+
+logger = logging.getLogger(__name__)
+
+# "remote": siempre consulta al servicio de usuarios; "local": valida localmente los tokens firmados (JWT)
+SESSION_TOKEN_VERIFICATION_MODE = os.getenv("SESSION_TOKEN_VERIFICATION_MODE", "remote").lower()
+SESSION_TOKEN_SECRET = os.getenv("SESSION_TOKEN_SECRET")
+SESSION_TOKEN_PUBLIC_KEY = os.getenv("SESSION_TOKEN_PUBLIC_KEY")
+SESSION_TOKEN_ALGORITHMS = [a.strip() for a in os.getenv("SESSION_TOKEN_ALGORITHMS", "HS256").split(",") if a.strip()]
+SESSION_TOKEN_AUDIENCE = os.getenv("SESSION_TOKEN_AUDIENCE") or None
+SESSION_TOKEN_ISSUER = os.getenv("SESSION_TOKEN_ISSUER") or None
+SESSION_TOKEN_REQUIRED_CLAIMS = [c.strip() for c in os.getenv("SESSION_TOKEN_REQUIRED_CLAIMS", "exp").split(",") if c.strip()]
+SESSION_TOKEN_USER_ID_CLAIM = os.getenv("SESSION_TOKEN_USER_ID_CLAIM", "sub")
+SESSION_TOKEN_NAME_CLAIM = os.getenv("SESSION_TOKEN_NAME_CLAIM", "name")
+SESSION_TOKEN_EMAIL_CLAIM = os.getenv("SESSION_TOKEN_EMAIL_CLAIM", "email")
+
+# Resultados de la verificación local
+TOKEN_VALID = "valid"
+TOKEN_INVALID = "invalid"
+TOKEN_NOT_LOCAL = "not_local"  # Token opaco o heredado: debe verificarse en el servicio de usuarios
+
+
+def _verification_key() -> Optional[str]:
+    """La clave pública (RS*/ES*) tiene prioridad sobre el secreto compartido (HS*)"""
+    return SESSION_TOKEN_PUBLIC_KEY or SESSION_TOKEN_SECRET
+
+
+def local_verification_enabled() -> bool:
+    """La verificación local requiere el modo 'local' y una clave configurada"""
+    return SESSION_TOKEN_VERIFICATION_MODE == "local" and _verification_key() is not None
+
+
+def _is_signed_token(session_token: str) -> bool:
+    """Un JWT tiene una cabecera decodificable; los tokens opacos no"""
+    try:
+        jwt.get_unverified_header(session_token)
+        return True
+    except JWTError:
+        return False
+
+
+def _user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Construye el mismo diccionario de usuario que retorna el servicio de usuarios"""
+    return {
+        "user_id": int(claims[SESSION_TOKEN_USER_ID_CLAIM]),
+        "name": claims.get(SESSION_TOKEN_NAME_CLAIM),
+        "email": claims.get(SESSION_TOKEN_EMAIL_CLAIM),
+    }
+
+
+def verify_session_token_locally(session_token: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Valida un token de sesión firmado sin salir del proceso.
+
+    Returns:
+        Tuple[str, Optional[Dict[str, Any]]]: TOKEN_VALID con los datos del usuario,
+        TOKEN_INVALID si la firma, la expiración o los claims no son válidos, o
+        TOKEN_NOT_LOCAL si la verificación local está deshabilitada o el token es
+        opaco y debe verificarse de forma remota.
+    """
+    if not local_verification_enabled() or not _is_signed_token(session_token):
+        return TOKEN_NOT_LOCAL, None
+
+    options = {f"require_{claim}": True for claim in SESSION_TOKEN_REQUIRED_CLAIMS}
+    options["verify_aud"] = SESSION_TOKEN_AUDIENCE is not None
+    try:
+        claims = jwt.decode(
+            session_token,
+            _verification_key(),
+            algorithms=SESSION_TOKEN_ALGORITHMS,
+            options=options,
+            audience=SESSION_TOKEN_AUDIENCE,
+            issuer=SESSION_TOKEN_ISSUER,
+        )
+        return TOKEN_VALID, _user_from_claims(claims)
+    except JWTError as e:
+        logger.warning(f"Token de sesión firmado inválido: {e}")
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Token de sesión sin un {SESSION_TOKEN_USER_ID_CLAIM} válido: {e}")
+    return TOKEN_INVALID, None
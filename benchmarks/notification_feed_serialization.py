@@ -0,0 +1,159 @@
+"""
+Benchmark del feed de notificaciones: cadena ORM -> entidad -> DTO -> create_response
+frente a la proyección de columnas con SQLAlchemy Core entregada directamente a orjson.
+
+Mide, por fila, el tiempo de CPU y la memoria asignada desde la consulta hasta el cuerpo
+JSON de la respuesta, y comprueba que ambos caminos producen el mismo JSON.
+
+Uso (desde la raíz del repositorio):
+
+    uv run python -m benchmarks.notification_feed_serialization
+    uv run python -m benchmarks.notification_feed_serialization --rows 5000 --repeat 20
+    uv run python -m benchmarks.notification_feed_serialization --database-url postgresql://...
+
+Sin --database-url usa SQLite en memoria, donde crea las tablas. Con otra URL no crea ni
+modifica el esquema: la base de datos debe estar ya en la última migración
+(`uv run alembic upgrade head`), si no el benchmark se niega a ejecutarse. Inserta filas de
+prueba para un user_id alto que no debería existir y las borra al terminar.
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Tuple
+import argparse
+import logging
+import statistics
+import time
+import tracemalloc
+import orjson
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session, noload
+from models.models import Base, Notifications, NotificationStates, NotificationTypes
+from adapters.persistence.notification_repository import user_feed_rows_query, feed_rows_to_dicts
+from adapters.persistence.reference_data_cache import reference_data
+from domain.services.notification_service import serialize_user_notifications
+from utils.response import create_response, create_native_response
+
+BENCHMARK_USER_ID = 2_147_000_000
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def prepare_schema(engine) -> None:
+    """Crea las tablas en SQLite; en cualquier otra base exige que ya esté migrada a head"""
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+        return
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    if current != head:
+        raise SystemExit(
+            f"La base de datos está en la revisión {current} y no en {head}: el benchmark no crea "
+            "tablas fuera de SQLite. Ejecuta `uv run alembic upgrade head` o usa SQLite."
+        )
+
+
+def seed(engine, rows: int) -> None:
+    prepare_schema(engine)
+    with Session(engine) as db:
+        type_id = db.execute(select(NotificationTypes.notification_type_id).limit(1)).scalar()
+        if type_id is None:
+            type_id = db.execute(insert(NotificationTypes).values(name="Invitation")
+                                 .returning(NotificationTypes.notification_type_id)).scalar_one()
+        state_id = db.execute(select(NotificationStates.notification_state_id).limit(1)).scalar()
+        if state_id is None:
+            state_id = db.execute(insert(NotificationStates).values(name="Pendiente")
+                                  .returning(NotificationStates.notification_state_id)).scalar_one()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        db.execute(delete(Notifications).where(Notifications.user_id == BENCHMARK_USER_ID))
+        db.execute(insert(Notifications), [
+            {
+                "message": f"Tienes una nueva invitación a la finca {n}",
+                "notification_date": start + timedelta(minutes=n, microseconds=n % 1000 + 1),
+                "invitation_id": n + 1,
+                "notification_type_id": type_id,
+                "notification_state_id": state_id,
+                "user_id": BENCHMARK_USER_ID,
+            }
+            for n in range(rows)
+        ])
+        db.commit()
+        reference_data.refresh(db)
+
+
+def orm_chain(engine) -> bytes:
+    """El camino anterior: objetos ORM, entidades, DTOs pydantic, model_dump y process_data_for_json"""
+    with Session(engine) as db:
+        models = db.execute(
+            select(Notifications)
+            .options(noload(Notifications.notification_type), noload(Notifications.state))
+            .where(Notifications.user_id == BENCHMARK_USER_ID)
+        ).scalars().all()
+        data = [n.model_dump() for n in serialize_user_notifications(models)]
+        return create_response("success", "Notificaciones obtenidas exitosamente.", data=data).body
+
+
+def core_projection(engine) -> bytes:
+    """El camino de lectura optimizado: tuplas de columnas -> dicts -> orjson"""
+    with Session(engine) as db:
+        rows = db.execute(user_feed_rows_query(BENCHMARK_USER_ID, names_cached=True)).all()
+        data = feed_rows_to_dicts(rows, names_cached=True)
+        return create_native_response("success", "Notificaciones obtenidas exitosamente.", data).body
+
+
+def measure(run: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Mediana del tiempo de CPU en segundos y bytes asignados en una ejecución"""
+    run()  # calentamiento: compila la consulta y llena las cachés de SQLAlchemy
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.process_time()
+        run()
+        timings.append(time.process_time() - start)
+
+    tracemalloc.start()
+    run()
+    allocated = sum(stat.size for stat in tracemalloc.take_snapshot().statistics("filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), max(allocated, peak)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="notificaciones del usuario de prueba")
+    parser.add_argument("--repeat", type=int, default=10, help="ejecuciones medidas por camino")
+    parser.add_argument("--database-url", default="sqlite://", help="base de datos (por defecto SQLite en memoria)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    engine = create_engine(args.database_url)
+    seed(engine, args.rows)
+    try:
+        legacy, projected = orm_chain(engine), core_projection(engine)
+        if orjson.loads(legacy) != orjson.loads(projected):
+            raise SystemExit("Los dos caminos no producen el mismo JSON")
+
+        results = {
+            "ORM -> entidad -> DTO": measure(lambda: orm_chain(engine), args.repeat),
+            "Core -> dict -> orjson": measure(lambda: core_projection(engine), args.repeat),
+        }
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Notifications).where(Notifications.user_id == BENCHMARK_USER_ID))
+            db.commit()
+        engine.dispose()
+
+    print(f"{args.rows} filas, mediana de {args.repeat} ejecuciones ({engine.dialect.name})")
+    print(f"{'camino':<24}{'µs CPU/fila':>14}{'bytes asignados/fila':>24}")
+    for name, (seconds, allocated) in results.items():
+        print(f"{name:<24}{seconds / args.rows * 1e6:>14.2f}{allocated / args.rows:>24.0f}")
+    (legacy_seconds, legacy_bytes), (core_seconds, core_bytes) = results.values()
+    print(f"CPU {legacy_seconds / core_seconds:.1f}x menor, memoria {legacy_bytes / core_bytes:.1f}x menor")
+
+
+if __name__ == "__main__":
+    main()
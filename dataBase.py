@@ -1,12 +1,20 @@
 import os
+import asyncio
 import logging
-from sqlalchemy import create_engine
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
 
 load_dotenv(override=True, encoding='utf-8')
 
+# Configurar logger
+logger = logging.getLogger(__name__)
+
 def running_in_docker():
     # Detecta si está en Docker
     path = "/.dockerenv"
@@ -24,31 +32,64 @@ if running_in_docker():
 else:
     DB_HOST = os.getenv("PGHOST", "localhost")
 
-DB_PORT = os.getenv("PGPORT")
+DB_PORT = os.getenv("PGPORT", "5432")
 DB_NAME = os.getenv("PGDATABASE")
 DB_USER = os.getenv("PGUSER")
 DB_PASSWORD = os.getenv("PGPASSWORD")
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={'client_encoding': 'utf8'}, pool_pre_ping=True)
+# Configuración del pool de conexiones (se aplica por separado al motor síncrono y al asíncrono)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # -1 desactiva el reciclaje
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Tiempo máximo por sentencia en milisegundos; 0 lo desactiva
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "coffeetech-notifications")
+# Conexiones que se abren por adelantado al arrancar; 0 conecta bajo demanda
+DB_WARMUP_CONNECTIONS = int(os.getenv("DB_WARMUP_CONNECTIONS", "0"))
 
-# Configurar logger
-logger = logging.getLogger(__name__)
 
-try:
-    with engine.connect() as connection:
-        result = connection.execute(text("SELECT 1"))
-        logger.info("Conexión exitosa a la base de datos")
-except Exception as e:
-    logger.error(f"Error al conectar a la base de datos: {e}")
-    
+def _pool_settings() -> Dict[str, Any]:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL) -> Engine:
+    """
+    Crea el motor síncrono (psycopg2) con la configuración de pool del entorno.
+    No abre ninguna conexión: la primera se establece con la primera consulta.
+    """
+    connect_args: Dict[str, Any] = {
+        "client_encoding": "utf8",
+        "application_name": DB_APPLICATION_NAME,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(url, connect_args=connect_args, **_pool_settings())
+
+def create_async_db_engine(url: str = ASYNC_SQLALCHEMY_DATABASE_URL) -> AsyncEngine:
+    """Crea el motor asíncrono (asyncpg) con la misma configuración de pool que el síncrono"""
+    server_settings = {"application_name": DB_APPLICATION_NAME}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    return create_async_engine(url, connect_args={"server_settings": server_settings}, **_pool_settings())
+
+engine = create_db_engine()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db_session():
     """
-    Proporciona una sesión de base de datos, que se puede utilizar 
-    en las operaciones CRUD. Asegura que la sesión se cierre 
+    Proporciona una sesión de base de datos, que se puede utilizar
+    en las operaciones CRUD. Asegura que la sesión se cierre
     correctamente después de su uso.
 
     Yields:
@@ -59,3 +100,91 @@ def get_db_session():
         yield db
     finally:
         db.close()
+
+# Motor asíncrono (asyncpg) para los endpoints async. No abre conexiones hasta el primer uso.
+async_engine = create_async_db_engine()
+
+# expire_on_commit=False: los objetos siguen siendo legibles tras el commit sin otra consulta
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db_session():
+    """
+    Proporciona una sesión asíncrona de base de datos y la cierra al terminar.
+
+    Yields:
+        AsyncSession: Una sesión asíncrona de base de datos.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def warm_up_pool(db_engine: Engine, connections: int) -> int:
+    """
+    Abre por adelantado hasta `connections` conexiones del pool (como máximo pool_size)
+    y las devuelve al pool, para que las primeras solicitudes no paguen el handshake.
+
+    Los errores se registran pero no se propagan: el servicio arranca igual y
+    conectará bajo demanda.
+
+    Returns:
+        int: Número de conexiones abiertas correctamente.
+    """
+    connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+
+    barrier = threading.Barrier(connections)
+
+    def check() -> bool:
+        try:
+            with db_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                # Retener la conexión hasta que todas estén abiertas para no reutilizar la misma
+                try:
+                    barrier.wait(timeout=DB_POOL_TIMEOUT)
+                except threading.BrokenBarrierError:
+                    pass
+        except Exception:
+            # Si una conexión falla, las demás no deben esperarla
+            barrier.abort()
+            raise
+        return True
+
+    opened = 0
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        for future in [executor.submit(check) for _ in range(connections)]:
+            try:
+                opened += future.result()
+            except Exception as e:
+                logger.error(f"Error al precalentar el pool de conexiones: {e}")
+    logger.info(f"Pool de conexiones precalentado: {opened}/{connections} conexiones")
+    return opened
+
+async def warm_up_async_pool(db_engine: AsyncEngine, connections: int) -> int:
+    """Versión asíncrona de warm_up_pool para el motor asyncpg"""
+    connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+
+    all_open = asyncio.Event()
+    pending = connections
+
+    async def check() -> None:
+        nonlocal pending
+        try:
+            async with db_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                pending -= 1
+                if pending == 0:
+                    all_open.set()
+                await asyncio.wait_for(all_open.wait(), DB_POOL_TIMEOUT)
+        finally:
+            # Si una conexión falla, las demás no deben esperarla
+            all_open.set()
+
+    results = await asyncio.gather(*(check() for _ in range(connections)), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.error(f"Error al precalentar el pool de conexiones asíncrono: {errors[0]}")
+    opened = connections - len(errors)
+    logger.info(f"Pool de conexiones asíncrono precalentado: {opened}/{connections} conexiones")
+    return opened
@@ -89,11 +89,20 @@ class Notification:
         Args:
             new_state_id: The new state ID
         """
-        if new_state_id <= 0:
-            raise ValueError("State ID must be a positive integer")
-        
+        self.validate_state_id(new_state_id)
         self.notification_state_id = new_state_id
     
+    @staticmethod
+    def validate_state_id(state_id: int) -> None:
+        """
+        Check that a state ID is valid for a state update, without loading the notification
+        
+        Args:
+            state_id: The state ID to validate
+        """
+        if state_id <= 0:
+            raise ValueError("State ID must be a positive integer")
+    
     def is_pending(self) -> bool:
         """
         Check if the notification is in pending state
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Optional
 from models.models import Notifications as NotificationModel
 from .notification import Notification
 
@@ -9,12 +9,16 @@ class NotificationMapper:
     """
     
     @staticmethod
-    def to_entity(model: NotificationModel) -> Notification:
+    def to_entity(model: NotificationModel,
+                  type_name: Optional[Callable[[int], Optional[str]]] = None,
+                  state_name: Optional[Callable[[int], Optional[str]]] = None) -> Notification:
         """
         Convert SQLAlchemy model to domain entity
         
         Args:
             model: SQLAlchemy Notifications model instance
+            type_name: Optional lookup of a type name by id, for models whose type was not loaded
+            state_name: Optional lookup of a state name by id, for models whose state was not loaded
             
         Returns:
             Notification domain entity
@@ -29,6 +33,12 @@ class NotificationMapper:
         if hasattr(model, 'state') and model.state:
             notification_state_name = model.state.name
         
+        # Relationships not loaded (noload): take the names from the given lookups
+        if notification_type_name is None and type_name:
+            notification_type_name = type_name(model.notification_type_id)
+        if notification_state_name is None and state_name:
+            notification_state_name = state_name(model.notification_state_id)
+        
         return Notification(
             notification_id=model.notification_id,
             message=model.message,
@@ -1,53 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from models.models import Notifications, NotificationStates, NotificationTypes
 
 
-class NotificationRepositoryInterface(ABC):
-    """Interface for notification repository operations"""
+class AsyncNotificationRepositoryInterface(ABC):
+    """Interface for notification repository operations on an asyncio database session"""
     
     @abstractmethod
-    def get_notifications_by_user_id(self, user_id: int) -> List[Notifications]:
-        """Get all notifications for a specific user"""
+    async def get_notification_rows_by_user_id(self, user_id: int, limit: int,
+                                               after: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """Get one keyset page of a user's notifications as NotificationResponse-shaped dicts, newest first"""
         pass
     
     @abstractmethod
-    def get_all_notification_states(self) -> List[NotificationStates]:
+    async def get_all_notification_states(self) -> List[NotificationStates]:
         """Get all notification states"""
         pass
     
     @abstractmethod
-    def get_all_notification_types(self) -> List[NotificationTypes]:
+    async def get_all_notification_types(self) -> List[NotificationTypes]:
         """Get all notification types"""
         pass
     
     @abstractmethod
-    def get_all_notifications(self) -> List[Notifications]:
+    async def get_all_notifications(self) -> List[Notifications]:
         """Get all notifications"""
         pass
     
     @abstractmethod
-    def get_notification_by_invitation(self, invitation_id: int) -> Optional[Notifications]:
+    async def get_notification_by_invitation(self, invitation_id: int) -> Optional[Notifications]:
         """Get notification by invitation ID"""
         pass
     
     @abstractmethod
-    def delete_notifications_by_invitation(self, invitation_id: int) -> int:
+    async def get_notifications_by_invitations(self, invitation_ids: List[int]) -> Dict[int, Optional[int]]:
+        """Look up the notification of many invitations at once; returns invitation_id -> notification_id (None if missing)"""
+        pass
+    
+    @abstractmethod
+    async def delete_notifications_by_invitation(self, invitation_id: int) -> int:
         """Delete notifications by invitation ID and return count of deleted notifications"""
         pass
     
     @abstractmethod
-    def update_notification_state(self, notification_id: int, notification_state_id: int) -> Optional[Notifications]:
+    async def delete_notifications_by_invitations(self, invitation_ids: List[int]) -> Dict[int, List[int]]:
+        """Delete the notifications of many invitations at once; returns invitation_id -> deleted notification ids"""
+        pass
+    
+    @abstractmethod
+    async def update_notification_state(self, notification_id: int, notification_state_id: int) -> Optional[Notifications]:
         """Update notification state and return the updated notification"""
         pass
     
     @abstractmethod
-    def create_notification(self, message: str, user_id: int, notification_type_id: int, 
-                          invitation_id: int, notification_state_id: int) -> Notifications:
+    async def update_notifications_state(self, notification_state_id: int, notification_ids: Optional[List[int]] = None,
+                                         user_id: Optional[int] = None, from_state_id: Optional[int] = None) -> List[int]:
+        """Move the notifications selected by id, or by user and current state, to a new state; returns the ids that changed"""
+        pass
+    
+    @abstractmethod
+    async def create_notification(self, message: str, user_id: int, notification_type_id: int,
+                                  invitation_id: int, notification_state_id: int) -> Notifications:
         """Create a new notification"""
         pass
     
     @abstractmethod
-    def get_notification_by_id(self, notification_id: int) -> Optional[Notifications]:
+    async def create_notification_with_outbox(self, message: str, user_id: int, notification_type_id: int,
+                                              invitation_id: int, notification_state_id: int,
+                                              fcm_title: Optional[str], fcm_body: Optional[str],
+                                              fcm_token: Optional[str] = None) -> Notifications:
+        """Create a new notification and its pending FCM delivery in a single transaction"""
+        pass
+    
+    @abstractmethod
+    async def create_notifications_batch(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert notifications with different column values in one transaction; returns their ids in input order"""
+        pass
+    
+    @abstractmethod
+    async def create_notifications_bulk(self, message: str, user_ids: List[int], notification_type_id: int,
+                                        invitation_id: int, notification_state_id: int) -> Dict[int, int]:
+        """Create the same notification for many users and return a user_id -> notification_id map"""
+        pass
+    
+    @abstractmethod
+    async def get_notification_by_id(self, notification_id: int) -> Optional[Notifications]:
         """Get notification by ID"""
-        pass 
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def stream_notifications(self, notification_type_id: Optional[int] = None,
+                             notification_state_id: Optional[int] = None,
+                             date_from: Optional[datetime] = None,
+                             date_to: Optional[datetime] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream matching notifications as batches of plain column dicts, without loading the whole result"""
+        pass
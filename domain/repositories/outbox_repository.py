@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from models.models import NotificationOutbox
+
+# Estados de una entrada del outbox
+OUTBOX_PENDING = "pending"
+OUTBOX_DONE = "done"
+OUTBOX_FAILED = "failed"
+
+
+class OutboxRepositoryInterface(ABC):
+    """Interface for notification outbox operations"""
+    
+    @abstractmethod
+    def claim_batch(self, limit: int, lease_seconds: float) -> List[NotificationOutbox]:
+        """Lease up to `limit` due entries that no other worker holds, committing the claim"""
+        pass
+    
+    @abstractmethod
+    def mark_done(self, entry: NotificationOutbox, devices_notified: int) -> None:
+        """Mark an entry as delivered"""
+        pass
+    
+    @abstractmethod
+    def mark_failed(self, entry: NotificationOutbox, error: str, max_attempts: int, retry_delay_seconds: float) -> None:
+        """Record a failed attempt, rescheduling the entry or giving up after max_attempts"""
+        pass
+    
+    @abstractmethod
+    def commit(self) -> None:
+        """Commit the settled entries"""
+        pass
+    
+    @abstractmethod
+    def rollback(self) -> None:
+        """Roll back the current transaction"""
+        pass
+    
+    @abstractmethod
+    def get_by_notification_id(self, notification_id: int) -> Optional[NotificationOutbox]:
+        """Get the outbox entry of a notification"""
+        pass
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Literal, Dict
 from datetime import datetime
 
 class NotificationResponse(BaseModel):
@@ -15,6 +15,17 @@ class NotificationResponse(BaseModel):
 class UpdateNotificationStateRequest(BaseModel):
     notification_state_id: int
 
+class BulkUpdateNotificationStateRequest(BaseModel):
+    notification_state_id: int
+    # Se indican los ids, o un usuario y opcionalmente el estado del que deben partir sus notificaciones
+    notification_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    user_id: Optional[int] = None
+    from_state_id: Optional[int] = None
+
+class BulkUpdateNotificationStateResponse(BaseModel):
+    updated_count: int
+    notification_ids: List[int]
+
 class SendNotificationRequest(BaseModel):
     message: str
     user_id: int
@@ -24,6 +35,21 @@ class SendNotificationRequest(BaseModel):
     fcm_token: Optional[str] = None
     fcm_title: Optional[str] = None
     fcm_body: Optional[str] = None
+    # "sync": responde tras enviar el FCM; "background": responde tras guardar y envía en segundo plano;
+    # "outbox": guarda la entrega pendiente en la misma transacción y la envía el despachador del outbox
+    delivery_mode: Literal["sync", "background", "outbox"] = "sync"
+
+class BulkSendNotificationRequest(BaseModel):
+    user_ids: List[int] = Field(min_length=1, max_length=10000)
+    message: str
+    notification_type_id: int
+    invitation_id: int
+    notification_state_id: int
+    fcm_title: Optional[str] = None
+    fcm_body: Optional[str] = None
+
+class SessionTokenInvalidationRequest(BaseModel):
+    session_token: str
 
 class NotificationStateResponse(BaseModel):
     notification_state_id: int
@@ -48,8 +74,38 @@ class NotificationByInvitationResponse(BaseModel):
 class DeleteNotificationsResponse(BaseModel):
     deleted_count: int
 
+class InvitationIdsRequest(BaseModel):
+    invitation_ids: List[int] = Field(min_length=1, max_length=10000)
+
+class NotificationsByInvitationsResponse(BaseModel):
+    # invitation_id -> notification_id, None si la invitación no tiene notificación
+    notification_ids: Dict[int, Optional[int]]
+
+class DeleteNotificationsByInvitationsResponse(BaseModel):
+    deleted_count: int
+    deleted_counts: Dict[int, int]
+
 class SendNotificationResponse(BaseModel):
     notification_id: int
     devices_notified: int
     invalid_tokens: Optional[List[str]] = None
     fcm_errors: Optional[List[dict]] = None
+    delivery_status: Optional[str] = None
+
+class BulkSendNotificationResponse(BaseModel):
+    users_targeted: int
+    notifications_created: int
+    devices_notified: int
+    users_without_devices: int
+    notification_ids: Dict[int, int]
+    invalid_tokens: Optional[List[str]] = None
+    fcm_errors: Optional[List[dict]] = None
+
+class DeliveryStatusResponse(BaseModel):
+    notification_id: int
+    status: str
+    devices_notified: int = 0
+    invalid_tokens: Optional[List[str]] = None
+    fcm_errors: Optional[List[dict]] = None
+    error: Optional[str] = None
+    updated_at: datetime
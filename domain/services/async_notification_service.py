@@ -0,0 +1,272 @@
+from typing import List, Dict, Any, AsyncIterator, Optional
+from datetime import datetime
+import asyncio
+import logging
+from domain.repositories.notification_repository import AsyncNotificationRepositoryInterface
+from domain.repositories.outbox_repository import OUTBOX_PENDING
+from domain.entities import Notification
+from domain.schemas import (
+    NotificationStateResponse,
+    NotificationTypeResponse,
+    NotificationDetailResponse,
+    NotificationByInvitationResponse,
+    DeleteNotificationsResponse,
+    NotificationsByInvitationsResponse,
+    DeleteNotificationsByInvitationsResponse,
+    SendNotificationRequest,
+    SendNotificationResponse,
+    BulkSendNotificationRequest,
+    BulkSendNotificationResponse,
+    BulkUpdateNotificationStateRequest,
+    BulkUpdateNotificationStateResponse,
+)
+from domain.services.notification_service import (
+    NotificationNotFoundError,
+    page_after,
+    to_notification_rows_page,
+    to_state_responses,
+    to_type_responses,
+    to_detail_responses,
+    validate_bulk_request,
+    validate_bulk_state_request,
+    to_bulk_state_response,
+    to_delete_by_invitations_response,
+    to_bulk_response,
+)
+from domain.services.push_delivery_service import PushDeliveryJob, PushDeliveryService
+from domain.services.push_delivery_worker import PushDeliveryWorker, DELIVERY_QUEUED
+from domain.services.notification_insert_batcher import NotificationInsertBatcher
+from adapters.http.user_service_adapter import verify_session_token_async
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNotificationService:
+    """
+    Notification service for the `async def` endpoints.
+
+    Database work, user-service calls and FCM sends are all awaited, so a request
+    waiting on I/O does not hold a threadpool worker. Only bulk delivery, which
+    still resolves devices with blocking batched calls, runs in asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        notification_repository: AsyncNotificationRepositoryInterface,
+        push_delivery_service: Optional[PushDeliveryService] = None,
+        push_delivery_worker: Optional[PushDeliveryWorker] = None,
+        insert_batcher: Optional[NotificationInsertBatcher] = None,
+        outbox_enabled: bool = False
+    ):
+        self.notification_repository = notification_repository
+        self.push_delivery_service = push_delivery_service or PushDeliveryService()
+        self.push_delivery_worker = push_delivery_worker
+        self.insert_batcher = insert_batcher
+        self.outbox_enabled = outbox_enabled
+
+    async def authenticate_user(self, session_token: str) -> Dict[str, Any] | None:
+        """Authenticate user using session token"""
+        user = await verify_session_token_async(session_token)
+        if user:
+            logger.info(f"Usuario autenticado: {user['user_id']} - {user['name']}")
+        else:
+            logger.warning(f"Sesión inválida para el token: {session_token}")
+        return user
+
+    async def get_user_notification_rows_page(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One keyset page of a user's notifications, newest first, as a {"notifications", "next_cursor"}
+        dict: the rows come from a column projection as plain dicts and go straight to orjson,
+        skipping the ORM, entity and DTO layers.
+        """
+        rows = await self.notification_repository.get_notification_rows_by_user_id(
+            user_id, limit + 1, page_after(cursor)
+        )
+        return to_notification_rows_page(rows, limit)
+
+    async def get_all_notification_states(self) -> List[NotificationStateResponse]:
+        """Get all notification states"""
+        states = await self.notification_repository.get_all_notification_states()
+        return to_state_responses(states)
+
+    async def get_all_notification_types(self) -> List[NotificationTypeResponse]:
+        """Get all notification types"""
+        types = await self.notification_repository.get_all_notification_types()
+        return to_type_responses(types)
+
+    async def get_all_notifications(self) -> List[NotificationDetailResponse]:
+        """Get all notifications using entities"""
+        notification_models = await self.notification_repository.get_all_notifications()
+        return to_detail_responses(notification_models)
+
+    async def stream_notifications(
+        self,
+        notification_type_id: Optional[int] = None,
+        notification_state_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream notifications matching the filters in batches of plain dicts, for exports of any size"""
+        exported = 0
+        async for batch in self.notification_repository.stream_notifications(
+            notification_type_id, notification_state_id, date_from, date_to
+        ):
+            exported += len(batch)
+            yield batch
+        logger.info(f"Exportación de notificaciones completada: {exported} filas")
+
+    async def get_notification_by_invitation(self, invitation_id: int) -> NotificationByInvitationResponse:
+        """Get notification by invitation ID"""
+        notification_model = await self.notification_repository.get_notification_by_invitation(invitation_id)
+        return NotificationByInvitationResponse(
+            notification_id=notification_model.notification_id if notification_model else None
+        )
+
+    async def delete_notifications_by_invitation(self, invitation_id: int) -> DeleteNotificationsResponse:
+        """Delete notifications by invitation ID"""
+        try:
+            deleted_count = await self.notification_repository.delete_notifications_by_invitation(invitation_id)
+            logger.info(f"{deleted_count} notificaciones de tipo 'Invitation' eliminadas para invitation_id {invitation_id}.")
+            return DeleteNotificationsResponse(deleted_count=deleted_count)
+        except Exception as e:
+            logger.error(f"Error eliminando notificaciones por invitation_id {invitation_id}: {str(e)}")
+            raise
+
+    async def get_notifications_by_invitations(self, invitation_ids: List[int]) -> NotificationsByInvitationsResponse:
+        """Get the notification of many invitations with a single query"""
+        notification_ids = await self.notification_repository.get_notifications_by_invitations(invitation_ids)
+        return NotificationsByInvitationsResponse(notification_ids=notification_ids)
+
+    async def delete_notifications_by_invitations(self, invitation_ids: List[int]) -> DeleteNotificationsByInvitationsResponse:
+        """Delete the notifications of many invitations with a single statement"""
+        try:
+            deleted = await self.notification_repository.delete_notifications_by_invitations(invitation_ids)
+        except Exception as e:
+            logger.error(f"Error eliminando notificaciones de {len(invitation_ids)} invitaciones: {str(e)}")
+            raise
+        return to_delete_by_invitations_response(deleted)
+
+    async def update_notification_state(self, notification_id: int, notification_state_id: int) -> None:
+        """Validate the new state with the entity rules, then update it with a single statement"""
+        try:
+            Notification.validate_state_id(notification_state_id)
+        except ValueError as e:
+            logger.error(f"Invalid state update: {e}")
+            raise ValueError(f"Estado inválido: {str(e)}")
+
+        updated_model = await self.notification_repository.update_notification_state(notification_id, notification_state_id)
+        if not updated_model:
+            raise NotificationNotFoundError("Notificación no encontrada")
+
+        logger.info(f"Estado de notificación {notification_id} actualizado a {notification_state_id}")
+
+    async def update_notifications_state(self, request: BulkUpdateNotificationStateRequest) -> BulkUpdateNotificationStateResponse:
+        """Move many notifications to a new state with a single set-based update"""
+        validate_bulk_state_request(request)
+        updated_ids = await self.notification_repository.update_notifications_state(
+            request.notification_state_id,
+            notification_ids=request.notification_ids,
+            user_id=request.user_id,
+            from_state_id=request.from_state_id
+        )
+        return to_bulk_state_response(request, updated_ids)
+
+    async def send_notification(self, request: SendNotificationRequest) -> SendNotificationResponse:
+        """Send a notification using entity-based approach with FCM support"""
+        try:
+            notification_entity = Notification.create_new(
+                message=request.message,
+                user_id=request.user_id,
+                notification_type_id=request.notification_type_id,
+                invitation_id=request.invitation_id,
+                notification_state_id=request.notification_state_id
+            )
+
+            if notification_entity.is_invitation_notification():
+                logger.info("Processing invitation notification")
+
+            delivery_mode = request.delivery_mode
+            if delivery_mode == "outbox" and not self.outbox_enabled:
+                # Without a running dispatcher an outbox entry would stay pending forever
+                logger.warning("Outbox desactivado (OUTBOX_DISPATCHER_ENABLED=false); el envío se hace en segundo plano")
+                delivery_mode = "background"
+
+            if delivery_mode == "outbox":
+                # The pending delivery is written in the same transaction as the notification
+                saved_model = await self.notification_repository.create_notification_with_outbox(
+                    message=notification_entity.message,
+                    user_id=notification_entity.user_id,
+                    notification_type_id=notification_entity.notification_type_id,
+                    invitation_id=notification_entity.invitation_id,
+                    notification_state_id=notification_entity.notification_state_id,
+                    fcm_title=request.fcm_title,
+                    fcm_body=request.fcm_body,
+                    fcm_token=request.fcm_token
+                )
+                logger.info(f"Envío FCM de la notificación {saved_model.notification_id} registrado en el outbox")
+                return SendNotificationResponse(
+                    notification_id=saved_model.notification_id,
+                    devices_notified=0,
+                    delivery_status=OUTBOX_PENDING
+                )
+
+            notification_id = await self._insert_notification(notification_entity)
+
+            job = PushDeliveryJob(
+                notification_id=notification_id,
+                user_id=request.user_id,
+                fcm_title=request.fcm_title,
+                fcm_body=request.fcm_body,
+                fcm_token=request.fcm_token
+            )
+
+            if delivery_mode == "background":
+                if self.push_delivery_worker and self.push_delivery_worker.submit(job):
+                    logger.info(f"Envío FCM de la notificación {job.notification_id} encolado")
+                    return SendNotificationResponse(
+                        notification_id=job.notification_id,
+                        devices_notified=0,
+                        delivery_status=DELIVERY_QUEUED
+                    )
+                logger.warning(f"No se pudo encolar el envío de la notificación {job.notification_id}; enviando en línea")
+
+            return await self.push_delivery_service.deliver_async(job)
+
+        except ValueError as e:
+            logger.error(f"Error de validación de entidad: {e}")
+            raise ValueError(f"Datos de notificación inválidos: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error enviando notificación: {str(e)}")
+            raise
+
+    async def _insert_notification(self, notification_entity: Notification) -> int:
+        """Insert through the micro-batching collector when it is enabled, otherwise on its own"""
+        values = dict(
+            message=notification_entity.message,
+            user_id=notification_entity.user_id,
+            notification_type_id=notification_entity.notification_type_id,
+            invitation_id=notification_entity.invitation_id,
+            notification_state_id=notification_entity.notification_state_id
+        )
+        if self.insert_batcher:
+            return await self.insert_batcher.submit(**values)
+        saved_model = await self.notification_repository.create_notification(**values)
+        return saved_model.notification_id
+
+    async def send_bulk_notification(self, request: BulkSendNotificationRequest) -> BulkSendNotificationResponse:
+        """Send the same notification to many users with one multi-row insert and multicast FCM batches"""
+        user_ids = validate_bulk_request(request)
+
+        notification_ids = await self.notification_repository.create_notifications_bulk(
+            message=request.message,
+            user_ids=user_ids,
+            notification_type_id=request.notification_type_id,
+            invitation_id=request.invitation_id,
+            notification_state_id=request.notification_state_id
+        )
+        logger.info(f"{len(notification_ids)} notificaciones creadas en envío masivo")
+
+        delivery = await asyncio.to_thread(
+            self.push_delivery_service.deliver_bulk, user_ids, request.fcm_title, request.fcm_body
+        )
+        return to_bulk_response(user_ids, notification_ids, delivery)
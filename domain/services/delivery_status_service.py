@@ -0,0 +1,35 @@
+from typing import Optional
+from domain.repositories.outbox_repository import OutboxRepositoryInterface
+from domain.schemas import DeliveryStatusResponse
+from domain.services.push_delivery_worker import PushDeliveryWorker
+
+
+class DeliveryStatusService:
+    """Reports the result of background (worker) and outbox FCM deliveries"""
+
+    def __init__(
+        self,
+        push_delivery_worker: Optional[PushDeliveryWorker] = None,
+        outbox_repository: Optional[OutboxRepositoryInterface] = None
+    ):
+        self.push_delivery_worker = push_delivery_worker
+        self.outbox_repository = outbox_repository
+
+    def get_delivery_status(self, notification_id: int) -> Optional[DeliveryStatusResponse]:
+        """Get the result of a background or outbox FCM delivery, if known"""
+        if self.push_delivery_worker:
+            status = self.push_delivery_worker.get_status(notification_id)
+            if status:
+                return DeliveryStatusResponse(**status)
+
+        if self.outbox_repository:
+            entry = self.outbox_repository.get_by_notification_id(notification_id)
+            if entry:
+                return DeliveryStatusResponse(
+                    notification_id=entry.notification_id,
+                    status=entry.status,
+                    devices_notified=entry.devices_notified or 0,
+                    error=entry.last_error,
+                    updated_at=entry.processed_at or entry.created_at
+                )
+        return None
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from adapters.persistence.notification_repository import notification_values
+from adapters.persistence.async_notification_repository import AsyncNotificationRepository
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_INSERT_BATCHING_ENABLED = os.getenv("NOTIFICATION_INSERT_BATCHING_ENABLED", "false").lower() == "true"
+NOTIFICATION_INSERT_BATCH_SIZE = int(os.getenv("NOTIFICATION_INSERT_BATCH_SIZE", "100"))
+NOTIFICATION_INSERT_BATCH_DELAY_MS = float(os.getenv("NOTIFICATION_INSERT_BATCH_DELAY_MS", "5"))
+
+
+@dataclass
+class PendingInsert:
+    """A notification waiting to be written and the future its caller awaits"""
+    values: Dict[str, Any]
+    future: "asyncio.Future[int]"
+
+
+class NotificationInsertBatcher:
+    """
+    Write-behind collector for single notification inserts.
+
+    Concurrent submit() calls are held for up to `max_delay_ms` milliseconds, or until
+    `max_batch_size` rows are waiting, and then written with one multi-row INSERT ...
+    RETURNING in one transaction. Each caller awaits the notification_id of its own row.
+    If a batch fails, its rows are retried one per transaction so a bad row only fails
+    its own caller.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = NOTIFICATION_INSERT_BATCH_SIZE,
+        max_delay_ms: float = NOTIFICATION_INSERT_BATCH_DELAY_MS,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending: List[PendingInsert] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+    async def submit(self, message: str, user_id: int, notification_type_id: int,
+                     invitation_id: int, notification_state_id: int) -> int:
+        """Queue a notification for the next batch and return its notification_id once written"""
+        if self._closed:
+            raise RuntimeError("El colector de inserciones de notificaciones está cerrado")
+
+        loop = asyncio.get_running_loop()
+        pending = PendingInsert(
+            values=notification_values(message, user_id, notification_type_id, invitation_id, notification_state_id),
+            future=loop.create_future()
+        )
+        self._pending.append(pending)
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return await pending.future
+
+    def flush(self) -> None:
+        """Start writing the waiting rows now instead of at the end of the delay"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._write(batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def close(self) -> None:
+        """Refuse new rows, write the waiting ones and wait for the writes in progress"""
+        self._closed = True
+        self.flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        async with self.session_factory() as db:
+            return await AsyncNotificationRepository(db).create_notifications_batch(rows)
+
+    async def _write(self, batch: List[PendingInsert]) -> None:
+        try:
+            notification_ids = await self._insert([pending.values for pending in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _reject(batch[0], e)
+                return
+            logger.warning(f"Error insertando un lote de {len(batch)} notificaciones; se reintenta fila por fila: {e}")
+            for pending in batch:
+                try:
+                    [notification_id] = await self._insert([pending.values])
+                except Exception as row_error:
+                    _reject(pending, row_error)
+                else:
+                    _resolve(pending, notification_id)
+            return
+
+        for pending, notification_id in zip(batch, notification_ids):
+            _resolve(pending, notification_id)
+        logger.debug(f"Lote de {len(batch)} notificaciones insertado")
+
+
+def _resolve(pending: PendingInsert, notification_id: int) -> None:
+    # El llamador pudo haber cancelado la espera; la fila ya quedó guardada
+    if not pending.future.done():
+        pending.future.set_result(notification_id)
+
+
+def _reject(pending: PendingInsert, error: Exception) -> None:
+    logger.error(f"Error insertando notificación para el usuario {pending.values['user_id']}: {error}")
+    if not pending.future.done():
+        pending.future.set_exception(error)
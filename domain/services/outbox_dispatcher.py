@@ -0,0 +1,116 @@
+from typing import Callable, List, Optional
+import logging
+import os
+import threading
+from sqlalchemy.orm import Session
+from adapters.persistence.outbox_repository import OutboxRepository
+from domain.services.push_delivery_service import PushDeliveryJob, PushDeliveryService
+
+logger = logging.getLogger(__name__)
+
+# Requiere la tabla notification_outbox (migración 0002); desactivado hasta habilitarlo explícitamente
+OUTBOX_DISPATCHER_ENABLED = os.getenv("OUTBOX_DISPATCHER_ENABLED", "false").lower() == "true"
+OUTBOX_DISPATCHER_THREADS = int(os.getenv("OUTBOX_DISPATCHER_THREADS", "1"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_DELAY_SECONDS = float(os.getenv("OUTBOX_RETRY_DELAY_SECONDS", "5.0"))
+# Tiempo que una entrada reclamada queda oculta a otros despachadores; debe superar lo que tarda un lote
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+
+class OutboxDispatcher:
+    """
+    Drains the notification outbox and delivers the pending FCM pushes.
+
+    Each batch is leased with SELECT ... FOR UPDATE SKIP LOCKED and the claim is committed
+    before delivery, so several threads or replicas can run dispatchers side by side and
+    no row lock or transaction is held during the user-service and FCM calls. Each entry
+    is settled in its own short transaction. Entries left unsettled by a crash are retried
+    once their lease expires.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        delivery_service: Optional[PushDeliveryService] = None,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        retry_delay_seconds: float = OUTBOX_RETRY_DELAY_SECONDS,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS,
+        num_threads: int = OUTBOX_DISPATCHER_THREADS,
+    ):
+        self.session_factory = session_factory
+        self.delivery_service = delivery_service or PushDeliveryService()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.lease_seconds = lease_seconds
+        self.num_threads = num_threads
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def run_once(self) -> int:
+        """Lease, deliver and settle one batch of outbox entries. Returns the number processed."""
+        db = self.session_factory()
+        repository = OutboxRepository(db)
+        try:
+            entries = repository.claim_batch(self.batch_size, self.lease_seconds)
+            for entry in entries:
+                job = PushDeliveryJob(
+                    notification_id=entry.notification_id,
+                    user_id=entry.user_id,
+                    fcm_title=entry.fcm_title,
+                    fcm_body=entry.fcm_body,
+                    fcm_token=entry.fcm_token
+                )
+                try:
+                    # Failed lookups and FCM outages raise, so the entry is retried instead of settled
+                    result = self.delivery_service.deliver(job, raise_on_failure=True)
+                except Exception as e:
+                    logger.error(f"Error entregando la entrada {entry.outbox_id} del outbox: {str(e)}")
+                    repository.mark_failed(entry, str(e), self.max_attempts, self.retry_delay_seconds)
+                else:
+                    repository.mark_done(entry, result.devices_notified)
+                repository.commit()
+            return len(entries)
+        except Exception:
+            repository.rollback()
+            raise
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Start the dispatcher threads"""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"outbox-dispatcher-{i}", daemon=True)
+            for i in range(self.num_threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Despachador del outbox iniciado con {self.num_threads} hilos")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Signal the dispatcher threads to finish their current batch and stop"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._threads:
+            logger.info("Despachador del outbox detenido")
+        self._threads = []
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Error procesando el outbox de notificaciones: {str(e)}")
+                processed = 0
+            # A full batch means there is probably more work waiting
+            if processed < self.batch_size:
+                self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,179 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+import logging
+from domain.schemas import SendNotificationResponse
+from adapters.http.user_service_adapter import (
+    get_user_devices_by_user_id,
+    get_user_devices_by_user_id_async,
+    get_devices_by_user_ids,
+    evict_device_tokens,
+)
+from utils.send_fcm_notification import send_fcm_multicast, send_fcm_multicast_async
+
+logger = logging.getLogger(__name__)
+
+
+class PushDeliveryError(Exception):
+    """No device received the push and the failure is worth retrying"""
+    pass
+
+
+@dataclass(frozen=True)
+class PushDeliveryJob:
+    """Everything needed to push an already persisted notification to a user's devices"""
+    notification_id: int
+    user_id: int
+    fcm_title: Optional[str] = None
+    fcm_body: Optional[str] = None
+    fcm_token: Optional[str] = None
+
+
+@dataclass
+class BulkDeliveryResult:
+    """Aggregate outcome of pushing one message to many users"""
+    devices_notified: int = 0
+    users_without_devices: int = 0
+    invalid_tokens: List[str] = field(default_factory=list)
+    fcm_errors: List[dict] = field(default_factory=list)
+
+
+class PushDeliveryService:
+    """Resolves a user's devices and delivers FCM pushes for persisted notifications"""
+
+    def _collect_fcm_result(self, result: dict, fcm_errors: list, invalid_tokens: list) -> bool:
+        """Record the outcome of one FCM delivery. Returns True if successful."""
+        if result.get("success"):
+            return True
+        token = result.get("token")
+        if result.get("should_delete_token"):
+            invalid_tokens.append(token)
+        fcm_errors.append({
+            "token": token,
+            "error_type": result.get("error_type"),
+            "error_message": result.get("error_message")
+        })
+        return False
+
+    def _device_tokens(self, job: PushDeliveryJob, user_devices: list) -> List[str]:
+        """Tokens of all user devices plus the optional extra token, without duplicates"""
+        tokens: List[str] = [device["fcm_token"] for device in user_devices]
+        if job.fcm_token:
+            tokens.append(job.fcm_token)
+        # Avoid pushing twice to the same device
+        return list(dict.fromkeys(token for token in tokens if token))
+
+    def _no_devices_response(self, job: PushDeliveryJob) -> SendNotificationResponse:
+        logger.info(f"Usuario {job.user_id} no tiene dispositivos registrados para notificaciones FCM")
+        return SendNotificationResponse(
+            notification_id=job.notification_id,
+            devices_notified=0
+        )
+
+    def _build_delivery_response(self, job: PushDeliveryJob, fcm_results: List[dict]) -> SendNotificationResponse:
+        """Aggregate the per-token FCM results of one notification and evict invalid tokens"""
+        fcm_errors = []
+        invalid_tokens = []
+        sent_count = 0
+        for result in fcm_results:
+            if self._collect_fcm_result(result, fcm_errors, invalid_tokens):
+                sent_count += 1
+
+        # Note: We do NOT change the notification state here
+        # Notifications remain in their original state until user responds
+        if sent_count > 0:
+            logger.info(f"FCM notification sent successfully to {sent_count} devices for notification {job.notification_id}")
+        else:
+            logger.info(f"No FCM notifications sent for notification {job.notification_id}")
+
+        # Log invalid tokens and stop pushing to them
+        if invalid_tokens:
+            logger.warning(f"Tokens FCM inválidos detectados: {invalid_tokens}")
+            evict_device_tokens(job.user_id, invalid_tokens)
+
+        return SendNotificationResponse(
+            notification_id=job.notification_id,
+            devices_notified=sent_count,
+            invalid_tokens=invalid_tokens if invalid_tokens else None,
+            fcm_errors=fcm_errors if fcm_errors else None
+        )
+
+    def _raise_if_retryable(self, response: SendNotificationResponse) -> None:
+        """
+        Raise PushDeliveryError when no device was notified and at least one token failed
+        for a reason other than the token itself (FCM unavailable, quota, credentials...).
+        """
+        if response.devices_notified or not response.fcm_errors:
+            return
+        invalid_tokens = set(response.invalid_tokens or [])
+        retryable = [error for error in response.fcm_errors if error["token"] not in invalid_tokens]
+        if retryable:
+            raise PushDeliveryError(
+                f"FCM no entregó la notificación {response.notification_id}: "
+                f"{retryable[0]['error_type']} - {retryable[0]['error_message']}"
+            )
+
+    def deliver(self, job: PushDeliveryJob, raise_on_failure: bool = False) -> SendNotificationResponse:
+        """
+        Push a persisted notification to every registered device of its user.
+
+        With `raise_on_failure`, a failed device lookup raises DeviceLookupError and a push
+        that reached no device because of a non-token FCM error raises PushDeliveryError,
+        so callers that can retry (the outbox) do not settle a delivery that never happened.
+        """
+        user_devices = get_user_devices_by_user_id(job.user_id, raise_on_error=raise_on_failure)
+        if not user_devices:
+            return self._no_devices_response(job)
+
+        fcm_results = []
+        if job.fcm_title and job.fcm_body:
+            # Send to all user devices (and the additional token, if provided)
+            fcm_results = send_fcm_multicast(self._device_tokens(job, user_devices), job.fcm_title, job.fcm_body)
+        response = self._build_delivery_response(job, fcm_results)
+        if raise_on_failure:
+            self._raise_if_retryable(response)
+        return response
+
+    async def deliver_async(self, job: PushDeliveryJob) -> SendNotificationResponse:
+        """Async variant of deliver() for the async request path; the event loop is free while waiting on I/O"""
+        user_devices = await get_user_devices_by_user_id_async(job.user_id)
+        if not user_devices:
+            return self._no_devices_response(job)
+
+        fcm_results = []
+        if job.fcm_title and job.fcm_body:
+            fcm_results = await send_fcm_multicast_async(self._device_tokens(job, user_devices), job.fcm_title, job.fcm_body)
+        return self._build_delivery_response(job, fcm_results)
+
+    def deliver_bulk(self, user_ids: List[int], fcm_title: Optional[str], fcm_body: Optional[str]) -> BulkDeliveryResult:
+        """Push the same message to every device of many users using multicast batches"""
+        result = BulkDeliveryResult()
+        if not user_ids:
+            return result
+
+        devices_by_user = get_devices_by_user_ids(user_ids)
+        result.users_without_devices = sum(1 for devices in devices_by_user.values() if not devices)
+
+        if not (fcm_title and fcm_body):
+            return result
+
+        # Avoid pushing twice to a device shared by several users
+        tokens = list(dict.fromkeys(
+            device["fcm_token"]
+            for devices in devices_by_user.values()
+            for device in devices
+            if device.get("fcm_token")
+        ))
+
+        for fcm_result in send_fcm_multicast(tokens, fcm_title, fcm_body):
+            if self._collect_fcm_result(fcm_result, result.fcm_errors, result.invalid_tokens):
+                result.devices_notified += 1
+
+        logger.info(f"Envío FCM masivo: {result.devices_notified} dispositivos notificados de {len(tokens)} para {len(user_ids)} usuarios")
+        if result.invalid_tokens:
+            logger.warning(f"Tokens FCM inválidos detectados: {result.invalid_tokens}")
+            invalid = set(result.invalid_tokens)
+            for user_id, devices in devices_by_user.items():
+                user_invalid = [device["fcm_token"] for device in devices if device.get("fcm_token") in invalid]
+                if user_invalid:
+                    evict_device_tokens(user_id, user_invalid)
+        return result
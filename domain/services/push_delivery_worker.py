@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import queue
+import threading
+from domain.services.push_delivery_service import PushDeliveryJob, PushDeliveryService
+
+logger = logging.getLogger(__name__)
+
+PUSH_QUEUE_MAX_SIZE = int(os.getenv("PUSH_QUEUE_MAX_SIZE", "1000"))
+PUSH_WORKER_THREADS = int(os.getenv("PUSH_WORKER_THREADS", "4"))
+PUSH_STATUS_MAX_ENTRIES = int(os.getenv("PUSH_STATUS_MAX_ENTRIES", "10000"))
+
+# Estados posibles de una entrega en segundo plano
+DELIVERY_QUEUED = "queued"
+DELIVERY_IN_PROGRESS = "in_progress"
+DELIVERY_DELIVERED = "delivered"
+DELIVERY_FAILED = "failed"
+
+
+class DeliveryStatusStore:
+    """Bounded, thread-safe record of the latest delivery result per notification"""
+
+    def __init__(self, max_entries: int = PUSH_STATUS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, notification_id: int, status: str, **details: Any) -> None:
+        """Store the current status of a notification, evicting the oldest entries when full"""
+        entry = {
+            "notification_id": notification_id,
+            "status": status,
+            "devices_notified": details.get("devices_notified", 0),
+            "invalid_tokens": details.get("invalid_tokens"),
+            "fcm_errors": details.get("fcm_errors"),
+            "error": details.get("error"),
+            "updated_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            self._entries[notification_id] = entry
+            self._entries.move_to_end(notification_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, notification_id: int) -> None:
+        """Forget the status of a notification"""
+        with self._lock:
+            self._entries.pop(notification_id, None)
+
+    def get(self, notification_id: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the delivery status of a notification, if known"""
+        with self._lock:
+            entry = self._entries.get(notification_id)
+            return dict(entry) if entry else None
+
+
+class PushDeliveryWorker:
+    """
+    In-process worker pool that delivers FCM pushes after the request has returned.
+
+    Jobs are kept in a bounded queue: when it is full, submit() refuses the job so
+    the caller can fall back to synchronous delivery instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        delivery_service: Optional[PushDeliveryService] = None,
+        max_queue_size: int = PUSH_QUEUE_MAX_SIZE,
+        num_threads: int = PUSH_WORKER_THREADS,
+        status_store: Optional[DeliveryStatusStore] = None,
+    ):
+        self.delivery_service = delivery_service or PushDeliveryService()
+        self.num_threads = num_threads
+        self.status_store = status_store or DeliveryStatusStore()
+        self._queue: "queue.Queue[Optional[PushDeliveryJob]]" = queue.Queue(maxsize=max_queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._threads = [
+                threading.Thread(target=self._run, name=f"push-delivery-{i}", daemon=True)
+                for i in range(self.num_threads)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"Worker de envío FCM iniciado con {self.num_threads} hilos")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Let the queued jobs drain and stop the worker threads"""
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+        if threads:
+            logger.info("Worker de envío FCM detenido")
+
+    def submit(self, job: PushDeliveryJob) -> bool:
+        """Queue a delivery job. Returns False if the worker is stopped or the queue is full."""
+        if not self.is_running:
+            return False
+        # Recorded before queueing: a worker may pick the job up and finish it before put_nowait returns
+        self.status_store.record(job.notification_id, DELIVERY_QUEUED)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.status_store.discard(job.notification_id)
+            logger.warning(f"Cola de envío FCM llena; notificación {job.notification_id} no encolada")
+            return False
+        return True
+
+    def get_status(self, notification_id: int) -> Optional[Dict[str, Any]]:
+        """Return the delivery status of a notification sent in background mode"""
+        return self.status_store.get(notification_id)
+
+    def process(self, job: PushDeliveryJob) -> None:
+        """Deliver a single job and record its outcome"""
+        self.status_store.record(job.notification_id, DELIVERY_IN_PROGRESS)
+        try:
+            result = self.delivery_service.deliver(job)
+        except Exception as e:
+            logger.error(f"Error en el envío FCM en segundo plano de la notificación {job.notification_id}: {str(e)}")
+            self.status_store.record(job.notification_id, DELIVERY_FAILED, error=str(e))
+            return
+        self.status_store.record(
+            job.notification_id,
+            DELIVERY_DELIVERED,
+            devices_notified=result.devices_notified,
+            invalid_tokens=result.invalid_tokens,
+            fcm_errors=result.fcm_errors,
+        )
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self.process(job)
+            finally:
+                self._queue.task_done()
+
+
+# Worker compartido por toda la aplicación; se inicia y detiene en el ciclo de vida de FastAPI
+push_delivery_worker = PushDeliveryWorker()
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from dataBase import get_db_session
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataBase import get_async_db_session
 import logging
-from use_cases.get_notifications_use_case import GetNotificationsUseCase
-from domain.services.notification_service import NotificationService
-from adapters.persistence.notification_repository import NotificationRepository
+from use_cases.get_notifications_use_case import AsyncGetNotificationsUseCase
+from domain.services.async_notification_service import AsyncNotificationService
+from adapters.persistence.async_notification_repository import AsyncNotificationRepository
+from utils.notification_cursor import NOTIFICATION_PAGE_MAX_LIMIT
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +22,23 @@ router = APIRouter()
                 "application/json": {
                     "examples": {
                         "con_notificaciones": {
-                            "summary": "Con notificaciones",
+                            "summary": "Página de notificaciones",
                             "value": {
                                 "status": "success",
                                 "message": "Notificaciones obtenidas exitosamente.",
-                                "data": [
-                                    {
-                                        "notification_id": 1,
-                                        "message": "Tienes una nueva invitación",
-                                        "notification_date": "2024-06-01T12:34:56.789Z",
-                                        "invitation_id": 123,
-                                        "notification_type": "Invitation",
-                                        "notification_state": "Pendiente"
-                                    }
-                                ]
+                                "data": {
+                                    "notifications": [
+                                        {
+                                            "notification_id": 1,
+                                            "message": "Tienes una nueva invitación",
+                                            "notification_date": "2024-06-01T12:34:56.789Z",
+                                            "invitation_id": 123,
+                                            "notification_type": "Invitation",
+                                            "notification_state": "Pendiente"
+                                        }
+                                    ],
+                                    "next_cursor": "WyIyMDI0LTA2LTAxVDEyOjM0OjU2Ljc4OTAwMCswMDowMCIsMV0"
+                                }
                             }
                         },
                         "sin_notificaciones": {
@@ -41,7 +46,7 @@ router = APIRouter()
                             "value": {
                                 "status": "success",
                                 "message": "No hay notificaciones para este usuario.",
-                                "data": []
+                                "data": {"notifications": [], "next_cursor": None}
                             }
                         },
                         "token_invalido": {
@@ -58,20 +63,28 @@ router = APIRouter()
         }
     }
 )
-def get_notifications_endpoint(session_token: str, db: Session = Depends(get_db_session)):
+async def get_notifications_endpoint(
+    session_token: str,
+    limit: Optional[int] = Query(None, ge=1, le=NOTIFICATION_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session)
+):
     """
     Endpoint para obtener las notificaciones de un usuario autenticado.
 
     Parámetros:
     - session_token: Token de sesión del usuario.
+    - limit: Tamaño de página (opcional, NOTIFICATION_PAGE_DEFAULT_LIMIT por defecto). La respuesta
+      siempre se pagina, de la más reciente a la más antigua, y `data` es `{"notifications": [...], "next_cursor": ...}`.
+    - cursor: Valor `next_cursor` de la página anterior (opcional).
     - db: Sesión de la base de datos (inyectada automáticamente).
 
     Retorna:
     - Respuesta con las notificaciones del usuario.
     """
     # Create dependencies: Repository -> Service -> Use Case
-    notification_repository = NotificationRepository(db)
-    notification_service = NotificationService(notification_repository)
-    use_case = GetNotificationsUseCase(notification_service)
+    notification_repository = AsyncNotificationRepository(db)
+    notification_service = AsyncNotificationService(notification_repository)
+    use_case = AsyncGetNotificationsUseCase(notification_service)
     
-    return use_case.execute(session_token) 
\ No newline at end of file
+    return await use_case.execute(session_token, limit, cursor) 
\ No newline at end of file
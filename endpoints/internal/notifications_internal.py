@@ -1,55 +1,91 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from dataBase import get_db_session
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataBase import get_db_session, get_async_db_session, AsyncSessionLocal
 from utils.response import create_response
+from utils.ndjson import encode_ndjson, NDJSON_MEDIA_TYPE
 from domain.schemas import (
     UpdateNotificationStateRequest,
+    BulkUpdateNotificationStateRequest,
+    InvitationIdsRequest,
     SendNotificationRequest,
+    BulkSendNotificationRequest,
+    SessionTokenInvalidationRequest,
 )
-from domain.services.notification_service import NotificationService, NotificationNotFoundError
-from adapters.persistence.notification_repository import NotificationRepository
+from domain.services.notification_service import NotificationNotFoundError
+from domain.services.delivery_status_service import DeliveryStatusService
+from domain.services.async_notification_service import AsyncNotificationService
+from domain.services.push_delivery_worker import push_delivery_worker, DELIVERY_QUEUED
+from domain.services.notification_insert_batcher import NotificationInsertBatcher, NOTIFICATION_INSERT_BATCHING_ENABLED
+from domain.services.outbox_dispatcher import OUTBOX_DISPATCHER_ENABLED
+from adapters.persistence.async_notification_repository import AsyncNotificationRepository
+from adapters.persistence.outbox_repository import OutboxRepository
+from adapters.persistence.reference_data_cache import reference_data
+from adapters.http.user_service_adapter import (
+    invalidate_session_token,
+    invalidate_user_devices,
+    get_user_service_circuit_state,
+)
+from domain.repositories.outbox_repository import OUTBOX_PENDING
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def get_notification_service(db: Session = Depends(get_db_session)) -> NotificationService:
-    """Dependency injection for notification service"""
-    repository = NotificationRepository(db)
-    return NotificationService(repository)
+# Colector de inserciones por lotes para /send-notification; desactivado por defecto
+notification_insert_batcher = NotificationInsertBatcher(AsyncSessionLocal) if NOTIFICATION_INSERT_BATCHING_ENABLED else None
+
+def get_delivery_status_service(db: Session = Depends(get_db_session)) -> DeliveryStatusService:
+    """Dependency injection for the delivery status service"""
+    return DeliveryStatusService(
+        push_delivery_worker=push_delivery_worker,
+        outbox_repository=OutboxRepository(db)
+    )
+
+def get_async_notification_service(db: AsyncSession = Depends(get_async_db_session)) -> AsyncNotificationService:
+    """Dependency injection for the async notification service"""
+    return AsyncNotificationService(
+        AsyncNotificationRepository(db),
+        push_delivery_worker=push_delivery_worker,
+        insert_batcher=notification_insert_batcher,
+        outbox_enabled=OUTBOX_DISPATCHER_ENABLED
+    )
 
 @router.get("/notification-states", include_in_schema=False)
-def get_notification_states(service: NotificationService = Depends(get_notification_service)):
+async def get_notification_states(service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Devuelve todos los estados de notificación.
     """
     try:
-        states = service.get_all_notification_states()
+        states = await service.get_all_notification_states()
         return [{"notification_state_id": s.notification_state_id, "name": s.name} for s in states]
     except Exception as e:
         logger.error(f"Error obteniendo estados de notificación: {str(e)}")
         return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
 
 @router.get("/notification-types", include_in_schema=False)
-def get_notification_types(service: NotificationService = Depends(get_notification_service)):
+async def get_notification_types(service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Devuelve todos los tipos de notificación.
     """
     try:
-        types = service.get_all_notification_types()
+        types = await service.get_all_notification_types()
         return [{"notification_type_id": t.notification_type_id, "name": t.name} for t in types]
     except Exception as e:
         logger.error(f"Error obteniendo tipos de notificación: {str(e)}")
         return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
 
 @router.get("/notifications", include_in_schema=False)
-def get_all_notifications(service: NotificationService = Depends(get_notification_service)):
+async def get_all_notifications(service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Devuelve todas las notificaciones.
     """
     try:
-        notifications = service.get_all_notifications()
+        notifications = await service.get_all_notifications()
         return [
             {
                 "notification_id": n.notification_id,
@@ -66,25 +102,98 @@ def get_all_notifications(service: NotificationService = Depends(get_notificatio
         logger.error(f"Error obteniendo todas las notificaciones: {str(e)}")
         return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
 
+async def _notifications_ndjson(
+    notification_type_id: Optional[int],
+    notification_state_id: Optional[int],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+):
+    """
+    Genera la exportación NDJSON lote a lote. Usa su propia sesión porque el cuerpo
+    de un StreamingResponse se envía después de cerrar las dependencias de la solicitud.
+    """
+    async with AsyncSessionLocal() as db:
+        service = AsyncNotificationService(AsyncNotificationRepository(db))
+        try:
+            async for batch in service.stream_notifications(
+                notification_type_id, notification_state_id, date_from, date_to
+            ):
+                yield encode_ndjson(batch)
+        except Exception as e:
+            # El estado HTTP ya se envió: se registra el error y se corta la respuesta
+            logger.error(f"Error exportando notificaciones: {str(e)}")
+            raise
+
+@router.get("/notifications/export", include_in_schema=False)
+async def export_notifications(
+    notification_type_id: Optional[int] = None,
+    notification_state_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """
+    Exporta las notificaciones como NDJSON (una notificación por línea), leyendo la tabla
+    con un cursor del servidor. La memoria usada no depende del número de filas.
+
+    Filtros opcionales: tipo, estado y rango de fechas [date_from, date_to).
+    """
+    try:
+        invalid_range = bool(date_from and date_to and date_from >= date_to)
+    except TypeError:
+        # Una fecha con zona horaria y otra sin ella no se pueden comparar
+        invalid_range = True
+    if invalid_range:
+        return create_response("error", "Rango de fechas inválido: date_from debe ser anterior a date_to", status_code=400)
+    return StreamingResponse(
+        _notifications_ndjson(notification_type_id, notification_state_id, date_from, date_to),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+@router.post("/notifications/by-invitation/lookup", include_in_schema=False)
+async def get_notifications_by_invitations(request: InvitationIdsRequest, service: AsyncNotificationService = Depends(get_async_notification_service)):
+    """
+    Devuelve el notification_id asociado a cada una de varias invitaciones, con una sola consulta.
+    Las invitaciones sin notificación aparecen con null.
+    """
+    try:
+        result = await service.get_notifications_by_invitations(request.invitation_ids)
+        return {"notification_ids": result.notification_ids}
+    except Exception as e:
+        logger.error(f"Error obteniendo notificaciones de {len(request.invitation_ids)} invitaciones: {str(e)}")
+        return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
+
+@router.post("/notifications/by-invitation/delete", include_in_schema=False)
+async def delete_notifications_by_invitations(request: InvitationIdsRequest, service: AsyncNotificationService = Depends(get_async_notification_service)):
+    """
+    Elimina las notificaciones de tipo 'Invitation' de varias invitaciones con una sola sentencia.
+    Devuelve el total eliminado y el número eliminado por invitación.
+    """
+    try:
+        result = await service.delete_notifications_by_invitations(request.invitation_ids)
+        return create_response("success", f"{result.deleted_count} notificaciones eliminadas exitosamente.", result)
+    except Exception as e:
+        logger.error(f"Error eliminando notificaciones de {len(request.invitation_ids)} invitaciones: {str(e)}")
+        return create_response("error", f"Error interno del servidor al eliminar notificaciones: {str(e)}", status_code=500)
+
 @router.get("/notifications/by-invitation/{invitation_id}", include_in_schema=False)
-def get_notification_by_invitation(invitation_id: int, service: NotificationService = Depends(get_notification_service)):
+async def get_notification_by_invitation(invitation_id: int, service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Devuelve el notification_id asociado a una invitación.
     """
     try:
-        result = service.get_notification_by_invitation(invitation_id)
+        result = await service.get_notification_by_invitation(invitation_id)
         return {"notification_id": result.notification_id}
     except Exception as e:
         logger.error(f"Error obteniendo notificación por invitation_id {invitation_id}: {str(e)}")
         return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
 
 @router.delete("/notifications/by-invitation/{invitation_id}", include_in_schema=False)
-def delete_notifications_by_invitation(invitation_id: int, service: NotificationService = Depends(get_notification_service)):
+async def delete_notifications_by_invitation(invitation_id: int, service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Elimina todas las notificaciones de tipo 'Invitation' asociadas a una invitación.
     """
     try:
-        result = service.delete_notifications_by_invitation(invitation_id)
+        result = await service.delete_notifications_by_invitation(invitation_id)
         
         if result.deleted_count == 0:
             return create_response("success", "No se encontraron notificaciones para eliminar.", {"deleted_count": 0}, status_code=200)
@@ -96,12 +205,12 @@ def delete_notifications_by_invitation(invitation_id: int, service: Notification
         return create_response("error", f"Error interno del servidor al eliminar notificaciones: {str(e)}", status_code=500)
 
 @router.patch("/notifications/{notification_id}/state", include_in_schema=False)
-def update_notification_state(notification_id: int, request: UpdateNotificationStateRequest, service: NotificationService = Depends(get_notification_service)):
+async def update_notification_state(notification_id: int, request: UpdateNotificationStateRequest, service: AsyncNotificationService = Depends(get_async_notification_service)):
     """
     Actualiza el estado de una notificación.
     """
     try:
-        service.update_notification_state(notification_id, request.notification_state_id)
+        await service.update_notification_state(notification_id, request.notification_state_id)
         return create_response("success", "Estado de notificación actualizado")
     except NotificationNotFoundError:
         return create_response("error", "Notificación no encontrada", status_code=404)
@@ -109,20 +218,53 @@ def update_notification_state(notification_id: int, request: UpdateNotificationS
         logger.error(f"Error actualizando estado de notificación {notification_id}: {str(e)}")
         return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
 
+@router.patch("/notifications/state", include_in_schema=False)
+async def update_notifications_state(request: BulkUpdateNotificationStateRequest, service: AsyncNotificationService = Depends(get_async_notification_service)):
+    """
+    Actualiza el estado de varias notificaciones con un único UPDATE: las indicadas en
+    notification_ids, o todas las de user_id (solo las que están en from_state_id, si se indica).
+    Devuelve los ids de las notificaciones que cambiaron de estado.
+    """
+    try:
+        result = await service.update_notifications_state(request)
+        return create_response("success", f"{result.updated_count} notificaciones actualizadas", result)
+    except ValueError as e:
+        return create_response("error", str(e), status_code=400)
+    except Exception as e:
+        logger.error(f"Error actualizando el estado de varias notificaciones: {str(e)}")
+        return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
+
 
 
 @router.post("/send-notification", include_in_schema=False)
-def send_notification_endpoint(
+async def send_notification_endpoint(
     request: SendNotificationRequest,
-    service: NotificationService = Depends(get_notification_service)
+    service: AsyncNotificationService = Depends(get_async_notification_service)
 ):
     """
     Endpoint para enviar una notificación.
     Guarda la notificación en la base de datos y envía una notificación FCM
     a todos los dispositivos del usuario recuperados del servicio de usuarios.
+
+    Con delivery_mode="background" responde apenas la notificación queda guardada
+    y el envío FCM se realiza en segundo plano. Con delivery_mode="outbox" el envío
+    queda registrado en el outbox dentro de la misma transacción y lo realiza el
+    despachador. En ambos casos el resultado se consulta en
+    /notifications/{notification_id}/delivery-status.
     """
     try:
-        result = service.send_notification(request)
+        result = await service.send_notification(request)
+        
+        if result.delivery_status in (DELIVERY_QUEUED, OUTBOX_PENDING):
+            return create_response(
+                "success",
+                "Notificación guardada, envío FCM en segundo plano",
+                {
+                    "notification_id": result.notification_id,
+                    "delivery_status": result.delivery_status
+                },
+                status_code=202
+            )
         
         if result.devices_notified == 0:
             return create_response(
@@ -148,4 +290,77 @@ def send_notification_endpoint(
         
     except Exception as e:
         logger.error(f"Error enviando notificación: {str(e)}")
-        return create_response("error", f"Error al enviar la notificación: {str(e)}", status_code=500) 
\ No newline at end of file
+        return create_response("error", f"Error al enviar la notificación: {str(e)}", status_code=500) 
+
+@router.post("/send-notifications/bulk", include_in_schema=False)
+async def send_bulk_notification_endpoint(
+    request: BulkSendNotificationRequest,
+    service: AsyncNotificationService = Depends(get_async_notification_service)
+):
+    """
+    Endpoint para enviar la misma notificación a muchos usuarios.
+    Guarda todas las notificaciones con un único INSERT multi-fila, resuelve los
+    dispositivos por lotes y envía el FCM en bloques multicast.
+    """
+    try:
+        result = await service.send_bulk_notification(request)
+        return create_response(
+            "success",
+            f"{result.notifications_created} notificaciones guardadas, {result.devices_notified} dispositivos notificados",
+            result
+        )
+    except ValueError as e:
+        return create_response("error", str(e), status_code=400)
+    except Exception as e:
+        logger.error(f"Error enviando notificación masiva: {str(e)}")
+        return create_response("error", f"Error al enviar la notificación masiva: {str(e)}", status_code=500)
+
+@router.get("/notifications/{notification_id}/delivery-status", include_in_schema=False)
+def get_delivery_status(notification_id: int, service: DeliveryStatusService = Depends(get_delivery_status_service)):
+    """
+    Devuelve el resultado del envío FCM en segundo plano o por outbox de una notificación.
+    """
+    try:
+        status = service.get_delivery_status(notification_id)
+        if not status:
+            return create_response("error", "No hay estado de envío para esta notificación", status_code=404)
+        return create_response("success", "Estado de envío obtenido", status)
+    except Exception as e:
+        logger.error(f"Error obteniendo estado de envío de la notificación {notification_id}: {str(e)}")
+        return create_response("error", f"Error interno del servidor: {str(e)}", status_code=500)
+
+@router.post("/session-cache/invalidate", include_in_schema=False)
+def invalidate_session_cache(request: SessionTokenInvalidationRequest):
+    """
+    Elimina un token de sesión de la caché de verificaciones.
+    El servicio de usuarios lo llama al cerrar o revocar una sesión.
+    """
+    invalidate_session_token(request.session_token)
+    return create_response("success", "Token de sesión eliminado de la caché")
+
+@router.post("/device-cache/{user_id}/invalidate", include_in_schema=False)
+def invalidate_device_cache(user_id: int):
+    """
+    Elimina de la caché los dispositivos de un usuario.
+    El servicio de usuarios lo llama al registrar o eliminar un dispositivo.
+    """
+    invalidate_user_devices(user_id)
+    return create_response("success", "Dispositivos del usuario eliminados de la caché")
+
+@router.get("/health/user-service", include_in_schema=False)
+def get_user_service_health():
+    """
+    Devuelve el estado del circuit breaker del servicio de usuarios
+    (closed, open o half_open) y sus contadores, para monitoreo.
+    """
+    return create_response("success", "Estado del servicio de usuarios obtenido", get_user_service_circuit_state())
+
+@router.post("/reference-data/reload", include_in_schema=False)
+async def reload_reference_data(db: AsyncSession = Depends(get_async_db_session)):
+    """
+    Recarga la caché de tipos y estados de notificación. Llamar después de modificar
+    las tablas notification_types o notification_states.
+    """
+    if not await reference_data.refresh_async(db):
+        return create_response("error", "No se pudieron recargar los datos de referencia", status_code=503)
+    return create_response("success", "Datos de referencia recargados")
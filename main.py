@@ -1,14 +1,60 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from endpoints.external import notifications_external
 from endpoints.internal import notifications_internal
+from domain.services.push_delivery_worker import push_delivery_worker
+from domain.services.outbox_dispatcher import OutboxDispatcher, OUTBOX_DISPATCHER_ENABLED
+from adapters.http.user_service_adapter import close_http_client, close_async_http_client
+from adapters.persistence.reference_data_cache import reference_data
+from dataBase import (
+    SessionLocal,
+    AsyncSessionLocal,
+    engine,
+    async_engine,
+    warm_up_pool,
+    warm_up_async_pool,
+    DB_WARMUP_CONNECTIONS,
+)
 from utils.logger import setup_logger
 
-app = FastAPI()
-
 # Setup logging for the entire application
 logger = setup_logger()
 logger.info("Starting CoffeeTech Notification Service")
 
+# Despachador del outbox de entregas FCM
+outbox_dispatcher = OutboxDispatcher(SessionLocal)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicia los trabajadores en segundo plano al arrancar y los detiene al apagar.
+    Con DB_WARMUP_CONNECTIONS > 0 abre antes esas conexiones en cada pool.
+    Precarga los tipos y estados de notificación; si la base de datos no responde,
+    se cargarán con la primera consulta.
+    """
+    if DB_WARMUP_CONNECTIONS > 0:
+        await asyncio.gather(
+            asyncio.to_thread(warm_up_pool, engine, DB_WARMUP_CONNECTIONS),
+            warm_up_async_pool(async_engine, DB_WARMUP_CONNECTIONS)
+        )
+    async with AsyncSessionLocal() as db:
+        await reference_data.preload_async(db)
+    push_delivery_worker.start()
+    if OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+    yield
+    if notifications_internal.notification_insert_batcher:
+        await notifications_internal.notification_insert_batcher.close()
+    outbox_dispatcher.stop()
+    push_delivery_worker.stop()
+    close_http_client()
+    await close_async_http_client()
+    await async_engine.dispose()
+    engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+
 # Incluir las rutas de notificaciones externas (clientes móvil/web)
 app.include_router(notifications_external.router, prefix="/notification", tags=["Notificaciones"])
 
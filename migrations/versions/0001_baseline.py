@@ -0,0 +1,56 @@
+"""Esquema inicial: estados, tipos y notificaciones
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Las bases de datos creadas antes de usar migraciones ya tienen estas tablas:
+márcalas con `alembic stamp 0001` en lugar de aplicar esta revisión.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_states",
+        sa.Column("notification_state_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=45), nullable=False, unique=True),
+    )
+    op.create_table(
+        "notification_types",
+        sa.Column("notification_type_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=255), nullable=False, unique=True),
+    )
+    op.create_table(
+        "notifications",
+        sa.Column("notification_id", sa.Integer(), primary_key=True),
+        sa.Column("message", sa.String(length=255), nullable=True),
+        sa.Column("notification_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("invitation_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "notification_type_id",
+            sa.Integer(),
+            sa.ForeignKey("notification_types.notification_type_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "notification_state_id",
+            sa.Integer(),
+            sa.ForeignKey("notification_states.notification_state_id"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notifications")
+    op.drop_table("notification_types")
+    op.drop_table("notification_states")
@@ -0,0 +1,69 @@
+"""Índices para las consultas de los repositorios
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+Cada índice corresponde a una consulta de AsyncNotificationRepository / OutboxRepository.
+Se crean con CONCURRENTLY para no bloquear escrituras en tablas ya pobladas, por eso
+van fuera de la transacción de la migración.
+
+notification_types.name no necesita índice propio: su restricción UNIQUE ya crea uno.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Notificaciones de un usuario y feed paginado por (notification_date, notification_id)
+        op.create_index(
+            "ix_notifications_user_date_id",
+            "notifications",
+            ["user_id", sa.text("notification_date DESC"), sa.text("notification_id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Búsqueda y borrado de la notificación de una invitación
+        op.create_index(
+            "ix_notifications_invitation_type",
+            "notifications",
+            ["invitation_id", "notification_type_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Reclamo de entregas pendientes en orden (SELECT ... FOR UPDATE SKIP LOCKED)
+        op.create_index(
+            "ix_notification_outbox_pending",
+            "notification_outbox",
+            ["outbox_id"],
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Estado de entrega por notificación y borrado en cascada desde notifications
+        op.create_index(
+            "ix_notification_outbox_notification_id",
+            "notification_outbox",
+            ["notification_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_notification_outbox_notification_id", table_name="notification_outbox",
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_notification_outbox_pending", table_name="notification_outbox",
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_notifications_invitation_type", table_name="notifications",
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_notifications_user_date_id", table_name="notifications",
+                      postgresql_concurrently=True, if_exists=True)
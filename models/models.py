@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -31,3 +31,36 @@ class Notifications(Base):
 
     notification_type = relationship("NotificationTypes")
     state = relationship("NotificationStates")
+
+    # Índices creados por la migración 0003 (migrations/versions)
+    __table_args__ = (
+        # Feed paginado por usuario: WHERE user_id = ? AND (notification_date, notification_id) < (?, ?)
+        Index("ix_notifications_user_date_id", "user_id", notification_date.desc(), notification_id.desc()),
+        # Notificación de una invitación: WHERE invitation_id = ? AND notification_type_id = ?
+        Index("ix_notifications_invitation_type", "invitation_id", "notification_type_id"),
+    )
+
+# Notification Outbox: pending FCM deliveries, written in the same transaction as the notification
+class NotificationOutbox(Base):
+    __tablename__ = 'notification_outbox'
+    outbox_id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, ForeignKey('notifications.notification_id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    fcm_title = Column(String(255), nullable=True)
+    fcm_body = Column(Text, nullable=True)
+    fcm_token = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    devices_notified = Column(Integer, nullable=True)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    notification = relationship("Notifications")
+
+    __table_args__ = (
+        # Reclamo de entregas pendientes: WHERE status = 'pending' ... ORDER BY outbox_id
+        Index("ix_notification_outbox_pending", "outbox_id", postgresql_where=text("status = 'pending'")),
+        Index("ix_notification_outbox_notification_id", "notification_id"),
+    )
@@ -0,0 +1,534 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from adapters.http import user_service_adapter
+from adapters.http.user_service_adapter import (
+    verify_session_token,
+    verify_session_token_async,
+    get_user_devices_by_user_id,
+    get_user_devices_by_user_id_async,
+    get_devices_by_user_ids,
+    get_http_client,
+    close_http_client,
+    invalidate_session_token,
+    clear_session_cache,
+    invalidate_user_devices,
+    evict_device_tokens,
+    clear_device_cache,
+    user_service_circuit,
+    get_user_service_circuit_state,
+    DeviceLookupError,
+)
+from utils.circuit_breaker import CIRCUIT_OPEN
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Every test starts and ends with empty session and device caches and a closed circuit"""
+    clear_session_cache()
+    clear_device_cache()
+    user_service_circuit.reset()
+    yield
+    clear_session_cache()
+    clear_device_cache()
+    user_service_circuit.reset()
+
+
+@pytest.fixture
+def mock_transport():
+    """Install a shared client backed by an in-memory transport and record every request"""
+    requests = []
+    responses = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[request.url.path](request)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with patch.object(user_service_adapter, "_http_client", client):
+        yield requests, responses
+    client.close()
+
+
+@pytest.fixture
+def mock_async_transport():
+    """Install a shared async client backed by an in-memory transport and record every request"""
+    requests = []
+    responses = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[request.url.path](request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(user_service_adapter, "_async_http_client", client):
+        yield requests, responses
+
+
+class TestSharedHttpClient:
+    """Test suite for the pooled user-service HTTP client"""
+
+    def test_client_is_created_once(self):
+        """Test that every caller gets the same pooled client"""
+        with patch.object(user_service_adapter, "_http_client", None):
+            client = get_http_client()
+            try:
+                assert get_http_client() is client
+            finally:
+                close_http_client()
+            assert user_service_adapter._http_client is None
+
+    def test_client_uses_configured_limits(self):
+        """Test that pool limits and timeout come from the settings"""
+        with patch.object(user_service_adapter, "_http_client", None), \
+             patch.object(user_service_adapter, "USER_SERVICE_MAX_CONNECTIONS", 7), \
+             patch.object(user_service_adapter, "USER_SERVICE_TIMEOUT", 1.5), \
+             patch("adapters.http.user_service_adapter.httpx.Client") as mock_client:
+            get_http_client()
+            user_service_adapter._http_client = None
+
+            kwargs = mock_client.call_args.kwargs
+            assert kwargs["timeout"] == 1.5
+            assert kwargs["limits"].max_connections == 7
+            assert kwargs["http2"] is False
+
+    def test_http2_falls_back_without_h2(self):
+        """Test that HTTP/2 is only enabled when the h2 package is installed"""
+        with patch.object(user_service_adapter, "USER_SERVICE_HTTP2", True), \
+             patch("adapters.http.user_service_adapter.find_spec", return_value=None):
+            assert user_service_adapter._http2_enabled() is False
+
+    def test_close_without_client(self):
+        """Test that closing twice is harmless"""
+        with patch.object(user_service_adapter, "_http_client", None):
+            close_http_client()
+            close_http_client()
+
+
+class TestVerifySessionToken:
+    """Test suite for verify_session_token"""
+
+    def test_valid_token(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": {"user": {"user_id": 1, "name": "Ana", "email": "ana@example.com"}}}
+        )
+
+        user = verify_session_token("token")
+
+        assert user["user_id"] == 1
+        assert requests[0].method == "POST"
+
+    def test_invalid_token(self, mock_transport):
+        _, responses = mock_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(
+            401, json={"status": "error", "message": "Token inválido"}
+        )
+
+        assert verify_session_token("token") is None
+
+    def test_network_error(self, mock_transport):
+        _, responses = mock_transport
+
+        def fail(request):
+            raise httpx.ConnectError("connection refused")
+
+        responses["/users-service/session-token-verification"] = fail
+
+        assert verify_session_token("token") is None
+
+
+class TestSessionTokenCache:
+    """Test suite for the session-token verification cache"""
+
+    @pytest.fixture
+    def verification_calls(self, mock_transport):
+        requests, responses = mock_transport
+        status = {"code": 200}
+
+        def verify(request):
+            if status["code"] == 200:
+                return httpx.Response(200, json={"status": "success", "data": {"user": {"user_id": 1, "name": "Ana"}}})
+            return httpx.Response(status["code"], json={"status": "error"})
+
+        responses["/users-service/session-token-verification"] = verify
+        return requests, status
+
+    def test_valid_token_is_cached(self, verification_calls):
+        requests, _ = verification_calls
+
+        assert verify_session_token("token")["user_id"] == 1
+        assert verify_session_token("token")["user_id"] == 1
+        assert len(requests) == 1
+
+    def test_cache_is_keyed_on_token_hash(self, verification_calls):
+        verify_session_token("token")
+
+        assert "token" not in user_service_adapter._session_cache
+        assert len(user_service_adapter._session_cache) == 1
+
+    def test_invalid_token_is_negatively_cached(self, verification_calls):
+        requests, status = verification_calls
+        status["code"] = 401
+
+        assert verify_session_token("token") is None
+        assert verify_session_token("token") is None
+        assert len(requests) == 1
+
+    def test_server_errors_are_not_cached(self, verification_calls):
+        requests, status = verification_calls
+        status["code"] = 503
+
+        assert verify_session_token("token") is None
+        assert verify_session_token("token") is None
+        assert len(requests) == 2
+
+    def test_invalidate_session_token(self, verification_calls):
+        requests, _ = verification_calls
+
+        verify_session_token("token")
+        invalidate_session_token("token")
+        verify_session_token("token")
+
+        assert len(requests) == 2
+
+
+class TestLocalVerificationFallback:
+    """Test suite for the interaction between local and remote verification"""
+
+    def test_locally_valid_token_skips_user_service(self, mock_transport):
+        requests, _ = mock_transport
+        user = {"user_id": 42, "name": "Ana", "email": None}
+
+        with patch("adapters.http.user_service_adapter.verify_session_token_locally", return_value=("valid", user)):
+            assert verify_session_token("signed") == user
+        assert requests == []
+
+    def test_locally_invalid_token_skips_user_service(self, mock_transport):
+        requests, _ = mock_transport
+
+        with patch("adapters.http.user_service_adapter.verify_session_token_locally", return_value=("invalid", None)):
+            assert verify_session_token("signed") is None
+        assert requests == []
+
+    def test_opaque_token_is_verified_remotely(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": {"user": {"user_id": 1, "name": "Ana"}}}
+        )
+
+        with patch("adapters.http.user_service_adapter.verify_session_token_locally", return_value=("not_local", None)):
+            assert verify_session_token("opaque")["user_id"] == 1
+        assert len(requests) == 1
+
+
+class TestGetUserDevices:
+    """Test suite for get_user_devices_by_user_id"""
+
+    def test_devices_found(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"user_device_id": 1, "user_id": 5, "fcm_token": "abc"}]}
+        )
+
+        devices = get_user_devices_by_user_id(5)
+
+        assert devices == [{"user_device_id": 1, "user_id": 5, "fcm_token": "abc"}]
+        assert requests[0].method == "GET"
+
+    def test_error_status_returns_empty_list(self, mock_transport):
+        _, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(500, text="boom")
+
+        assert get_user_devices_by_user_id(5) == []
+
+    def test_error_status_raises_when_asked(self, mock_transport):
+        """Test that callers able to retry can tell a failed lookup from a user without devices"""
+        _, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(500, text="boom")
+
+        with pytest.raises(DeviceLookupError):
+            get_user_devices_by_user_id(5, raise_on_error=True)
+
+    def test_concurrent_lookups_share_one_request(self, mock_transport):
+        """Test that simultaneous lookups for one user hit the user service once"""
+        requests, responses = mock_transport
+        release = threading.Event()
+
+        def slow_devices(request):
+            release.wait(5)
+            return httpx.Response(200, json={"status": "success", "data": [{"fcm_token": "abc"}]})
+
+        responses["/users-service/users/5/devices"] = slow_devices
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(get_user_devices_by_user_id, 5) for _ in range(4)]
+            flight = user_service_adapter._devices_flight
+            deadline = time.monotonic() + 5
+            while (not flight._calls or flight._calls[5].waiters < 3) and time.monotonic() < deadline:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        assert len(requests) == 1
+        assert all(result == [{"fcm_token": "abc"}] for result in results)
+
+    def test_devices_are_cached(self, mock_transport):
+        """Test that back-to-back lookups for one user need a single request"""
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "abc"}]}
+        )
+
+        get_user_devices_by_user_id(5)
+        get_user_devices_by_user_id(5)
+
+        assert len(requests) == 1
+
+    def test_failed_lookups_are_not_cached(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(503, text="unavailable")
+
+        get_user_devices_by_user_id(5)
+        get_user_devices_by_user_id(5)
+
+        assert len(requests) == 2
+
+    def test_invalidate_user_devices(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": []}
+        )
+
+        get_user_devices_by_user_id(5)
+        invalidate_user_devices(5)
+        get_user_devices_by_user_id(5)
+
+        assert len(requests) == 2
+
+    def test_evict_device_tokens(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "good"}, {"fcm_token": "dead"}]}
+        )
+
+        get_user_devices_by_user_id(5)
+        evict_device_tokens(5, ["dead"])
+
+        assert get_user_devices_by_user_id(5) == [{"fcm_token": "good"}]
+        assert len(requests) == 1
+
+
+class TestGetDevicesByUserIds:
+    """Test suite for the batched device lookup"""
+
+    BATCH_PATH = "/users-service/users/devices/batch"
+
+    def test_batch_response_grouped_by_user(self, mock_transport):
+        """Test that a flat device list is grouped per user and missing users get no devices"""
+        requests, responses = mock_transport
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(200, json={"status": "success", "data": [
+            {"user_id": 1, "fcm_token": "a"},
+            {"user_id": 1, "fcm_token": "b"},
+            {"user_id": 2, "fcm_token": "c"},
+        ]})
+
+        devices = get_devices_by_user_ids([1, 2, 3, 1])
+
+        assert devices == {
+            1: [{"user_id": 1, "fcm_token": "a"}, {"user_id": 1, "fcm_token": "b"}],
+            2: [{"user_id": 2, "fcm_token": "c"}],
+            3: [],
+        }
+        assert len(requests) == 1
+        assert json.loads(requests[0].content) == {"user_ids": [1, 2, 3]}
+
+    def test_batch_response_keyed_by_user(self, mock_transport):
+        _, responses = mock_transport
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": {"1": [{"fcm_token": "a"}]}}
+        )
+
+        assert get_devices_by_user_ids([1, 2]) == {1: [{"fcm_token": "a"}], 2: []}
+
+    def test_requests_are_chunked(self, mock_transport):
+        requests, responses = mock_transport
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(200, json={"status": "success", "data": []})
+
+        with patch.object(user_service_adapter, "DEVICE_BATCH_SIZE", 2):
+            devices = get_devices_by_user_ids([1, 2, 3, 4, 5])
+
+        assert [json.loads(request.content)["user_ids"] for request in requests] == [[1, 2], [3, 4], [5]]
+        assert set(devices) == {1, 2, 3, 4, 5}
+
+    def test_cached_users_are_not_requested(self, mock_transport):
+        requests, responses = mock_transport
+        responses["/users-service/users/1/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "a"}]}
+        )
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(200, json={"status": "success", "data": []})
+        get_user_devices_by_user_id(1)
+
+        devices = get_devices_by_user_ids([1, 2])
+
+        assert devices == {1: [{"fcm_token": "a"}], 2: []}
+        assert json.loads(requests[-1].content) == {"user_ids": [2]}
+
+    def test_falls_back_to_per_user_calls_without_batch_route(self, mock_transport):
+        """Test that a missing batch route degrades to per-user lookups and is not retried right away"""
+        requests, responses = mock_transport
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(404, text="not found")
+        for user_id in (1, 2):
+            responses[f"/users-service/users/{user_id}/devices"] = lambda request, user_id=user_id: httpx.Response(
+                200, json={"status": "success", "data": [{"fcm_token": f"t{user_id}"}]}
+            )
+
+        assert get_devices_by_user_ids([1, 2]) == {1: [{"fcm_token": "t1"}], 2: [{"fcm_token": "t2"}]}
+        invalidate_user_devices(1)
+        invalidate_user_devices(2)
+        get_devices_by_user_ids([1, 2])
+
+        batch_requests = [request for request in requests if request.url.path == self.BATCH_PATH]
+        assert len(batch_requests) == 1
+        assert len(requests) == 5
+
+    def test_failed_batch_falls_back_for_that_chunk(self, mock_transport):
+        requests, responses = mock_transport
+        responses[self.BATCH_PATH] = lambda request: httpx.Response(503, text="unavailable")
+        responses["/users-service/users/1/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "a"}]}
+        )
+
+        assert get_devices_by_user_ids([1]) == {1: [{"fcm_token": "a"}]}
+        assert [request.url.path for request in requests] == [self.BATCH_PATH, "/users-service/users/1/devices"]
+
+
+class TestUserServiceCircuit:
+    """Test suite for the circuit breaker around user-service calls"""
+
+    @pytest.fixture
+    def open_threshold(self):
+        with patch.object(user_service_circuit, "failure_threshold", 2):
+            yield
+
+    def test_circuit_opens_and_fails_fast(self, mock_transport, open_threshold):
+        """Test that repeated 5xx responses stop further requests"""
+        requests, responses = mock_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(503, text="down")
+
+        for token in ("t1", "t2", "t3", "t4"):
+            assert verify_session_token(token) is None
+
+        assert len(requests) == 2
+        state = get_user_service_circuit_state()
+        assert state["state"] == CIRCUIT_OPEN
+        assert state["rejected_calls"] == 2
+
+    def test_client_errors_do_not_open_the_circuit(self, mock_transport, open_threshold):
+        requests, responses = mock_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(401, text="invalid")
+
+        for token in ("t1", "t2", "t3"):
+            verify_session_token(token)
+
+        assert len(requests) == 3
+        assert user_service_circuit.state != CIRCUIT_OPEN
+
+    def test_network_errors_open_the_circuit(self, mock_transport, open_threshold):
+        requests, responses = mock_transport
+
+        def unreachable(request):
+            raise httpx.ConnectTimeout("timeout", request=request)
+
+        responses["/users-service/users/5/devices"] = unreachable
+        get_user_devices_by_user_id(5)
+        get_user_devices_by_user_id(5)
+        get_user_devices_by_user_id(5)
+
+        assert len(requests) == 2
+        assert user_service_circuit.state == CIRCUIT_OPEN
+
+    def test_stale_devices_served_while_open(self, mock_transport, open_threshold):
+        """Test that an expired device list is still used when the user service is unavailable"""
+        requests, responses = mock_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "abc"}]}
+        )
+        get_user_devices_by_user_id(5)
+
+        user_service_adapter._device_cache.set(5, [{"fcm_token": "abc"}], ttl=0)  # expire it
+        user_service_circuit.record_failure()
+        user_service_circuit.record_failure()
+
+        assert get_user_devices_by_user_id(5) == [{"fcm_token": "abc"}]
+        assert len(requests) == 1
+
+
+class TestAsyncUserServiceAdapter:
+    """Test suite for the async user-service functions used by async endpoints"""
+
+    def test_verify_session_token_async(self, mock_async_transport):
+        requests, responses = mock_async_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": {"user": {"user_id": 1, "name": "Ana", "email": "a@b.co"}}}
+        )
+
+        user = asyncio.run(verify_session_token_async("opaque"))
+
+        assert user["user_id"] == 1
+        assert json.loads(requests[0].content) == {"session_token": "opaque"}
+
+    def test_async_and_sync_share_the_session_cache(self, mock_async_transport):
+        requests, responses = mock_async_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": {"user": {"user_id": 1, "name": "Ana", "email": "a@b.co"}}}
+        )
+
+        asyncio.run(verify_session_token_async("opaque"))
+
+        assert verify_session_token("opaque")["user_id"] == 1
+        assert len(requests) == 1
+
+    def test_invalid_token_async(self, mock_async_transport):
+        _, responses = mock_async_transport
+        responses["/users-service/session-token-verification"] = lambda request: httpx.Response(401, text="invalid")
+
+        assert asyncio.run(verify_session_token_async("bad")) is None
+
+    def test_concurrent_async_lookups_share_one_request(self, mock_async_transport):
+        """Test that simultaneous coroutines looking up one user hit the user service once"""
+        requests, responses = mock_async_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(
+            200, json={"status": "success", "data": [{"fcm_token": "abc"}]}
+        )
+
+        async def lookups():
+            return await asyncio.gather(*(get_user_devices_by_user_id_async(5) for _ in range(4)))
+
+        results = asyncio.run(lookups())
+
+        assert len(requests) == 1
+        assert all(devices == [{"fcm_token": "abc"}] for devices in results)
+
+    def test_async_device_lookup_uses_circuit_breaker(self, mock_async_transport):
+        requests, responses = mock_async_transport
+        responses["/users-service/users/5/devices"] = lambda request: httpx.Response(503, text="down")
+
+        with patch.object(user_service_circuit, "failure_threshold", 1):
+            asyncio.run(get_user_devices_by_user_id_async(5))
+            assert asyncio.run(get_user_devices_by_user_id_async(5)) == []
+
+        assert len(requests) == 1
+        assert user_service_circuit.state == CIRCUIT_OPEN
+
+    def test_close_async_client(self):
+        client = httpx.AsyncClient()
+        with patch.object(user_service_adapter, "_async_http_client", client):
+            asyncio.run(user_service_adapter.close_async_http_client())
+            assert user_service_adapter._async_http_client is None
+        assert client.is_closed
@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from jose import jwt
+from adapters.security import session_token_verifier
+from adapters.security.session_token_verifier import (
+    verify_session_token_locally,
+    TOKEN_VALID,
+    TOKEN_INVALID,
+    TOKEN_NOT_LOCAL,
+)
+
+SECRET = "test-secret"
+
+
+def make_token(claims=None, secret=SECRET, expires_in=timedelta(minutes=5)):
+    payload = {"sub": "42", "name": "Ana", "email": "ana@example.com"}
+    if expires_in is not None:
+        payload["exp"] = datetime.now(timezone.utc) + expires_in
+    payload.update(claims or {})
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def local_mode():
+    """Enable local verification with a shared secret"""
+    with patch.object(session_token_verifier, "SESSION_TOKEN_VERIFICATION_MODE", "local"), \
+         patch.object(session_token_verifier, "SESSION_TOKEN_SECRET", SECRET), \
+         patch.object(session_token_verifier, "SESSION_TOKEN_PUBLIC_KEY", None):
+        yield
+
+
+class TestVerifySessionTokenLocally:
+    """Test suite for local session-token verification"""
+
+    def test_remote_mode_skips_local_verification(self):
+        with patch.object(session_token_verifier, "SESSION_TOKEN_VERIFICATION_MODE", "remote"):
+            assert verify_session_token_locally(make_token()) == (TOKEN_NOT_LOCAL, None)
+
+    def test_local_mode_without_key_falls_back_to_remote(self):
+        with patch.object(session_token_verifier, "SESSION_TOKEN_VERIFICATION_MODE", "local"), \
+             patch.object(session_token_verifier, "SESSION_TOKEN_SECRET", None), \
+             patch.object(session_token_verifier, "SESSION_TOKEN_PUBLIC_KEY", None):
+            assert verify_session_token_locally(make_token()) == (TOKEN_NOT_LOCAL, None)
+
+    def test_valid_token(self, local_mode):
+        result, user = verify_session_token_locally(make_token())
+
+        assert result == TOKEN_VALID
+        assert user == {"user_id": 42, "name": "Ana", "email": "ana@example.com"}
+
+    def test_opaque_token_is_not_local(self, local_mode):
+        assert verify_session_token_locally("opaque-legacy-token") == (TOKEN_NOT_LOCAL, None)
+
+    def test_bad_signature(self, local_mode):
+        assert verify_session_token_locally(make_token(secret="other-secret")) == (TOKEN_INVALID, None)
+
+    def test_expired_token(self, local_mode):
+        token = make_token(expires_in=timedelta(minutes=-1))
+
+        assert verify_session_token_locally(token) == (TOKEN_INVALID, None)
+
+    def test_required_claim_missing(self, local_mode):
+        token = make_token(expires_in=None)
+
+        assert verify_session_token_locally(token) == (TOKEN_INVALID, None)
+
+    def test_audience_and_issuer_are_checked(self, local_mode):
+        with patch.object(session_token_verifier, "SESSION_TOKEN_AUDIENCE", "coffeetech"), \
+             patch.object(session_token_verifier, "SESSION_TOKEN_ISSUER", "users-service"):
+            good = make_token({"aud": "coffeetech", "iss": "users-service"})
+            wrong_audience = make_token({"aud": "other", "iss": "users-service"})
+
+            assert verify_session_token_locally(good)[0] == TOKEN_VALID
+            assert verify_session_token_locally(wrong_audience)[0] == TOKEN_INVALID
+
+    def test_custom_user_id_claim(self, local_mode):
+        with patch.object(session_token_verifier, "SESSION_TOKEN_USER_ID_CLAIM", "user_id"):
+            result, user = verify_session_token_locally(make_token({"user_id": 7}))
+
+            assert result == TOKEN_VALID
+            assert user["user_id"] == 7
+
+    def test_non_numeric_user_id(self, local_mode):
+        assert verify_session_token_locally(make_token({"sub": "abc"})) == (TOKEN_INVALID, None)
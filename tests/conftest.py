@@ -5,3 +5,11 @@ from unittest.mock import MagicMock
 def mock_db_session():
     session = MagicMock()
     return session
+
+@pytest.fixture(autouse=True)
+def empty_reference_data():
+    """The reference data cache is process-wide: start and end every test without data"""
+    from adapters.persistence.reference_data_cache import reference_data
+    reference_data.clear()
+    yield
+    reference_data.clear()
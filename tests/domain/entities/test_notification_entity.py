@@ -2,6 +2,7 @@ import pytest
 from datetime import datetime
 import pytz
 from domain.entities import Notification, NotificationMapper
+from adapters.persistence.reference_data_cache import reference_data
 
 
 class TestNotificationEntity:
@@ -137,6 +138,13 @@ class TestNotificationEntity:
         with pytest.raises(ValueError, match="State ID must be a positive integer"):
             notification.update_state(0)
     
+    def test_validate_state_id(self):
+        """Test state ID validation without an entity instance"""
+        Notification.validate_state_id(2)
+        
+        with pytest.raises(ValueError, match="State ID must be a positive integer"):
+            Notification.validate_state_id(-1)
+    
     def test_state_checking_methods(self):
         """Test state checking methods"""
         notification = Notification.create_new(
@@ -338,6 +346,28 @@ class TestNotificationMapper:
         assert entity.notification_type_name is None
         assert entity.notification_state_name is None
     
+    def test_to_entity_names_from_lookups(self):
+        """Test that names of relationships that were not loaded come from the given lookups"""
+        reference_data.load(types=[(1, "Invitation")], states=[(1, "Pendiente")])
+        
+        class MockModel:
+            def __init__(self):
+                self.notification_id = 1
+                self.message = "Test message"
+                self.notification_date = datetime.now(pytz.timezone("America/Bogota"))
+                self.invitation_id = 456
+                self.notification_type_id = 1
+                self.notification_state_id = 1
+                self.user_id = 123
+                self.notification_type = None
+                self.state = None
+        
+        entity = NotificationMapper.to_entity(MockModel(), reference_data.type_name, reference_data.state_name)
+        
+        assert entity.notification_type_name == "Invitation"
+        assert entity.notification_state_name == "Pendiente"
+        assert NotificationMapper.to_entity(MockModel()).notification_type_name is None
+    
     def test_to_entity_with_relationships(self):
         """Test converting model with relationships to entity"""
         # Mock SQLAlchemy model with relationships
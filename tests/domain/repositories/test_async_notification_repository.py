@@ -0,0 +1,362 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+from adapters.persistence.async_notification_repository import AsyncNotificationRepository
+from adapters.persistence.notification_repository import feed_rows_to_dicts
+from adapters.persistence.reference_data_cache import reference_data
+from domain.services.notification_service import serialize_user_notifications
+from models.models import Notifications, NotificationOutbox
+from utils.response import create_response, create_native_response
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestAsyncNotificationRepository:
+    """Test suite for AsyncNotificationRepository"""
+
+    @pytest.fixture
+    def mock_db_session(self):
+        """Create a mock asyncio session (execute/commit/rollback/flush/get are awaitable)"""
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock())
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+        session.flush = AsyncMock()
+        session.get = AsyncMock()
+        return session
+
+    @pytest.fixture
+    def notification_repository(self, mock_db_session):
+        return AsyncNotificationRepository(mock_db_session)
+
+    @pytest.fixture
+    def loaded_reference_data(self):
+        reference_data.load(types=[(7, "Invitation")], states=[(1, "Pendiente")])
+
+    @pytest.fixture
+    def reference_data_unavailable(self):
+        with patch.object(reference_data, "ensure_fresh_async", AsyncMock()):
+            yield
+
+    def test_get_notification_by_id_loads_relations(self, notification_repository, mock_db_session,
+                                                    reference_data_unavailable):
+        """Test that without cached names relationships are eagerly joined, since lazy loads fail under asyncio"""
+        notification = MagicMock(spec=Notifications)
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = notification
+
+        result = asyncio.run(notification_repository.get_notification_by_id(123))
+
+        assert result is notification
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "LEFT OUTER JOIN notification_types" in sql
+        assert "LEFT OUTER JOIN notification_states" in sql
+        assert "WHERE notifications.notification_id = %(notification_id_1)s" in sql
+
+    def test_get_notification_by_id_uses_cached_names(self, notification_repository, mock_db_session,
+                                                      loaded_reference_data):
+        """Test that type and state are not joined when their names are cached"""
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        asyncio.run(notification_repository.get_notification_by_id(123))
+
+        mock_db_session.execute.assert_awaited_once()
+        assert "JOIN" not in compile_sql(mock_db_session.execute.call_args[0][0])
+
+    def test_get_notification_rows_with_cached_names(self, notification_repository, mock_db_session,
+                                                     loaded_reference_data):
+        """Test that the feed projection selects only its columns and names type/state from the cache"""
+        date = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        mock_db_session.execute.return_value.all.return_value = [(1, "Hola", date, 456, 7, 1)]
+
+        result = asyncio.run(notification_repository.get_notification_rows_by_user_id(123, 51))
+
+        assert result == [{
+            "notification_id": 1,
+            "message": "Hola",
+            "notification_date": date,
+            "invitation_id": 456,
+            "notification_type": "Invitation",
+            "notification_state": "Pendiente",
+        }]
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("SELECT notifications.notification_id, notifications.message, "
+                              "notifications.notification_date, notifications.invitation_id, "
+                              "notifications.notification_type_id, notifications.notification_state_id \nFROM notifications")
+        assert "JOIN" not in sql
+        assert "LIMIT" in sql
+
+    def test_get_notification_rows_joins_names_without_cache(self, notification_repository, mock_db_session,
+                                                             reference_data_unavailable):
+        """Test that without cached names the projection joins the names in"""
+        date = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        mock_db_session.execute.return_value.all.return_value = [(1, "Hola", date, None, "Invitation", None)]
+
+        result = asyncio.run(notification_repository.get_notification_rows_by_user_id(123, 51))
+
+        assert result[0]["notification_type"] == "Invitation"
+        assert result[0]["notification_state"] is None
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "notification_types.name" in sql
+        assert "LEFT OUTER JOIN notification_types" in sql
+        assert "LEFT OUTER JOIN notification_states" in sql
+
+    def test_get_notification_rows_page_keyset(self, notification_repository, mock_db_session,
+                                               loaded_reference_data):
+        """Test that feed pages use a keyset condition and ordering instead of OFFSET"""
+        mock_db_session.execute.return_value.all.return_value = []
+        after = (datetime(2024, 6, 1, tzinfo=timezone.utc), 10)
+
+        assert asyncio.run(notification_repository.get_notification_rows_by_user_id(123, 21, after)) == []
+
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "(notifications.notification_date, notifications.notification_id) < (" in sql
+        assert "ORDER BY notifications.notification_date DESC, notifications.notification_id DESC" in sql
+        assert "LIMIT" in sql
+        assert "OFFSET" not in sql
+
+    def test_feed_rows_serialize_like_the_orm_chain(self, loaded_reference_data):
+        """Test that the projected rows produce the same JSON body as ORM -> entity -> DTO -> create_response"""
+        date = datetime(2024, 6, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        model = MagicMock(spec=Notifications)
+        model.notification_id, model.message, model.notification_date = 1, "Hola", date
+        model.invitation_id, model.user_id = 456, 123
+        model.notification_type_id, model.notification_state_id = 7, 1
+        model.notification_type, model.state = None, None
+
+        legacy = create_response("success", "ok", data=[n.model_dump() for n in serialize_user_notifications([model])])
+        rows = feed_rows_to_dicts([(1, "Hola", date, 456, 7, 1)], names_cached=True)
+
+        assert create_native_response("success", "ok", rows).body == legacy.body
+
+    def test_reference_data_loaded_on_first_use(self, notification_repository, mock_db_session):
+        """Test that an empty cache is filled from the lookup tables before the first query"""
+        types_result, states_result, notifications_result = MagicMock(), MagicMock(), MagicMock()
+        types_result.all.return_value = [(7, "Invitation")]
+        states_result.all.return_value = [(1, "Pendiente")]
+        notifications_result.scalars.return_value.first.return_value = None
+        mock_db_session.execute.side_effect = [types_result, states_result, notifications_result]
+
+        asyncio.run(notification_repository.get_notification_by_invitation(456))
+
+        assert reference_data.type_id("Invitation") == 7
+        assert "notifications.notification_type_id = %(notification_type_id_1)s" in compile_sql(
+            mock_db_session.execute.call_args[0][0]
+        )
+
+    def test_get_notification_by_invitation_uses_cached_type_id(self, notification_repository, mock_db_session,
+                                                               loaded_reference_data):
+        """Test that the "Invitation" type id is a literal from the cache, not a subquery"""
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        asyncio.run(notification_repository.get_notification_by_invitation(456))
+
+        mock_db_session.execute.assert_awaited_once()
+        assert "notification_types" not in compile_sql(mock_db_session.execute.call_args[0][0])
+
+    def test_get_notification_by_invitation_returns_the_oldest(self, notification_repository, mock_db_session,
+                                                               loaded_reference_data):
+        """Test that the single lookup picks the lowest notification_id, like the batch lookup"""
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        asyncio.run(notification_repository.get_notification_by_invitation(456))
+
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ORDER BY notifications.notification_id \n LIMIT" in sql
+
+    def test_get_notification_by_invitation_unknown_type(self, notification_repository, mock_db_session):
+        """Test that no query runs when the "Invitation" type does not exist"""
+        reference_data.load(types=[], states=[])
+
+        assert asyncio.run(notification_repository.get_notification_by_invitation(456)) is None
+        assert asyncio.run(notification_repository.delete_notifications_by_invitation(456)) == 0
+        mock_db_session.execute.assert_not_awaited()
+
+    def test_get_notification_by_invitation_uses_type_subquery(self, notification_repository, mock_db_session,
+                                                               reference_data_unavailable):
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        result = asyncio.run(notification_repository.get_notification_by_invitation(456))
+
+        assert result is None
+        mock_db_session.execute.assert_awaited_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "SELECT notification_types.notification_type_id" in sql
+
+    def test_delete_notifications_by_invitation_single_statement(self, notification_repository, mock_db_session,
+                                                                 loaded_reference_data):
+        """Test that matching notifications are deleted in one DELETE instead of row by row"""
+        mock_db_session.execute.return_value.all.return_value = [(456, 1), (456, 2), (456, 3)]
+
+        result = asyncio.run(notification_repository.delete_notifications_by_invitation(456))
+
+        assert result == 3
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("DELETE FROM notifications")
+        assert "RETURNING notifications.invitation_id, notifications.notification_id" in sql
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_delete_notifications_by_invitations_groups_deleted_ids(self, notification_repository, mock_db_session,
+                                                                    loaded_reference_data):
+        """Test that several invitations are deleted in one statement and grouped per invitation"""
+        mock_db_session.execute.return_value.all.return_value = [(10, 1), (11, 2), (10, 3)]
+
+        result = asyncio.run(notification_repository.delete_notifications_by_invitations([10, 11, 12]))
+
+        assert result == {10: [1, 3], 11: [2], 12: []}
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_update_notification_state_success(self, notification_repository, mock_db_session):
+        """Test that the state is updated with one UPDATE ... RETURNING and no prior read"""
+        notification = MagicMock(spec=Notifications)
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = notification
+
+        result = asyncio.run(notification_repository.update_notification_state(1, 2))
+
+        assert result is notification
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("UPDATE notifications SET notification_state_id=")
+        assert "RETURNING" in sql
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.get.assert_not_awaited()
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_update_notification_state_not_found(self, notification_repository, mock_db_session):
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        assert asyncio.run(notification_repository.update_notification_state(999, 2)) is None
+        mock_db_session.commit.assert_not_awaited()
+
+    def test_get_notifications_by_invitations_single_query(self, notification_repository, mock_db_session,
+                                                           loaded_reference_data):
+        """Test that many invitations are looked up with one = ANY(:ids) query"""
+        mock_db_session.execute.return_value.all.return_value = [(10, 100)]
+
+        result = asyncio.run(notification_repository.get_notifications_by_invitations([10, 11]))
+
+        assert result == {10: 100, 11: None}
+        assert "= ANY (" in compile_sql(mock_db_session.execute.call_args[0][0])
+        mock_db_session.execute.assert_awaited_once()
+
+    def test_update_notifications_state_single_statement(self, notification_repository, mock_db_session):
+        mock_db_session.execute.return_value.scalars.return_value.all.return_value = [2, 1]
+
+        result = asyncio.run(notification_repository.update_notifications_state(3, user_id=456))
+
+        assert result == [1, 2]
+        assert compile_sql(mock_db_session.execute.call_args[0][0]).startswith("UPDATE notifications")
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_update_notifications_state_requires_selection(self, notification_repository, mock_db_session):
+        """Test that a bulk state update without ids or user never updates the whole table"""
+        with pytest.raises(ValueError):
+            asyncio.run(notification_repository.update_notifications_state(2))
+        mock_db_session.execute.assert_not_awaited()
+
+    def test_create_notification_single_insert_returning(self, notification_repository, mock_db_session,
+                                                         loaded_reference_data):
+        """Test that with cached reference data the notification is created with one INSERT ... RETURNING"""
+        inserted = MagicMock(spec=Notifications)
+        mock_db_session.execute.return_value.scalars.return_value.one.return_value = inserted
+
+        result = asyncio.run(notification_repository.create_notification("Test", 123, 7, 456, 1))
+
+        assert result is inserted
+        assert compile_sql(mock_db_session.execute.call_args[0][0]).startswith("INSERT INTO notifications")
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.add.assert_not_called()
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_create_notification_reloads_without_reference_data(self, notification_repository, mock_db_session,
+                                                                reference_data_unavailable):
+        """Test that the new notification is reloaded with its relationships when names are not cached"""
+        inserted = MagicMock(spec=Notifications)
+        reloaded = MagicMock(spec=Notifications)
+        mock_db_session.execute.return_value.scalars.return_value.one.return_value = inserted
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = reloaded
+
+        result = asyncio.run(notification_repository.create_notification("Test", 123, 7, 456, 1))
+
+        assert result is reloaded
+        assert mock_db_session.execute.await_count == 2
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_create_notification_with_outbox_single_transaction(self, notification_repository, mock_db_session):
+        """Test that the notification and its outbox entry are committed together"""
+        reloaded = MagicMock(spec=Notifications)
+        mock_db_session.execute.return_value.scalars.return_value.first.return_value = reloaded
+
+        def assign_id():
+            mock_db_session.add.call_args_list[0][0][0].notification_id = 42
+
+        mock_db_session.flush.side_effect = assign_id
+
+        result = asyncio.run(notification_repository.create_notification_with_outbox(
+            "Test", 123, 1, 456, 1, "Title", "Body"
+        ))
+
+        assert result is reloaded
+        outbox_entry = mock_db_session.add.call_args_list[1][0][0]
+        assert isinstance(outbox_entry, NotificationOutbox)
+        assert outbox_entry.notification_id == 42
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_create_notifications_batch_single_statement(self, notification_repository, mock_db_session):
+        """Test that rows with different values are inserted in one executemany with ids in input order"""
+        rows = [{"message": "a", "user_id": 1}, {"message": "b", "user_id": 2}]
+        mock_db_session.execute.return_value.scalars.return_value.all.return_value = [10, 11]
+
+        result = asyncio.run(notification_repository.create_notifications_batch(rows))
+
+        assert result == [10, 11]
+        statement, params = mock_db_session.execute.call_args[0]
+        assert params == rows
+        assert compile_sql(statement).startswith("INSERT INTO notifications")
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.commit.assert_awaited_once()
+
+    @patch('adapters.persistence.notification_repository.BULK_INSERT_CHUNK_SIZE', 2)
+    def test_create_notifications_bulk(self, notification_repository, mock_db_session):
+        """Test that large bulk inserts are split into chunked INSERT ... RETURNING statements in one transaction"""
+        mock_db_session.execute.side_effect = [[(1, 100), (2, 101)], [(3, 102)]]
+
+        result = asyncio.run(notification_repository.create_notifications_bulk("Announcement", [1, 2, 3], 2, 456, 1))
+
+        assert result == {1: 100, 2: 101, 3: 102}
+        assert mock_db_session.execute.await_count == 2
+        assert "RETURNING notifications.user_id, notifications.notification_id" in compile_sql(
+            mock_db_session.execute.call_args_list[0][0][0]
+        )
+        mock_db_session.commit.assert_awaited_once()
+
+    def test_stream_notifications_uses_server_side_cursor(self, notification_repository, mock_db_session):
+        """Test that the export streams plain column rows in yield_per batches with the filters applied"""
+        async def partitions():
+            yield [{"notification_id": 1}, {"notification_id": 2}]
+            yield [{"notification_id": 3}]
+
+        stream_result = MagicMock()
+        stream_result.mappings.return_value.partitions.return_value = partitions()
+        mock_db_session.stream = AsyncMock(return_value=stream_result)
+
+        async def collect():
+            return [batch async for batch in notification_repository.stream_notifications(
+                notification_type_id=1, date_from=datetime(2024, 1, 1, tzinfo=timezone.utc)
+            )]
+
+        batches = asyncio.run(collect())
+
+        assert batches == [[{"notification_id": 1}, {"notification_id": 2}], [{"notification_id": 3}]]
+        statement = mock_db_session.stream.call_args[0][0]
+        assert statement.get_execution_options()["yield_per"] > 0
+        sql = compile_sql(statement)
+        assert "JOIN" not in sql
+        assert "notifications.notification_type_id = %(notification_type_id_1)s" in sql
+        assert "notifications.notification_date >= %(notification_date_1)s" in sql
+        assert "notification_state_id =" not in sql
+        assert "ORDER BY notifications.notification_id" in sql
@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql
+from adapters.persistence.outbox_repository import OutboxRepository
+from domain.repositories.outbox_repository import OUTBOX_PENDING, OUTBOX_DONE, OUTBOX_FAILED
+from models.models import NotificationOutbox
+
+
+class TestOutboxRepository:
+    """Test suite for OutboxRepository"""
+
+    @pytest.fixture
+    def mock_db_session(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def outbox_repository(self, mock_db_session):
+        return OutboxRepository(mock_db_session)
+
+    @pytest.fixture
+    def entry(self):
+        return NotificationOutbox(
+            outbox_id=1,
+            notification_id=10,
+            user_id=456,
+            status=OUTBOX_PENDING,
+            attempts=0,
+            created_at=datetime.now(timezone.utc)
+        )
+
+    def test_claim_batch_leases_and_commits(self, outbox_repository, mock_db_session, entry):
+        """Test that due entries are leased with one UPDATE ... FOR UPDATE SKIP LOCKED and committed before delivery"""
+        later = NotificationOutbox(outbox_id=2, notification_id=20, user_id=456, status=OUTBOX_PENDING, attempts=0)
+        mock_db_session.scalars.return_value.all.return_value = [later, entry]
+
+        result = outbox_repository.claim_batch(25, lease_seconds=60)
+
+        assert result == [entry, later]
+        statement = mock_db_session.scalars.call_args[0][0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE notification_outbox SET available_at=(now() + ")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "LIMIT" in sql
+        assert "notification_outbox.status" in sql
+        assert "RETURNING" in sql
+        assert mock_db_session.expunge.call_count == 2
+        mock_db_session.commit.assert_called_once()
+
+    def test_mark_done(self, outbox_repository, mock_db_session, entry):
+        """Test that a delivered entry records its result"""
+        outbox_repository.mark_done(entry, devices_notified=3)
+
+        mock_db_session.add.assert_called_once_with(entry)
+        assert entry.status == OUTBOX_DONE
+        assert entry.attempts == 1
+        assert entry.devices_notified == 3
+        assert entry.processed_at is not None
+
+    def test_mark_failed_reschedules_with_backoff(self, outbox_repository, entry):
+        """Test that a failed entry stays pending and is delayed exponentially"""
+        before = datetime.now(timezone.utc)
+        entry.attempts = 1
+
+        outbox_repository.mark_failed(entry, "boom", max_attempts=5, retry_delay_seconds=10)
+
+        assert entry.status == OUTBOX_PENDING
+        assert entry.attempts == 2
+        assert entry.last_error == "boom"
+        assert (entry.available_at - before).total_seconds() >= 20
+
+    def test_mark_failed_gives_up_after_max_attempts(self, outbox_repository, entry):
+        """Test that an entry is abandoned once it reaches max_attempts"""
+        entry.attempts = 4
+
+        outbox_repository.mark_failed(entry, "boom", max_attempts=5, retry_delay_seconds=10)
+
+        assert entry.status == OUTBOX_FAILED
+        assert entry.processed_at is not None
+
+    def test_get_by_notification_id(self, outbox_repository, mock_db_session, entry):
+        """Test lookup of the outbox entry of a notification"""
+        mock_db_session.query.return_value.filter.return_value.first.return_value = entry
+
+        assert outbox_repository.get_by_notification_id(10) == entry
+        mock_db_session.query.assert_called_once_with(NotificationOutbox)
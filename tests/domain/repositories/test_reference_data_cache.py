@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from adapters.persistence.reference_data_cache import ReferenceDataCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def lookup_results(types, states):
+    """Two execute() results: the types query, then the states query"""
+    types_result, states_result = MagicMock(), MagicMock()
+    types_result.all.return_value = types
+    states_result.all.return_value = states
+    return [types_result, states_result]
+
+
+class TestReferenceDataCache:
+    """Test suite for the notification types and states cache"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return ReferenceDataCache(refresh_interval=300, retry_interval=30, clock=clock)
+
+    def test_lookups_both_ways(self, cache):
+        cache.load(types=[(1, "Invitation"), (2, "Reminder")], states=[(5, "Pendiente")])
+
+        assert cache.is_loaded
+        assert cache.type_id("Invitation") == 1
+        assert cache.type_name(2) == "Reminder"
+        assert cache.state_id("Pendiente") == 5
+        assert cache.state_name(5) == "Pendiente"
+        assert cache.type_id("Unknown") is None
+        assert cache.state_name(99) is None
+
+    def test_refresh_from_session(self, cache):
+        db = MagicMock()
+        db.execute.side_effect = lookup_results([(1, "Invitation")], [(5, "Pendiente")])
+
+        assert cache.refresh(db) is True
+        assert cache.type_id("Invitation") == 1
+        assert db.execute.call_count == 2
+
+    def test_refresh_async_from_session(self, cache):
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=lookup_results([(1, "Invitation")], [(5, "Pendiente")]))
+
+        assert asyncio.run(cache.refresh_async(db)) is True
+        assert cache.state_name(5) == "Pendiente"
+
+    def test_preload_gives_up_after_timeout(self, cache):
+        """Test that a database that does not answer does not hold up startup"""
+        async def never_answers(statement):
+            await asyncio.sleep(60)
+
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=never_answers)
+
+        assert asyncio.run(cache.preload_async(db, timeout=0.01)) is False
+        assert not cache.is_loaded
+        assert cache.is_stale()
+
+        # The next caller loads the data
+        db.execute = AsyncMock(side_effect=lookup_results([(1, "Invitation")], []))
+        asyncio.run(cache.ensure_fresh_async(db))
+        assert cache.type_id("Invitation") == 1
+
+    def test_ensure_fresh_only_reloads_after_interval(self, cache, clock):
+        db = MagicMock()
+        db.execute.side_effect = lookup_results([(1, "Invitation")], []) + lookup_results([(1, "Invitación")], [])
+
+        cache.ensure_fresh(db)
+        clock.now = 299
+        cache.ensure_fresh(db)
+        assert db.execute.call_count == 2
+
+        clock.now = 300
+        cache.ensure_fresh(db)
+        assert db.execute.call_count == 4
+        assert cache.type_name(1) == "Invitación"
+
+    def test_failed_refresh_keeps_data_and_waits_before_retrying(self, cache, clock):
+        cache.load(types=[(1, "Invitation")], states=[])
+        clock.now = 300
+        db = MagicMock()
+        db.execute.side_effect = Exception("connection refused")
+
+        cache.ensure_fresh(db)
+        assert cache.type_id("Invitation") == 1
+        assert not cache.is_stale()
+
+        clock.now = 330
+        assert cache.is_stale()
+
+    def test_explicit_refresh_ignores_interval(self, cache):
+        cache.load(types=[(1, "Invitation")], states=[])
+        db = MagicMock()
+        db.execute.side_effect = lookup_results([(1, "Invitation"), (2, "Reminder")], [])
+
+        assert cache.refresh(db) is True
+        assert cache.type_id("Reminder") == 2
+
+    def test_clear(self, cache):
+        cache.load(types=[(1, "Invitation")], states=[])
+
+        cache.clear()
+
+        assert not cache.is_loaded
+        assert cache.is_stale()
+        assert cache.type_id("Invitation") is None
@@ -0,0 +1,290 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from datetime import datetime
+import pytz
+from domain.services.async_notification_service import AsyncNotificationService
+from domain.services.notification_service import NotificationNotFoundError
+from domain.services.push_delivery_service import BulkDeliveryResult
+from domain.schemas import (
+    SendNotificationRequest,
+    SendNotificationResponse,
+    BulkSendNotificationRequest,
+    BulkUpdateNotificationStateRequest,
+)
+from models.models import Notifications
+from utils.notification_cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestAsyncNotificationService:
+    """Test cases for the AsyncNotificationService"""
+
+    @pytest.fixture
+    def mock_repository(self):
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_delivery_service(self):
+        service = Mock()
+        service.deliver_async = AsyncMock()
+        return service
+
+    @pytest.fixture
+    def notification_service(self, mock_repository, mock_delivery_service):
+        return AsyncNotificationService(mock_repository, push_delivery_service=mock_delivery_service)
+
+    @pytest.fixture
+    def sample_notification_model(self):
+        model = Mock(spec=Notifications)
+        model.notification_id = 1
+        model.message = "Test notification"
+        model.notification_date = datetime.now(pytz.timezone("America/Bogota"))
+        model.invitation_id = 123
+        model.notification_type_id = 1
+        model.notification_state_id = 1
+        model.user_id = 456
+        model.notification_type = Mock()
+        model.notification_type.name = "Invitation"
+        model.state = Mock()
+        model.state.name = "Pending"
+        return model
+
+    @pytest.fixture
+    def send_request(self):
+        return SendNotificationRequest(
+            message="Test notification",
+            user_id=456,
+            notification_type_id=1,
+            invitation_id=123,
+            notification_state_id=1,
+            fcm_title="Title",
+            fcm_body="Body"
+        )
+
+    def test_authenticate_user(self, notification_service):
+        with patch('domain.services.async_notification_service.verify_session_token_async', new_callable=AsyncMock) as mock_verify:
+            mock_verify.return_value = {"user_id": 123, "name": "Test User"}
+
+            result = asyncio.run(notification_service.authenticate_user("valid_token"))
+
+            assert result["user_id"] == 123
+            mock_verify.assert_awaited_once_with("valid_token")
+
+    def test_get_user_notification_rows_page_with_next_cursor(self, notification_service, mock_repository):
+        """Test that the extra row only sets the next cursor"""
+        newest = {"notification_id": 2, "notification_date": datetime(2024, 6, 2, tzinfo=pytz.utc)}
+        older = {"notification_id": 1, "notification_date": datetime(2024, 6, 1, tzinfo=pytz.utc)}
+        mock_repository.get_notification_rows_by_user_id.return_value = [newest, older]
+
+        page = asyncio.run(notification_service.get_user_notification_rows_page(456, 1))
+
+        assert page["notifications"] == [newest]
+        assert decode_cursor(page["next_cursor"]) == (newest["notification_date"], 2)
+        mock_repository.get_notification_rows_by_user_id.assert_awaited_once_with(456, 2, None)
+
+    def test_get_user_notification_rows_page_last_page(self, notification_service, mock_repository):
+        cursor_date = datetime(2024, 6, 1, 12, 0, tzinfo=pytz.utc)
+        mock_repository.get_notification_rows_by_user_id.return_value = []
+
+        page = asyncio.run(notification_service.get_user_notification_rows_page(456, 10, encode_cursor(cursor_date, 99)))
+
+        assert page == {"notifications": [], "next_cursor": None}
+        mock_repository.get_notification_rows_by_user_id.assert_awaited_once_with(456, 11, (cursor_date, 99))
+
+    def test_get_user_notification_rows_page_invalid_cursor(self, notification_service, mock_repository):
+        with pytest.raises(InvalidCursorError):
+            asyncio.run(notification_service.get_user_notification_rows_page(456, 10, "not-a-cursor"))
+        mock_repository.get_notification_rows_by_user_id.assert_not_called()
+
+    def test_stream_notifications_passes_batches_through(self, notification_service, mock_repository):
+        """Test that export batches are forwarded one by one with the filters"""
+        async def batches(*args):
+            yield [{"notification_id": 1}]
+            yield [{"notification_id": 2}]
+
+        mock_repository.stream_notifications = Mock(side_effect=batches)
+
+        async def collect():
+            return [batch async for batch in notification_service.stream_notifications(notification_state_id=3)]
+
+        assert asyncio.run(collect()) == [[{"notification_id": 1}], [{"notification_id": 2}]]
+        mock_repository.stream_notifications.assert_called_once_with(None, 3, None, None)
+
+    def test_update_notification_state_single_call(self, notification_service, mock_repository, sample_notification_model):
+        mock_repository.update_notification_state.return_value = sample_notification_model
+
+        asyncio.run(notification_service.update_notification_state(1, 2))
+
+        mock_repository.get_notification_by_id.assert_not_awaited()
+        mock_repository.update_notification_state.assert_awaited_once_with(1, 2)
+
+    def test_update_notification_state_not_found(self, notification_service, mock_repository):
+        mock_repository.update_notification_state.return_value = None
+
+        with pytest.raises(NotificationNotFoundError):
+            asyncio.run(notification_service.update_notification_state(999, 2))
+
+    def test_update_notification_state_invalid_state(self, notification_service, mock_repository):
+        with pytest.raises(ValueError, match="Estado inválido"):
+            asyncio.run(notification_service.update_notification_state(1, 0))
+        mock_repository.update_notification_state.assert_not_awaited()
+
+    def test_delete_notifications_by_invitations(self, notification_service, mock_repository):
+        mock_repository.delete_notifications_by_invitations.return_value = {10: [1], 11: [2, 3]}
+
+        result = asyncio.run(notification_service.delete_notifications_by_invitations([10, 11]))
+
+        assert result.deleted_count == 3
+        assert result.deleted_counts == {10: 1, 11: 2}
+        mock_repository.delete_notifications_by_invitations.assert_awaited_once_with([10, 11])
+
+    def test_update_notifications_state(self, notification_service, mock_repository):
+        mock_repository.update_notifications_state.return_value = [1, 2]
+        request = BulkUpdateNotificationStateRequest(notification_state_id=2, user_id=456, from_state_id=1)
+
+        result = asyncio.run(notification_service.update_notifications_state(request))
+
+        assert result.notification_ids == [1, 2]
+        mock_repository.update_notifications_state.assert_awaited_once_with(
+            2, notification_ids=None, user_id=456, from_state_id=1
+        )
+
+    def test_update_notifications_state_invalid_state(self, notification_service, mock_repository):
+        request = BulkUpdateNotificationStateRequest(notification_state_id=0, notification_ids=[1])
+
+        with pytest.raises(ValueError, match="Estado inválido"):
+            asyncio.run(notification_service.update_notifications_state(request))
+        mock_repository.update_notifications_state.assert_not_awaited()
+
+    def test_send_notification_delivers_inline(self, notification_service, mock_repository, mock_delivery_service,
+                                               sample_notification_model, send_request):
+        mock_repository.create_notification.return_value = sample_notification_model
+        mock_delivery_service.deliver_async.return_value = SendNotificationResponse(notification_id=1, devices_notified=2)
+
+        result = asyncio.run(notification_service.send_notification(send_request))
+
+        assert result.devices_notified == 2
+        job = mock_delivery_service.deliver_async.call_args[0][0]
+        assert job.notification_id == 1
+        assert job.fcm_title == "Title"
+
+    def test_send_notification_through_insert_batcher(self, mock_repository, mock_delivery_service, send_request):
+        insert_batcher = Mock()
+        insert_batcher.submit = AsyncMock(return_value=42)
+        notification_service = AsyncNotificationService(
+            mock_repository, push_delivery_service=mock_delivery_service, insert_batcher=insert_batcher
+        )
+        mock_delivery_service.deliver_async.return_value = SendNotificationResponse(notification_id=42, devices_notified=1)
+
+        asyncio.run(notification_service.send_notification(send_request))
+
+        insert_batcher.submit.assert_awaited_once()
+        assert insert_batcher.submit.call_args.kwargs["user_id"] == 456
+        mock_repository.create_notification.assert_not_awaited()
+        assert mock_delivery_service.deliver_async.call_args[0][0].notification_id == 42
+
+    def test_send_notification_outbox_mode(self, mock_repository, mock_delivery_service,
+                                           sample_notification_model, send_request):
+        mock_repository.create_notification_with_outbox.return_value = sample_notification_model
+        service = AsyncNotificationService(mock_repository, mock_delivery_service, outbox_enabled=True)
+        send_request.delivery_mode = "outbox"
+
+        result = asyncio.run(service.send_notification(send_request))
+
+        assert result.delivery_status == "pending"
+        mock_repository.create_notification.assert_not_awaited()
+        mock_delivery_service.deliver_async.assert_not_awaited()
+
+    def test_send_notification_outbox_mode_falls_back_when_dispatcher_disabled(self, mock_repository, mock_delivery_service,
+                                                                              sample_notification_model, send_request):
+        mock_repository.create_notification.return_value = sample_notification_model
+        worker = Mock()
+        worker.submit.return_value = True
+        service = AsyncNotificationService(mock_repository, mock_delivery_service, push_delivery_worker=worker)
+        send_request.delivery_mode = "outbox"
+
+        result = asyncio.run(service.send_notification(send_request))
+
+        assert result.delivery_status == "queued"
+        mock_repository.create_notification_with_outbox.assert_not_awaited()
+        worker.submit.assert_called_once()
+        mock_delivery_service.deliver_async.assert_not_awaited()
+
+    def test_send_notification_background_mode(self, mock_repository, mock_delivery_service,
+                                               sample_notification_model, send_request):
+        mock_repository.create_notification.return_value = sample_notification_model
+        worker = Mock()
+        worker.submit.return_value = True
+        service = AsyncNotificationService(mock_repository, mock_delivery_service, push_delivery_worker=worker)
+        send_request.delivery_mode = "background"
+
+        result = asyncio.run(service.send_notification(send_request))
+
+        assert result.delivery_status == "queued"
+        mock_delivery_service.deliver_async.assert_not_awaited()
+
+    def test_send_notification_validation_error(self, notification_service, mock_repository, send_request):
+        send_request.user_id = 0
+
+        with pytest.raises(ValueError, match="Datos de notificación inválidos"):
+            asyncio.run(notification_service.send_notification(send_request))
+        mock_repository.create_notification.assert_not_awaited()
+
+    def test_send_bulk_notification(self, notification_service, mock_repository, mock_delivery_service):
+        mock_repository.create_notifications_bulk.return_value = {10: 100, 11: 101}
+        mock_delivery_service.deliver_bulk.return_value = BulkDeliveryResult(devices_notified=3)
+        request = BulkSendNotificationRequest(
+            user_ids=[10, 11, 10],
+            message="Announcement",
+            notification_type_id=2,
+            invitation_id=123,
+            notification_state_id=1,
+            fcm_title="Title",
+            fcm_body="Body"
+        )
+
+        result = asyncio.run(notification_service.send_bulk_notification(request))
+
+        assert result.users_targeted == 2
+        assert result.notifications_created == 2
+        assert result.devices_notified == 3
+        mock_delivery_service.deliver_bulk.assert_called_once_with([10, 11], "Title", "Body")
+
+    def test_send_bulk_notification_validation_error(self, notification_service, mock_repository):
+        request = BulkSendNotificationRequest(
+            user_ids=[10, 0],
+            message="Announcement",
+            notification_type_id=2,
+            invitation_id=123,
+            notification_state_id=1
+        )
+
+        with pytest.raises(ValueError, match="Datos de notificación inválidos"):
+            asyncio.run(notification_service.send_bulk_notification(request))
+        mock_repository.create_notifications_bulk.assert_not_awaited()
+
+    def test_get_all_notification_states(self, notification_service, mock_repository):
+        state = Mock()
+        state.notification_state_id = 1
+        state.name = "Pending"
+        mock_repository.get_all_notification_states.return_value = [state]
+
+        result = asyncio.run(notification_service.get_all_notification_states())
+
+        assert len(result) == 1
+        assert result[0].name == "Pending"
+
+    def test_get_notification_by_invitation_found(self, notification_service, mock_repository, sample_notification_model):
+        mock_repository.get_notification_by_invitation.return_value = sample_notification_model
+
+        result = asyncio.run(notification_service.get_notification_by_invitation(123))
+
+        assert result.notification_id == 1
+        mock_repository.get_notification_by_invitation.assert_awaited_once_with(123)
+
+    def test_get_notification_by_invitation_not_found(self, notification_service, mock_repository):
+        mock_repository.get_notification_by_invitation.return_value = None
+
+        result = asyncio.run(notification_service.get_notification_by_invitation(123))
+
+        assert result.notification_id is None
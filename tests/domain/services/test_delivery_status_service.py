@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import Mock
+from datetime import datetime
+import pytz
+from domain.services.delivery_status_service import DeliveryStatusService
+
+
+class TestDeliveryStatusService:
+    """Test cases for the DeliveryStatusService"""
+
+    @pytest.fixture
+    def mock_worker(self):
+        worker = Mock()
+        worker.get_status.return_value = None
+        return worker
+
+    @pytest.fixture
+    def mock_outbox_repository(self):
+        repository = Mock()
+        repository.get_by_notification_id.return_value = None
+        return repository
+
+    def test_get_delivery_status_from_worker(self, mock_worker, mock_outbox_repository):
+        """Test reading the background delivery status of a notification"""
+        mock_worker.get_status.return_value = {
+            "notification_id": 1,
+            "status": "delivered",
+            "devices_notified": 1,
+            "invalid_tokens": None,
+            "fcm_errors": None,
+            "error": None,
+            "updated_at": datetime.now(pytz.utc)
+        }
+        service = DeliveryStatusService(push_delivery_worker=mock_worker, outbox_repository=mock_outbox_repository)
+
+        result = service.get_delivery_status(1)
+
+        assert result.status == "delivered"
+        assert result.devices_notified == 1
+        mock_worker.get_status.assert_called_once_with(1)
+        mock_outbox_repository.get_by_notification_id.assert_not_called()
+
+    def test_get_delivery_status_from_outbox(self, mock_worker, mock_outbox_repository):
+        """Test that outbox entries are reported when the worker has no status"""
+        entry = Mock()
+        entry.notification_id = 1
+        entry.status = "done"
+        entry.devices_notified = 2
+        entry.last_error = None
+        entry.processed_at = datetime.now(pytz.utc)
+        mock_outbox_repository.get_by_notification_id.return_value = entry
+        service = DeliveryStatusService(push_delivery_worker=mock_worker, outbox_repository=mock_outbox_repository)
+
+        result = service.get_delivery_status(1)
+
+        assert result.status == "done"
+        assert result.devices_notified == 2
+
+    def test_get_delivery_status_unknown(self, mock_worker, mock_outbox_repository):
+        """Test that no status is reported when neither the worker nor the outbox know the notification"""
+        service = DeliveryStatusService(push_delivery_worker=mock_worker, outbox_repository=mock_outbox_repository)
+
+        assert service.get_delivery_status(1) is None
+
+    def test_get_delivery_status_without_sources(self):
+        """Test that no status is reported when no worker or outbox is configured"""
+        assert DeliveryStatusService().get_delivery_status(1) is None
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from domain.services.notification_insert_batcher import NotificationInsertBatcher
+
+
+class TestNotificationInsertBatcher:
+    """Test cases for the micro-batching notification insert collector"""
+
+    @pytest.fixture
+    def mock_repository(self):
+        repository = MagicMock()
+        repository.create_notifications_batch = AsyncMock(
+            side_effect=lambda rows: [100 + row["user_id"] for row in rows]
+        )
+        with patch("domain.services.notification_insert_batcher.AsyncNotificationRepository",
+                   return_value=repository):
+            yield repository
+
+    @pytest.fixture
+    def session_factory(self):
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=MagicMock())
+        session.__aexit__ = AsyncMock(return_value=False)
+        return MagicMock(return_value=session)
+
+    def submit_all(self, batcher, user_ids):
+        async def run():
+            results = await asyncio.gather(
+                *(batcher.submit("Test", user_id, 1, 456, 1) for user_id in user_ids),
+                return_exceptions=True
+            )
+            await batcher.close()
+            return results
+        return asyncio.run(run())
+
+    def test_concurrent_submits_share_one_insert(self, mock_repository, session_factory):
+        """Test that calls arriving within the delay are written in one batch, each getting its own id"""
+        batcher = NotificationInsertBatcher(session_factory, max_batch_size=10, max_delay_ms=1)
+
+        assert self.submit_all(batcher, [1, 2, 3]) == [101, 102, 103]
+        mock_repository.create_notifications_batch.assert_awaited_once()
+        rows = mock_repository.create_notifications_batch.call_args[0][0]
+        assert [row["user_id"] for row in rows] == [1, 2, 3]
+        assert rows[0]["message"] == "Test"
+        assert session_factory.call_count == 1
+
+    def test_full_batch_is_written_without_waiting(self, mock_repository, session_factory):
+        """Test that reaching max_batch_size flushes immediately and the rest waits for the next batch"""
+        batcher = NotificationInsertBatcher(session_factory, max_batch_size=2, max_delay_ms=1)
+
+        assert self.submit_all(batcher, [1, 2, 3]) == [101, 102, 103]
+        batch_sizes = [len(call[0][0]) for call in mock_repository.create_notifications_batch.call_args_list]
+        assert batch_sizes == [2, 1]
+
+    def test_failed_batch_is_retried_row_by_row(self, mock_repository, session_factory):
+        """Test that one bad row only fails its own caller"""
+        def insert(rows):
+            if any(row["user_id"] == 2 for row in rows):
+                raise Exception("Database error")
+            return [100 + row["user_id"] for row in rows]
+
+        mock_repository.create_notifications_batch.side_effect = insert
+        batcher = NotificationInsertBatcher(session_factory, max_batch_size=10, max_delay_ms=1)
+
+        results = self.submit_all(batcher, [1, 2, 3])
+
+        assert results[0] == 101
+        assert isinstance(results[1], Exception)
+        assert results[2] == 103
+        assert mock_repository.create_notifications_batch.await_count == 4
+
+    def test_close_writes_pending_rows(self, mock_repository, session_factory):
+        """Test that close() writes rows still waiting for the delay and then refuses new ones"""
+        batcher = NotificationInsertBatcher(session_factory, max_batch_size=10, max_delay_ms=60000)
+
+        async def run():
+            submitted = asyncio.ensure_future(batcher.submit("Test", 7, 1, 456, 1))
+            await asyncio.sleep(0)
+            await batcher.close()
+            return await submitted
+
+        assert asyncio.run(run()) == 107
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit("Test", 8, 1, 456, 1))
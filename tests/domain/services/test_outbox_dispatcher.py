@@ -0,0 +1,150 @@
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from adapters.http.user_service_adapter import clear_device_cache
+from adapters.persistence.outbox_repository import OutboxRepository
+from domain.repositories.outbox_repository import OUTBOX_PENDING
+from domain.schemas import SendNotificationResponse
+from domain.services.outbox_dispatcher import OutboxDispatcher
+from domain.services.push_delivery_service import PushDeliveryService
+from models.models import NotificationOutbox
+
+
+class TestOutboxDispatcher:
+    """Test cases for the OutboxDispatcher"""
+
+    @pytest.fixture
+    def mock_session(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def mock_outbox_repository(self):
+        with patch('domain.services.outbox_dispatcher.OutboxRepository') as repository_class:
+            yield repository_class.return_value
+
+    @pytest.fixture
+    def mock_delivery_service(self):
+        return Mock()
+
+    @pytest.fixture
+    def dispatcher(self, mock_session, mock_delivery_service):
+        return OutboxDispatcher(
+            lambda: mock_session,
+            delivery_service=mock_delivery_service,
+            batch_size=10,
+            max_attempts=3,
+            retry_delay_seconds=1.0,
+            lease_seconds=60.0
+        )
+
+    @staticmethod
+    def _entry(outbox_id, notification_id):
+        entry = Mock()
+        entry.outbox_id = outbox_id
+        entry.notification_id = notification_id
+        entry.user_id = 456
+        entry.fcm_title = "Title"
+        entry.fcm_body = "Body"
+        entry.fcm_token = None
+        return entry
+
+    def test_run_once_delivers_and_marks_done(self, dispatcher, mock_session, mock_outbox_repository, mock_delivery_service):
+        """Test that leased entries are delivered and each one is settled in its own commit"""
+        entries = [self._entry(1, 10), self._entry(2, 20)]
+        mock_outbox_repository.claim_batch.return_value = entries
+        mock_delivery_service.deliver.return_value = SendNotificationResponse(notification_id=10, devices_notified=2)
+
+        processed = dispatcher.run_once()
+
+        assert processed == 2
+        mock_outbox_repository.claim_batch.assert_called_once_with(10, 60.0)
+        assert mock_delivery_service.deliver.call_count == 2
+        job = mock_delivery_service.deliver.call_args_list[0][0][0]
+        assert job.notification_id == 10
+        assert job.user_id == 456
+        assert mock_delivery_service.deliver.call_args_list[0][1] == {"raise_on_failure": True}
+        mock_outbox_repository.mark_done.assert_any_call(entries[0], 2)
+        assert mock_outbox_repository.commit.call_count == 2
+        mock_session.close.assert_called_once()
+
+    def test_run_once_settles_each_entry_before_the_next_delivery(self, dispatcher, mock_outbox_repository,
+                                                                  mock_delivery_service):
+        """Test that no transaction spans several deliveries"""
+        entries = [self._entry(1, 10), self._entry(2, 20)]
+        mock_outbox_repository.claim_batch.return_value = entries
+        calls = []
+        mock_outbox_repository.commit.side_effect = lambda: calls.append("commit")
+
+        def deliver(job, raise_on_failure):
+            calls.append(f"deliver {job.notification_id}")
+            return SendNotificationResponse(notification_id=job.notification_id, devices_notified=1)
+
+        mock_delivery_service.deliver.side_effect = deliver
+
+        dispatcher.run_once()
+
+        assert calls == ["deliver 10", "commit", "deliver 20", "commit"]
+
+    def test_run_once_marks_failed_deliveries(self, dispatcher, mock_outbox_repository, mock_delivery_service):
+        """Test that a delivery error reschedules the entry without aborting the batch"""
+        entries = [self._entry(1, 10), self._entry(2, 20)]
+        mock_outbox_repository.claim_batch.return_value = entries
+        mock_delivery_service.deliver.side_effect = [
+            Exception("User service down"),
+            SendNotificationResponse(notification_id=20, devices_notified=1)
+        ]
+
+        processed = dispatcher.run_once()
+
+        assert processed == 2
+        mock_outbox_repository.mark_failed.assert_called_once_with(entries[0], "User service down", 3, 1.0)
+        mock_outbox_repository.mark_done.assert_called_once_with(entries[1], 1)
+        assert mock_outbox_repository.commit.call_count == 2
+
+    def test_run_once_retries_when_device_lookup_fails(self, mock_session):
+        """Test that an entry whose devices cannot be looked up stays pending instead of being settled"""
+        entry = NotificationOutbox(outbox_id=1, notification_id=10, user_id=456, fcm_title="Title",
+                                   fcm_body="Body", status=OUTBOX_PENDING, attempts=0)
+        dispatcher = OutboxDispatcher(lambda: mock_session, delivery_service=PushDeliveryService(),
+                                      max_attempts=3, retry_delay_seconds=1.0)
+        clear_device_cache()
+
+        with patch.object(OutboxRepository, 'claim_batch', return_value=[entry]), \
+                patch('adapters.http.user_service_adapter._fetch_user_devices', return_value=None), \
+                patch('domain.services.push_delivery_service.send_fcm_multicast') as mock_send_fcm:
+            assert dispatcher.run_once() == 1
+
+        assert entry.status == OUTBOX_PENDING
+        assert entry.attempts == 1
+        assert "456" in entry.last_error
+        assert entry.available_at is not None
+        mock_send_fcm.assert_not_called()
+        mock_session.commit.assert_called_once()
+
+    def test_run_once_with_empty_outbox(self, dispatcher, mock_outbox_repository, mock_delivery_service):
+        """Test that nothing is delivered when the outbox is empty"""
+        mock_outbox_repository.claim_batch.return_value = []
+
+        assert dispatcher.run_once() == 0
+        mock_delivery_service.deliver.assert_not_called()
+
+    def test_run_once_rolls_back_on_commit_error(self, dispatcher, mock_session, mock_outbox_repository, mock_delivery_service):
+        """Test that a failed commit is rolled back and the session closed"""
+        mock_outbox_repository.claim_batch.return_value = [self._entry(1, 10)]
+        mock_delivery_service.deliver.return_value = SendNotificationResponse(notification_id=10, devices_notified=1)
+        mock_outbox_repository.commit.side_effect = Exception("Database error")
+
+        with pytest.raises(Exception, match="Database error"):
+            dispatcher.run_once()
+
+        mock_outbox_repository.rollback.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    def test_start_and_stop(self, dispatcher, mock_outbox_repository):
+        """Test that the dispatcher threads stop when asked"""
+        mock_outbox_repository.claim_batch.return_value = []
+        dispatcher.poll_interval = 0.01
+
+        dispatcher.start()
+        dispatcher.stop(timeout=5)
+
+        assert dispatcher._threads == []
@@ -0,0 +1,165 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, call, patch
+from adapters.http.user_service_adapter import DeviceLookupError
+from domain.services.push_delivery_service import PushDeliveryService, PushDeliveryJob, PushDeliveryError
+
+
+class TestPushDeliveryService:
+    """Test cases for the PushDeliveryService"""
+
+    @pytest.fixture
+    def delivery_service(self):
+        return PushDeliveryService()
+
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id')
+    def test_deliver_without_title_sends_nothing(self, mock_get_devices, mock_send_fcm, delivery_service):
+        """Test that notifications without FCM title/body are not pushed"""
+        mock_get_devices.return_value = [{"fcm_token": "token1"}]
+
+        result = delivery_service.deliver(PushDeliveryJob(notification_id=1, user_id=456))
+
+        assert result.devices_notified == 0
+        mock_send_fcm.assert_not_called()
+
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id')
+    def test_deliver_raises_when_device_lookup_fails(self, mock_get_devices, mock_send_fcm, delivery_service):
+        """Test that a retrying caller sees a failed lookup instead of a user without devices"""
+        mock_get_devices.side_effect = DeviceLookupError("User service down")
+
+        with pytest.raises(DeviceLookupError):
+            delivery_service.deliver(PushDeliveryJob(notification_id=1, user_id=456, fcm_title="T", fcm_body="B"),
+                                     raise_on_failure=True)
+
+        mock_get_devices.assert_called_once_with(456, raise_on_error=True)
+        mock_send_fcm.assert_not_called()
+
+    @patch('domain.services.push_delivery_service.evict_device_tokens')
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id')
+    def test_deliver_raises_when_fcm_is_unavailable(self, mock_get_devices, mock_send_fcm, mock_evict, delivery_service):
+        """Test that a push reaching no device because of an FCM outage is retryable; dead tokens are still evicted"""
+        mock_get_devices.return_value = [{"fcm_token": "a"}, {"fcm_token": "dead"}]
+        mock_send_fcm.return_value = [
+            {"success": False, "token": "a", "error_type": "unknown_error", "error_message": "unavailable"},
+            {"success": False, "token": "dead", "should_delete_token": True, "error_type": "invalid_token"},
+        ]
+        job = PushDeliveryJob(notification_id=1, user_id=7, fcm_title="T", fcm_body="B")
+
+        with pytest.raises(PushDeliveryError, match="unavailable"):
+            delivery_service.deliver(job, raise_on_failure=True)
+        mock_evict.assert_called_once_with(7, ["dead"])
+
+        # Without raise_on_failure the outcome is reported as before
+        assert delivery_service.deliver(job).devices_notified == 0
+
+    @patch('domain.services.push_delivery_service.evict_device_tokens')
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id')
+    def test_deliver_with_only_invalid_tokens_is_final(self, mock_get_devices, mock_send_fcm, mock_evict, delivery_service):
+        """Test that tokens rejected by FCM are not retried"""
+        mock_get_devices.return_value = [{"fcm_token": "dead"}]
+        mock_send_fcm.return_value = [
+            {"success": False, "token": "dead", "should_delete_token": True, "error_type": "invalid_token"},
+        ]
+
+        result = delivery_service.deliver(PushDeliveryJob(notification_id=1, user_id=7, fcm_title="T", fcm_body="B"),
+                                          raise_on_failure=True)
+
+        assert result.devices_notified == 0
+        assert result.invalid_tokens == ["dead"]
+
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_devices_by_user_ids')
+    def test_deliver_bulk_single_multicast_for_all_users(self, mock_get_devices, mock_send_fcm, delivery_service):
+        """Test that every user's devices go out in one deduplicated multicast call"""
+        mock_get_devices.return_value = {
+            1: [{"fcm_token": "a"}, {"fcm_token": "b"}],
+            2: [{"fcm_token": "b"}],
+            3: [],
+        }
+        mock_send_fcm.return_value = [
+            {"success": True, "token": "a"},
+            {"success": False, "token": "b", "should_delete_token": True, "error_type": "invalid_token", "error_message": "bad"},
+        ]
+
+        result = delivery_service.deliver_bulk([1, 2, 3], "Title", "Body")
+
+        mock_send_fcm.assert_called_once_with(["a", "b"], "Title", "Body")
+        mock_get_devices.assert_called_once_with([1, 2, 3])
+        assert result.devices_notified == 1
+        assert result.users_without_devices == 1
+        assert result.invalid_tokens == ["b"]
+        assert result.fcm_errors == [{"token": "b", "error_type": "invalid_token", "error_message": "bad"}]
+
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_devices_by_user_ids')
+    def test_deliver_bulk_without_users(self, mock_get_devices, mock_send_fcm, delivery_service):
+        """Test that an empty user list does no lookups"""
+        result = delivery_service.deliver_bulk([], "Title", "Body")
+
+        assert result.devices_notified == 0
+        mock_get_devices.assert_not_called()
+        mock_send_fcm.assert_not_called()
+
+    @patch('domain.services.push_delivery_service.evict_device_tokens')
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id')
+    def test_deliver_evicts_invalid_tokens(self, mock_get_devices, mock_send_fcm, mock_evict, delivery_service):
+        """Test that tokens FCM rejects are dropped from the cached device list"""
+        mock_get_devices.return_value = [{"fcm_token": "good"}, {"fcm_token": "dead"}]
+        mock_send_fcm.return_value = [
+            {"success": True, "token": "good"},
+            {"success": False, "token": "dead", "should_delete_token": True, "error_type": "invalid_token"},
+        ]
+
+        delivery_service.deliver(PushDeliveryJob(notification_id=1, user_id=7, fcm_title="T", fcm_body="B"))
+
+        mock_evict.assert_called_once_with(7, ["dead"])
+
+    @patch('domain.services.push_delivery_service.evict_device_tokens')
+    @patch('domain.services.push_delivery_service.send_fcm_multicast')
+    @patch('domain.services.push_delivery_service.get_devices_by_user_ids')
+    def test_deliver_bulk_evicts_invalid_tokens_per_user(self, mock_get_devices, mock_send_fcm, mock_evict, delivery_service):
+        mock_get_devices.return_value = {1: [{"fcm_token": "a"}, {"fcm_token": "b"}], 2: [{"fcm_token": "b"}]}
+        mock_send_fcm.return_value = [
+            {"success": True, "token": "a"},
+            {"success": False, "token": "b", "should_delete_token": True, "error_type": "invalid_token"},
+        ]
+
+        delivery_service.deliver_bulk([1, 2], "Title", "Body")
+
+        mock_evict.assert_has_calls([call(1, ["b"]), call(2, ["b"])], any_order=True)
+
+    @patch('domain.services.push_delivery_service.evict_device_tokens')
+    @patch('domain.services.push_delivery_service.send_fcm_multicast_async', new_callable=AsyncMock)
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id_async', new_callable=AsyncMock)
+    def test_deliver_async(self, mock_get_devices, mock_send_fcm, mock_evict, delivery_service):
+        """Test that the async path sends to every device plus the extra token and aggregates like deliver()"""
+        mock_get_devices.return_value = [{"fcm_token": "a"}, {"fcm_token": "b"}]
+        mock_send_fcm.return_value = [
+            {"success": True, "token": "a"},
+            {"success": False, "token": "b", "should_delete_token": True, "error_type": "invalid_token"},
+            {"success": True, "token": "extra"},
+        ]
+
+        result = asyncio.run(delivery_service.deliver_async(
+            PushDeliveryJob(notification_id=1, user_id=7, fcm_title="T", fcm_body="B", fcm_token="extra")
+        ))
+
+        mock_send_fcm.assert_awaited_once_with(["a", "b", "extra"], "T", "B")
+        assert result.devices_notified == 2
+        assert result.invalid_tokens == ["b"]
+        mock_evict.assert_called_once_with(7, ["b"])
+
+    @patch('domain.services.push_delivery_service.send_fcm_multicast_async', new_callable=AsyncMock)
+    @patch('domain.services.push_delivery_service.get_user_devices_by_user_id_async', new_callable=AsyncMock)
+    def test_deliver_async_without_devices(self, mock_get_devices, mock_send_fcm, delivery_service):
+        mock_get_devices.return_value = []
+
+        result = asyncio.run(delivery_service.deliver_async(PushDeliveryJob(notification_id=1, user_id=7, fcm_title="T", fcm_body="B")))
+
+        assert result.devices_notified == 0
+        mock_send_fcm.assert_not_awaited()
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import Mock
+from domain.schemas import SendNotificationResponse
+from domain.services.push_delivery_service import PushDeliveryJob
+from domain.services.push_delivery_worker import (
+    PushDeliveryWorker,
+    DeliveryStatusStore,
+    DELIVERY_QUEUED,
+    DELIVERY_DELIVERED,
+    DELIVERY_FAILED,
+)
+
+
+class TestDeliveryStatusStore:
+    """Test cases for the DeliveryStatusStore"""
+
+    def test_record_and_get(self):
+        """Test that the latest status of a notification is returned"""
+        store = DeliveryStatusStore(max_entries=10)
+        store.record(1, DELIVERY_QUEUED)
+        store.record(1, DELIVERY_DELIVERED, devices_notified=2)
+
+        status = store.get(1)
+
+        assert status["status"] == DELIVERY_DELIVERED
+        assert status["devices_notified"] == 2
+
+    def test_oldest_entries_are_evicted(self):
+        """Test that the store never grows past max_entries"""
+        store = DeliveryStatusStore(max_entries=2)
+        for notification_id in (1, 2, 3):
+            store.record(notification_id, DELIVERY_QUEUED)
+
+        assert store.get(1) is None
+        assert store.get(2) is not None
+        assert store.get(3) is not None
+
+    def test_unknown_notification(self):
+        """Test that unknown notifications have no status"""
+        assert DeliveryStatusStore().get(99) is None
+
+
+class TestPushDeliveryWorker:
+    """Test cases for the PushDeliveryWorker"""
+
+    @pytest.fixture
+    def mock_delivery_service(self):
+        return Mock()
+
+    @pytest.fixture
+    def job(self):
+        return PushDeliveryJob(notification_id=1, user_id=456, fcm_title="Title", fcm_body="Body")
+
+    def test_submit_rejected_when_not_started(self, mock_delivery_service, job):
+        """Test that jobs are refused while the worker is stopped"""
+        worker = PushDeliveryWorker(mock_delivery_service, num_threads=1)
+
+        assert worker.submit(job) is False
+        assert worker.get_status(1) is None
+
+    def test_submit_rejected_when_queue_full(self, mock_delivery_service, job):
+        """Test that a full queue refuses new jobs instead of blocking"""
+        worker = PushDeliveryWorker(mock_delivery_service, max_queue_size=1, num_threads=1)
+        worker._threads = [Mock(is_alive=Mock(return_value=True))]  # Pretend running, nobody consumes
+
+        assert worker.submit(job) is True
+        assert worker.submit(PushDeliveryJob(notification_id=2, user_id=456)) is False
+        assert worker.get_status(1)["status"] == DELIVERY_QUEUED
+        assert worker.get_status(2) is None
+
+    def test_job_finished_before_submit_returns_keeps_final_status(self, mock_delivery_service, job):
+        """Test that a worker finishing the job immediately is not overwritten by the queued status"""
+        mock_delivery_service.deliver.return_value = SendNotificationResponse(notification_id=1, devices_notified=0)
+        worker = PushDeliveryWorker(mock_delivery_service, num_threads=1)
+        worker._threads = [Mock(is_alive=Mock(return_value=True))]
+        # The job is delivered inside put_nowait, as a worker thread could do before submit records anything
+        worker._queue = Mock(put_nowait=Mock(side_effect=worker.process))
+
+        assert worker.submit(job) is True
+        assert worker.get_status(1)["status"] == DELIVERY_DELIVERED
+
+    def test_process_records_delivery_result(self, mock_delivery_service, job):
+        """Test that a processed job stores the delivery outcome"""
+        mock_delivery_service.deliver.return_value = SendNotificationResponse(
+            notification_id=1, devices_notified=1, invalid_tokens=["bad"], fcm_errors=[{"token": "bad"}]
+        )
+        worker = PushDeliveryWorker(mock_delivery_service, num_threads=1)
+
+        worker.process(job)
+
+        status = worker.get_status(1)
+        assert status["status"] == DELIVERY_DELIVERED
+        assert status["devices_notified"] == 1
+        assert status["invalid_tokens"] == ["bad"]
+        mock_delivery_service.deliver.assert_called_once_with(job)
+
+    def test_process_records_failure(self, mock_delivery_service, job):
+        """Test that delivery exceptions are recorded rather than propagated"""
+        mock_delivery_service.deliver.side_effect = Exception("User service down")
+        worker = PushDeliveryWorker(mock_delivery_service, num_threads=1)
+
+        worker.process(job)
+
+        status = worker.get_status(1)
+        assert status["status"] == DELIVERY_FAILED
+        assert status["error"] == "User service down"
+
+    def test_jobs_are_delivered_in_background(self, mock_delivery_service, job):
+        """Test that queued jobs are drained by the worker threads before stop returns"""
+        mock_delivery_service.deliver.return_value = SendNotificationResponse(notification_id=1, devices_notified=1)
+        worker = PushDeliveryWorker(mock_delivery_service, num_threads=2)
+        worker.start()
+        try:
+            assert worker.submit(job) is True
+        finally:
+            worker.stop(timeout=5)
+
+        assert not worker.is_running
+        assert worker.get_status(1)["status"] == DELIVERY_DELIVERED
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+import dataBase
+
+
+class TestEngineFactory:
+    """Test suite for the settings-driven engine factories"""
+
+    def test_sync_engine_uses_pool_settings(self):
+        with patch.object(dataBase, "DB_POOL_SIZE", 20), \
+             patch.object(dataBase, "DB_MAX_OVERFLOW", 5), \
+             patch.object(dataBase, "DB_POOL_TIMEOUT", 3.0), \
+             patch.object(dataBase, "DB_POOL_RECYCLE", 600), \
+             patch.object(dataBase, "DB_STATEMENT_TIMEOUT_MS", 0), \
+             patch("dataBase.create_engine") as mock_create:
+            dataBase.create_db_engine("postgresql://u:p@h:5432/db")
+
+        kwargs = mock_create.call_args.kwargs
+        assert kwargs["pool_size"] == 20
+        assert kwargs["max_overflow"] == 5
+        assert kwargs["pool_timeout"] == 3.0
+        assert kwargs["pool_recycle"] == 600
+        assert kwargs["connect_args"]["application_name"] == dataBase.DB_APPLICATION_NAME
+        assert "options" not in kwargs["connect_args"]
+
+    def test_sync_engine_statement_timeout(self):
+        with patch.object(dataBase, "DB_STATEMENT_TIMEOUT_MS", 5000), \
+             patch("dataBase.create_engine") as mock_create:
+            dataBase.create_db_engine("postgresql://u:p@h:5432/db")
+
+        assert mock_create.call_args.kwargs["connect_args"]["options"] == "-c statement_timeout=5000"
+
+    def test_async_engine_server_settings(self):
+        with patch.object(dataBase, "DB_STATEMENT_TIMEOUT_MS", 5000), \
+             patch("dataBase.create_async_engine") as mock_create:
+            dataBase.create_async_db_engine("postgresql+asyncpg://u:p@h:5432/db")
+
+        server_settings = mock_create.call_args.kwargs["connect_args"]["server_settings"]
+        assert server_settings == {"application_name": dataBase.DB_APPLICATION_NAME, "statement_timeout": "5000"}
+
+    def test_engines_connect_lazily(self):
+        """Test that building the engines does not open a connection"""
+        engine = dataBase.create_db_engine("postgresql://u:p@127.0.0.1:1/db")
+
+        assert engine.pool.checkedout() == 0
+        assert engine.pool.checkedin() == 0
+
+
+class TestPoolWarmUp:
+    """Test suite for the optional connection pool warm-up"""
+
+    def test_warm_up_holds_connections_concurrently(self):
+        """Test that N distinct connections are open at the same time"""
+        engine = MagicMock()
+        open_now = []
+        peak = []
+        lock = threading.Lock()
+
+        class FakeConnection:
+            def __enter__(self):
+                with lock:
+                    open_now.append(1)
+                    peak.append(len(open_now))
+                return self
+
+            def __exit__(self, *args):
+                with lock:
+                    open_now.pop()
+
+            def execute(self, statement):
+                pass
+
+        engine.connect.side_effect = FakeConnection
+        with patch.object(dataBase, "DB_POOL_SIZE", 3):
+            opened = dataBase.warm_up_pool(engine, 3)
+
+        assert opened == 3
+        assert max(peak) == 3
+
+    def test_warm_up_is_capped_by_pool_size(self):
+        engine = MagicMock()
+        with patch.object(dataBase, "DB_POOL_SIZE", 2):
+            assert dataBase.warm_up_pool(engine, 10) == 2
+        assert engine.connect.call_count == 2
+
+    def test_warm_up_failures_are_logged_not_raised(self):
+        engine = MagicMock()
+        engine.connect.side_effect = Exception("connection refused")
+        with patch.object(dataBase, "DB_POOL_SIZE", 2):
+            assert dataBase.warm_up_pool(engine, 2) == 0
+
+    def test_async_warm_up(self):
+        engine = MagicMock()
+        connection = MagicMock()
+
+        async def execute(statement):
+            return None
+
+        connection.execute = execute
+        context = MagicMock()
+
+        async def enter():
+            return connection
+
+        async def exit_(*args):
+            return False
+
+        context.__aenter__ = lambda self: enter()
+        context.__aexit__ = lambda self, *args: exit_(*args)
+        engine.connect.return_value = context
+
+        with patch.object(dataBase, "DB_POOL_SIZE", 3):
+            assert asyncio.run(dataBase.warm_up_async_pool(engine, 3)) == 3
+        assert engine.connect.call_count == 3
+
+    def test_no_warm_up_by_default(self):
+        engine = MagicMock()
+        assert dataBase.warm_up_pool(engine, 0) == 0
+        engine.connect.assert_not_called()
@@ -1,142 +1,105 @@
-from unittest.mock import patch, MagicMock
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
 import pytest
-from datetime import datetime, timezone
 
 # Patch sqlalchemy.create_engine before other project imports
 _patch_create_engine = patch('sqlalchemy.create_engine', return_value=MagicMock())
 _patch_create_engine.start()
 
-from use_cases.get_notifications_use_case import GetNotificationsUseCase
-from domain.services.notification_service import NotificationService
-from domain.schemas import NotificationResponse # For checking response structure
-
-class FaultyType:
-    """Helper class to simulate an attribute access error."""
-    @property
-    def name(self):
-        raise AttributeError("Simulated error")
+from use_cases.get_notifications_use_case import AsyncGetNotificationsUseCase
+from domain.services.async_notification_service import AsyncNotificationService
+from utils.notification_cursor import InvalidCursorError
 
 @pytest.fixture
-def mock_notification_type():
-    mock_type = MagicMock() 
-    mock_type.name = "TestType"
-    return mock_type
+def mock_async_notification_service():
+    service = AsyncMock(spec=AsyncNotificationService)
+    service.authenticate_user.return_value = {'user_id': 1, 'name': 'Test User'}
+    return service
 
-@pytest.fixture
-def mock_notification_state():
-    mock_state = MagicMock() 
-    mock_state.name = "TestState"
-    return mock_state
+# Async endpoint: the feed rows are handed to orjson without the ORM/DTO chain
+@patch('use_cases.get_notifications_use_case.NOTIFICATION_PAGE_DEFAULT_LIMIT', 25)
+@patch('use_cases.get_notifications_use_case.create_native_response')
+def test_async_get_notifications_without_parameters_returns_first_page(mock_create_native_response, mock_async_notification_service):
+    page = {"notifications": [{"notification_id": 1, "message": "Test message 1"}], "next_cursor": "abc"}
+    mock_async_notification_service.get_user_notification_rows_page.return_value = page
 
-@pytest.fixture
-def mock_notification_service():
-    """Create a mock notification service for testing"""
-    return MagicMock(spec=NotificationService)
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token"))
+
+    mock_async_notification_service.get_user_notification_rows_page.assert_awaited_once_with(1, 25, None)
+    mock_create_native_response.assert_called_once_with("success", "Notificaciones obtenidas exitosamente.", page)
+
+@patch('use_cases.get_notifications_use_case.create_native_response')
+def test_async_get_notifications_no_notifications(mock_create_native_response, mock_async_notification_service):
+    page = {"notifications": [], "next_cursor": None}
+    mock_async_notification_service.get_user_notification_rows_page.return_value = page
+
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token"))
+
+    mock_create_native_response.assert_called_once_with("success", "No hay notificaciones para este usuario.", page)
+
+@patch('use_cases.get_notifications_use_case.create_native_response')
+def test_async_get_notifications_paginated(mock_create_native_response, mock_async_notification_service):
+    page = {"notifications": [{"notification_id": 1}], "next_cursor": "abc"}
+    mock_async_notification_service.get_user_notification_rows_page.return_value = page
+
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token", limit=1))
+
+    mock_async_notification_service.get_user_notification_rows_page.assert_awaited_once_with(1, 1, None)
+    mock_create_native_response.assert_called_once_with("success", "Notificaciones obtenidas exitosamente.", page)
 
 # Test for invalid session token
-@patch('domain.services.notification_service.verify_session_token')
 @patch('use_cases.get_notifications_use_case.session_token_invalid_response')
-def test_get_notifications_invalid_token(mock_session_token_invalid_response, mock_verify_session_token, mock_notification_service):
-    mock_notification_service.authenticate_user.return_value = None
+def test_async_get_notifications_invalid_token(mock_session_token_invalid_response, mock_async_notification_service):
+    mock_async_notification_service.authenticate_user.return_value = None
     expected_response = {"status": "error", "message": "Token inválido"}
     mock_session_token_invalid_response.return_value = expected_response
 
-    use_case = GetNotificationsUseCase(mock_notification_service)
-    result = use_case.execute("invalid_token")
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    result = asyncio.run(use_case.execute("invalid_token"))
 
-    mock_notification_service.authenticate_user.assert_called_once_with("invalid_token")
-    mock_session_token_invalid_response.assert_called_once()
+    mock_async_notification_service.authenticate_user.assert_awaited_once_with("invalid_token")
+    mock_async_notification_service.get_user_notification_rows_page.assert_not_called()
     assert result == expected_response
 
-# Test for valid token, user has notifications
-@patch('use_cases.get_notifications_use_case.create_response')
-def test_get_notifications_valid_token_with_notifications(mock_create_response, mock_notification_service, mock_notification_type, mock_notification_state):
-    mock_user = {'user_id': 1, 'name': 'Test User'}
-    mock_notification_service.authenticate_user.return_value = mock_user
-
-    mock_notif1_date = datetime.now(timezone.utc)
-    mock_notification_response = NotificationResponse(
-        notification_id=1,
-        message="Test message 1",
-        notification_date=mock_notif1_date, 
-        invitation_id=101,
-        notification_type="TestType",
-        notification_state="TestState"
-    )
-    
-    mock_notification_service.get_user_notifications.return_value = [mock_notification_response]
-    
-    expected_data = [mock_notification_response.model_dump()]
-    
-    # Consistent with the prompt's example for this test case for create_response call
-    expected_message = "Notificaciones obtenidas exitosamente."
-    expected_response_dict = {"status": "success", "message": expected_message, "data": expected_data}
-    # Set the return value for the mock_create_response
-    mock_create_response.return_value = expected_response_dict
-
-    use_case = GetNotificationsUseCase(mock_notification_service)
-    result = use_case.execute("valid_token")
-
-    mock_notification_service.authenticate_user.assert_called_once_with("valid_token")
-    mock_notification_service.get_user_notifications.assert_called_once_with(1)
-    mock_create_response.assert_called_once_with(
-        "success", 
-        expected_message, 
-        data=expected_data
-    )
-    assert result == expected_response_dict
+# Test for a cursor without limit: the default page size is used
+@patch('use_cases.get_notifications_use_case.NOTIFICATION_PAGE_DEFAULT_LIMIT', 25)
+@patch('use_cases.get_notifications_use_case.create_native_response')
+def test_async_get_notifications_cursor_uses_default_limit(mock_create_native_response, mock_async_notification_service):
+    page = {"notifications": [], "next_cursor": None}
+    mock_async_notification_service.get_user_notification_rows_page.return_value = page
+
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token", cursor="abc"))
 
-# Test for valid token, user has no notifications
+    mock_async_notification_service.get_user_notification_rows_page.assert_awaited_once_with(1, 25, "abc")
+    mock_create_native_response.assert_called_once_with("success", "No hay notificaciones para este usuario.", page)
+
+# Test for an error raised by the service
 @patch('use_cases.get_notifications_use_case.create_response')
-def test_get_notifications_valid_token_no_notifications(mock_create_response, mock_notification_service):
-    mock_user = {'user_id': 1, 'name': 'Test User'}
-    mock_notification_service.authenticate_user.return_value = mock_user
-    mock_notification_service.get_user_notifications.return_value = []
-    
-    # Consistent with the prompt's example for this test case
-    expected_message = "No hay notificaciones para este usuario."
-    # The prompt's example for the final assert had "No hay notificaciones", I'm using the one from create_response call.
-    expected_response_dict = {"status": "success", "message": expected_message, "data": []}
-    mock_create_response.return_value = expected_response_dict
-
-    use_case = GetNotificationsUseCase(mock_notification_service)
-    result = use_case.execute("valid_token")
-
-    mock_notification_service.authenticate_user.assert_called_once_with("valid_token")
-    mock_notification_service.get_user_notifications.assert_called_once_with(1)
-    mock_create_response.assert_called_once_with(
-        "success", 
-        expected_message, 
-        data=[]
-    )
-    assert result == expected_response_dict
+def test_async_get_notifications_service_error(mock_create_response, mock_async_notification_service):
+    mock_async_notification_service.get_user_notification_rows_page.side_effect = Exception("Simulated error")
+
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token"))
+
+    mock_create_response.assert_called_once_with("error", "Simulated error", data=[])
 
-# Test for valid token, serialization error
 @patch('use_cases.get_notifications_use_case.create_response')
-def test_get_notifications_serialization_error(mock_create_response, mock_notification_service):
-    mock_user = {'user_id': 1, 'name': 'Test User'}
-    mock_notification_service.authenticate_user.return_value = mock_user
-
-    # Simulate an exception being raised by the service
-    mock_notification_service.get_user_notifications.side_effect = Exception("Simulated error")
-    
-    # As per prompt's example for assert_called_once_with for this test case
-    expected_message = "Simulated error"
-    expected_response_dict = {"status": "error", "message": expected_message, "data":[]}
-    mock_create_response.return_value = expected_response_dict
-
-    use_case = GetNotificationsUseCase(mock_notification_service)
-    result = use_case.execute("valid_token")
-
-    mock_notification_service.authenticate_user.assert_called_once_with("valid_token")
-    mock_notification_service.get_user_notifications.assert_called_once_with(1)
+def test_async_get_notifications_invalid_cursor(mock_create_response, mock_async_notification_service):
+    mock_async_notification_service.get_user_notification_rows_page.side_effect = InvalidCursorError("Cursor inválido")
+
+    use_case = AsyncGetNotificationsUseCase(mock_async_notification_service)
+    asyncio.run(use_case.execute("valid_token", cursor="bad"))
+
     mock_create_response.assert_called_once_with(
-        "error", 
-        expected_message, 
-        data=[]
+        "error",
+        "Cursor de paginación inválido.",
+        data=[],
+        status_code=400
     )
-    assert result == expected_response_dict
-
 
 
 def teardown_module(module):
@@ -0,0 +1,97 @@
+import pytest
+from utils.circuit_breaker import CircuitBreaker, CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        return CircuitBreaker("test", failure_threshold=3, reset_timeout=10, clock=clock)
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == CIRCUIT_OPEN
+        assert breaker.allow_request() is False
+
+    def test_success_resets_failure_count(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CIRCUIT_CLOSED
+
+    def test_half_open_after_cool_down(self, breaker, clock):
+        """Test that only one trial call goes through once the cool-down has passed"""
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+    def test_trial_success_closes_circuit(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        breaker.allow_request()
+
+        breaker.record_success()
+
+        assert breaker.state == CIRCUIT_CLOSED
+        assert breaker.allow_request() is True
+
+    def test_trial_failure_reopens_circuit(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CIRCUIT_OPEN
+        assert breaker.snapshot()["retry_in_seconds"] == 10
+
+    def test_snapshot_counts_rejected_calls(self, breaker):
+        for _ in range(3):
+            breaker.record_failure()
+        breaker.allow_request()
+        breaker.allow_request()
+
+        snapshot = breaker.snapshot()
+
+        assert snapshot["name"] == "test"
+        assert snapshot["state"] == CIRCUIT_OPEN
+        assert snapshot["consecutive_failures"] == 3
+        assert snapshot["rejected_calls"] == 2
+
+    def test_reset(self, breaker):
+        for _ in range(3):
+            breaker.record_failure()
+
+        breaker.reset()
+
+        assert breaker.state == CIRCUIT_CLOSED
+        assert breaker.snapshot()["rejected_calls"] == 0
@@ -0,0 +1,26 @@
+import json
+from datetime import datetime, timezone
+from utils.ndjson import encode_ndjson
+
+
+class TestEncodeNdjson:
+    """Test suite for the NDJSON encoder used by streaming exports"""
+
+    def test_one_object_per_line(self):
+        rows = [
+            {"notification_id": 1, "message": "Hola", "notification_date": datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)},
+            {"notification_id": 2, "message": None, "notification_date": datetime(2024, 6, 2, 12, 0, tzinfo=timezone.utc)},
+        ]
+
+        lines = encode_ndjson(rows).decode("utf-8").splitlines()
+
+        assert [json.loads(line) for line in lines] == [
+            {"notification_id": 1, "message": "Hola", "notification_date": "2024-06-01T12:00:00+00:00"},
+            {"notification_id": 2, "message": None, "notification_date": "2024-06-02T12:00:00+00:00"},
+        ]
+
+    def test_every_line_is_terminated(self):
+        assert encode_ndjson([{"a": 1}]) == b'{"a":1}\n'
+
+    def test_empty_batch(self):
+        assert encode_ndjson([]) == b""
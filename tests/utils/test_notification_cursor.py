@@ -0,0 +1,29 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from utils.notification_cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestNotificationCursor:
+    """Test suite for the opaque keyset cursor of the notification feed"""
+
+    def test_round_trip_keeps_timezone_and_microseconds(self):
+        date = datetime(2024, 6, 1, 7, 34, 56, 789123, tzinfo=timezone(timedelta(hours=-5)))
+
+        assert decode_cursor(encode_cursor(date, 42)) == (date, 42)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2024, 6, 1, tzinfo=timezone.utc), 1)
+
+        assert "=" not in cursor
+        assert "+" not in cursor and "/" not in cursor
+
+    @pytest.mark.parametrize("cursor", [
+        "not-a-cursor",
+        "",
+        encode_cursor(datetime(2024, 6, 1, tzinfo=timezone.utc), 1)[:-3],
+        "WyJ4IiwxXQ",  # ["x",1]
+        "WyIyMDI0LTA2LTAxIiwiMSJd",  # ["2024-06-01","1"]
+    ])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
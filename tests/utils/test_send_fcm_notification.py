@@ -1,11 +1,12 @@
 import pytest
+import asyncio
 import os
 import logging
 from unittest.mock import Mock, patch, MagicMock
 from firebase_admin import messaging, exceptions
 from firebase_admin._messaging_utils import SenderIdMismatchError
 
-from utils.send_fcm_notification import send_fcm_notification
+from utils.send_fcm_notification import send_fcm_notification, send_fcm_multicast, send_fcm_multicast_async, FCM_MULTICAST_LIMIT
 
 
 class TestSendFCMNotification:
@@ -286,6 +287,140 @@ class TestSendFCMNotification:
                 assert "Firebase Admin SDK not initialized" in caplog.text
 
 
+
+class TestSendFCMMulticast:
+    """Test suite for the send_fcm_multicast function."""
+
+    @pytest.fixture
+    def mock_firebase_app(self):
+        """Mock Firebase app initialization."""
+        with patch('utils.send_fcm_notification.firebase_admin._apps', [Mock()]):
+            yield
+
+    @staticmethod
+    def _batch_response(send_responses):
+        """Build a fake BatchResponse from a list of SendResponse-like mocks."""
+        batch = Mock()
+        batch.responses = send_responses
+        batch.success_count = sum(1 for r in send_responses if r.success)
+        batch.failure_count = len(send_responses) - batch.success_count
+        return batch
+
+    @staticmethod
+    def _send_response(success=True, message_id=None, exception=None):
+        response = Mock()
+        response.success = success
+        response.message_id = message_id
+        response.exception = exception
+        return response
+
+    def test_empty_token_list(self, mock_firebase_app):
+        """Test that no request is made when there are no tokens."""
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            assert send_fcm_multicast([], "Title", "Body") == []
+            mock_send.assert_not_called()
+
+    def test_successful_multicast(self, mock_firebase_app):
+        """Test that every token gets a success result in input order."""
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            mock_send.return_value = self._batch_response([
+                self._send_response(message_id="id-1"),
+                self._send_response(message_id="id-2"),
+            ])
+
+            results = send_fcm_multicast(["token1", "token2"], "Title", "Body")
+
+            mock_send.assert_called_once()
+            message = mock_send.call_args[0][0]
+            assert message.tokens == ["token1", "token2"]
+            assert message.notification.title == "Title"
+            assert message.notification.body == "Body"
+            assert [r["token"] for r in results] == ["token1", "token2"]
+            assert all(r["success"] for r in results)
+            assert results[1]["message_id"] == "id-2"
+
+    def test_tokens_are_chunked_by_fcm_limit(self, mock_firebase_app):
+        """Test that one request is made per FCM_MULTICAST_LIMIT tokens."""
+        tokens = [f"token{i}" for i in range(FCM_MULTICAST_LIMIT + 3)]
+
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            mock_send.side_effect = lambda message: self._batch_response(
+                [self._send_response(message_id="id") for _ in message.tokens]
+            )
+
+            results = send_fcm_multicast(tokens, "Title", "Body")
+
+            assert mock_send.call_count == 2
+            assert len(mock_send.call_args_list[0][0][0].tokens) == FCM_MULTICAST_LIMIT
+            assert len(mock_send.call_args_list[1][0][0].tokens) == 3
+            assert len(results) == len(tokens)
+
+    @pytest.mark.parametrize("error,error_type,should_delete", [
+        (SenderIdMismatchError("mismatch", None), "sender_id_mismatch", True),
+        (messaging.UnregisteredError("unregistered"), "unregistered_token", True),
+        (exceptions.InvalidArgumentError("invalid"), "invalid_token", True),
+        (exceptions.UnauthenticatedError("unauthenticated"), "authentication_error", False),
+        (exceptions.UnavailableError("unavailable"), "unknown_error", False),
+    ])
+    def test_per_token_errors_are_mapped(self, mock_firebase_app, error, error_type, should_delete):
+        """Test that per-token failures keep the send_fcm_notification result shape."""
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            mock_send.return_value = self._batch_response([
+                self._send_response(message_id="id-1"),
+                self._send_response(success=False, exception=error),
+            ])
+
+            results = send_fcm_multicast(["good", "bad"], "Title", "Body")
+
+            assert results[0]["success"] is True
+            assert results[1]["success"] is False
+            assert results[1]["token"] == "bad"
+            assert results[1]["error_type"] == error_type
+            assert results[1].get("should_delete_token", False) is should_delete
+
+    def test_whole_batch_failure(self, mock_firebase_app):
+        """Test that a failed multicast request marks every token in the chunk as failed."""
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            mock_send.side_effect = Exception("Network down")
+
+            results = send_fcm_multicast(["token1", "token2"], "Title", "Body")
+
+            assert len(results) == 2
+            assert all(r["success"] is False for r in results)
+            assert all(r["error_type"] == "unknown_error" for r in results)
+            assert results[0]["error_message"] == "Network down"
+
+    def test_firebase_not_initialized(self):
+        """Test handling when Firebase is not initialized."""
+        with patch('utils.send_fcm_notification.firebase_admin._apps', []), \
+             patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            results = send_fcm_multicast(["token1"], "Title", "Body")
+
+            mock_send.assert_not_called()
+            assert results[0]["success"] is False
+            assert results[0]["error_type"] == "firebase_not_initialized"
+
+    def test_async_multicast_keeps_token_order(self, mock_firebase_app):
+        """Test that the async variant sends every chunk and returns results in input order."""
+        tokens = [f"token{i}" for i in range(FCM_MULTICAST_LIMIT + 3)]
+
+        with patch('utils.send_fcm_notification.messaging.send_each_for_multicast') as mock_send:
+            mock_send.side_effect = lambda message: self._batch_response(
+                [self._send_response(message_id=token) for token in message.tokens]
+            )
+
+            results = asyncio.run(send_fcm_multicast_async(tokens, "Title", "Body"))
+
+            assert mock_send.call_count == 2
+            assert [r["token"] for r in results] == tokens
+            assert [r["message_id"] for r in results] == tokens
+
+    def test_async_multicast_firebase_not_initialized(self):
+        with patch('utils.send_fcm_notification.firebase_admin._apps', []):
+            results = asyncio.run(send_fcm_multicast_async(["token1"], "Title", "Body"))
+
+            assert results[0]["error_type"] == "firebase_not_initialized"
+
 class TestFirebaseInitialization:
     """Test suite for Firebase app initialization."""
 
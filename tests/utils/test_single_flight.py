@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from utils.single_flight import SingleFlight, AsyncSingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            release.wait(5)
+            return {"user_id": 1}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "key", slow_fetch) for _ in range(5)]
+            # Wait until every follower is parked on the leader's call
+            while not flight._calls or flight._calls["key"].waiters < 4:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.in_flight() == 0
+
+    def test_errors_are_shared_with_waiters(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing_fetch():
+            release.wait(5)
+            raise RuntimeError("user service down")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(flight.do, "key", failing_fetch) for _ in range(2)]
+            while not flight._calls or flight._calls["key"].waiters < 1:
+                time.sleep(0.001)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError, match="user service down"):
+                    future.result(timeout=5)
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight()
+        counter = iter(range(10))
+
+        assert flight.do("key", lambda: next(counter)) == 0
+        assert flight.do("key", lambda: next(counter)) == 1
+
+    def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+
+        assert flight.do("a", lambda: "A") == "A"
+        assert flight.do("b", lambda: "B") == "B"
+
+
+class TestAsyncSingleFlight:
+    """Test suite for AsyncSingleFlight"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow_fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"user_id": 1}
+
+        async def run():
+            results = await asyncio.gather(*(flight.do("key", slow_fetch) for _ in range(5)))
+            return results, flight.in_flight()
+
+        results, in_flight = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert in_flight == 0
+
+    def test_errors_are_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def failing_fetch():
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", failing_fetch) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Test that cancelling the first caller leaves the call running for the others"""
+        flight = AsyncSingleFlight()
+
+        async def slow_fetch():
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            first = asyncio.create_task(flight.do("key", slow_fetch))
+            second = asyncio.create_task(flight.do("key", slow_fetch))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == "value"
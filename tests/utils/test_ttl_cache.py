@@ -0,0 +1,87 @@
+import pytest
+from utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test suite for TTLCache"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_get_and_set(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert "a" in cache
+        assert cache.get("missing", "default") == "default"
+
+    def test_entries_expire(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=30)
+
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" becomes the least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_replace_keeps_expiry(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 5
+        assert cache.replace("a", 2) is True
+        assert cache.get("a") == 2
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.replace("a", 3) is False
+
+    def test_stale_entries_outlive_ttl(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock, stale_ttl=20)
+        cache.set("a", 1)
+
+        clock.now = 15
+        assert cache.get("a") is None
+        assert cache.get_stale("a") == 1
+        clock.now = 30
+        assert cache.get_stale("a") is None
+        assert len(cache) == 0
+
+    def test_delete_and_clear(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.delete("a") is True
+        assert cache.delete("a") is False
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_zero_size_cache_stores_nothing(self, clock):
+        cache = TTLCache(maxsize=0, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
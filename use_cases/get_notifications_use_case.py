@@ -1,34 +1,43 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
-from domain.services.notification_service import NotificationService
-from utils.response import create_response, session_token_invalid_response
+from domain.services.async_notification_service import AsyncNotificationService
+from utils.response import create_response, create_native_response, session_token_invalid_response
+from utils.notification_cursor import InvalidCursorError, NOTIFICATION_PAGE_DEFAULT_LIMIT
 
 logger = logging.getLogger(__name__)
 
 
-class GetNotificationsUseCase:
-    """Use case for getting user notifications"""
+def feed_response(data: Any, empty: bool) -> Dict[str, Any]:
+    """Response for rows of the read-optimized feed, which orjson serializes without conversion"""
+    if empty:
+        return create_native_response("success", "No hay notificaciones para este usuario.", data)
+    return create_native_response("success", "Notificaciones obtenidas exitosamente.", data)
+
+
+def invalid_cursor_response() -> Dict[str, Any]:
+    return create_response("error", "Cursor de paginación inválido.", data=[], status_code=400)
+
+
+class AsyncGetNotificationsUseCase:
+    """Use case for getting user notifications from an async endpoint"""
     
-    def __init__(self, notification_service: NotificationService):
+    def __init__(self, notification_service: AsyncNotificationService):
         self.notification_service = notification_service
     
-    def execute(self, session_token: str) -> Dict[str, Any]:
+    async def execute(self, session_token: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Execute the get notifications use case"""
-        # Authenticate user
-        user = self.notification_service.authenticate_user(session_token)
+        user = await self.notification_service.authenticate_user(session_token)
         if not user:
             return session_token_invalid_response()
         
         try:
-            # Get user notifications
-            notification_responses = self.notification_service.get_user_notifications(user['user_id'])
-            
-            if not notification_responses:
-                return create_response("success", "No hay notificaciones para este usuario.", data=[])
-            
-            # Convert to dict format for response
-            notification_responses_dict = [n.model_dump() for n in notification_responses]
-            return create_response("success", "Notificaciones obtenidas exitosamente.", data=notification_responses_dict)
+            # Always one bounded page; rows are projected straight to dicts, with no ORM objects, entities or DTOs
+            page = await self.notification_service.get_user_notification_rows_page(
+                user['user_id'], limit or NOTIFICATION_PAGE_DEFAULT_LIMIT, cursor
+            )
+            return feed_response(page, empty=not page["notifications"])
             
+        except InvalidCursorError:
+            return invalid_cursor_response()
         except Exception as e:
-            return create_response("error", str(e), data=[])
\ No newline at end of file
+            return create_response("error", str(e), data=[])
@@ -0,0 +1,131 @@
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Estados del circuito
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for calls to a remote dependency.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    rejected without touching the network. Once `reset_timeout` seconds have passed it
+    goes half-open and lets up to `half_open_max_calls` trial calls through: a success
+    closes the circuit again, a failure reopens it for another cool-down period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name (str): Nombre de la dependencia protegida (para logs y monitoreo).
+            failure_threshold (int): Fallos consecutivos que abren el circuito.
+            reset_timeout (float): Segundos que el circuito permanece abierto.
+            half_open_max_calls (int): Llamadas de prueba simultáneas en estado semiabierto.
+            clock (Callable[[], float]): Reloj monotónico (inyectable en pruebas).
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+        self._rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """Move an open circuit to half-open once its cool-down has elapsed (lock held)"""
+        if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = CIRCUIT_HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuito '{self.name}' semiabierto: se permiten llamadas de prueba")
+        return self._state
+
+    def _open(self) -> None:
+        self._state = CIRCUIT_OPEN
+        self._opened_at = self._clock()
+        self._half_open_calls = 0
+        logger.warning(
+            f"Circuito '{self.name}' abierto tras {self._consecutive_failures} fallos consecutivos; "
+            f"se rechazarán llamadas durante {self.reset_timeout}s"
+        )
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go through now. Rejected calls are counted."""
+        with self._lock:
+            state = self._current_state()
+            if state == CIRCUIT_CLOSED:
+                return True
+            if state == CIRCUIT_HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self._rejected_calls += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CIRCUIT_CLOSED:
+                logger.info(f"Circuito '{self.name}' cerrado: la dependencia respondió de nuevo")
+            self._state = CIRCUIT_CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == CIRCUIT_HALF_OPEN or (state == CIRCUIT_CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._open()
+
+    def reset(self) -> None:
+        """Close the circuit and forget every failure"""
+        with self._lock:
+            self._state = CIRCUIT_CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_calls = 0
+            self._rejected_calls = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters, for monitoring"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == CIRCUIT_OPEN:
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "retry_in_seconds": retry_in,
+                "rejected_calls": self._rejected_calls,
+            }
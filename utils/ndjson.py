@@ -0,0 +1,18 @@
+from typing import Any, Dict, Iterable
+import orjson
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_ndjson(rows: Iterable[Dict[str, Any]]) -> bytes:
+    """
+    Serializa filas como JSON delimitado por saltos de línea (un objeto por línea).
+    orjson escribe las fechas en formato ISO 8601.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): Filas a serializar.
+
+    Returns:
+        bytes: Las filas codificadas, cada una terminada en salto de línea.
+    """
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Tuple
+import base64
+import binascii
+import json
+import os
+
+# Tamaño de página por defecto y máximo del feed de notificaciones
+NOTIFICATION_PAGE_DEFAULT_LIMIT = int(os.getenv("NOTIFICATION_PAGE_DEFAULT_LIMIT", "50"))
+NOTIFICATION_PAGE_MAX_LIMIT = int(os.getenv("NOTIFICATION_PAGE_MAX_LIMIT", "200"))
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+    pass
+
+
+def encode_cursor(notification_date: datetime, notification_id: int) -> str:
+    """
+    Codifica la posición (notification_date, notification_id) de la última
+    notificación de una página como un cursor opaco y seguro para URLs.
+    """
+    raw = json.dumps([notification_date.isoformat(), notification_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        notification_date, notification_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(notification_id, int) or isinstance(notification_id, bool):
+            raise ValueError("notification_id inválido")
+        return datetime.fromisoformat(notification_date), notification_id
+    except (ValueError, TypeError, UnicodeError, binascii.Error) as e:
+        raise InvalidCursorError(f"Cursor inválido: {cursor}") from e
@@ -78,6 +78,31 @@ def create_response(
     )
 
 
+def create_native_response(
+    status: str,
+    message: str,
+    data: Any,
+    status_code: int = 200
+) -> ORJSONResponse:
+    """
+    Igual que create_response, pero entrega `data` a orjson sin recorrerlo con
+    process_data_for_json. Solo para datos con tipos que orjson serializa de forma
+    nativa (dict, list, str, int, float, bool, None, datetime), como las filas
+    proyectadas directamente desde la base de datos.
+
+    Returns:
+        ORJSONResponse: Respuesta con el mismo formato que create_response.
+    """
+    return ORJSONResponse(
+        status_code=status_code,
+        content={
+            "status": status,
+            "message": message,
+            "data": data
+        }
+    )
+
+
 def session_token_invalid_response() -> ORJSONResponse:
     """
     Crea una respuesta para cuando el token de sesión es inválido.
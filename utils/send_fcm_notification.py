@@ -1,5 +1,7 @@
 import os
+import asyncio
 import logging
+from typing import List
 import firebase_admin
 from firebase_admin import credentials, messaging, exceptions
 from firebase_admin._messaging_utils import SenderIdMismatchError
@@ -98,3 +100,130 @@ def send_fcm_notification(fcm_token: str, title: str, body: str):
         result["error_type"] = "unknown_error"
         result["error_message"] = str(e)
         return result
+
+# Máximo de tokens aceptados por FCM en una sola solicitud multicast
+FCM_MULTICAST_LIMIT = 500
+
+def _build_error_result(fcm_token: str, error: Exception) -> dict:
+    """
+    Traduce la excepción de un envío individual al mismo formato de resultado
+    que retorna send_fcm_notification.
+    """
+    result = {
+        "success": False,
+        "token": fcm_token,
+        "error_type": "unknown_error",
+        "error_message": str(error)
+    }
+    if isinstance(error, SenderIdMismatchError):
+        result["error_type"] = "sender_id_mismatch"
+        result["should_delete_token"] = True
+    elif isinstance(error, messaging.UnregisteredError):
+        result["error_type"] = "unregistered_token"
+        result["should_delete_token"] = True
+    elif isinstance(error, exceptions.InvalidArgumentError):
+        result["error_type"] = "invalid_token"
+        result["should_delete_token"] = True
+    elif isinstance(error, exceptions.UnauthenticatedError):
+        result["error_type"] = "authentication_error"
+    return result
+
+def _firebase_not_initialized_results(fcm_tokens: List[str]) -> List[dict]:
+    logger.error("Firebase Admin SDK not initialized. Cannot send notification.")
+    return [
+        {
+            "success": False,
+            "token": token,
+            "error_type": "firebase_not_initialized",
+            "error_message": "Firebase Admin SDK not initialized. Service account key may be missing."
+        }
+        for token in fcm_tokens
+    ]
+
+def _send_multicast_chunk(chunk: List[str], title: str, body: str) -> List[dict]:
+    """Envía un bloque de hasta FCM_MULTICAST_LIMIT tokens en una sola solicitud multicast"""
+    message = messaging.MulticastMessage(
+        notification=messaging.Notification(title=title, body=body),
+        tokens=chunk,
+    )
+    try:
+        batch_response = messaging.send_each_for_multicast(message)
+    except Exception as e:
+        # Falla el bloque completo (credenciales, red, etc.)
+        logger.exception("Error inesperado enviando notificación multicast: %s", e)
+        return [_build_error_result(token, e) for token in chunk]
+
+    logger.info(
+        "Notificación multicast enviada: %s exitosas, %s fallidas",
+        batch_response.success_count, batch_response.failure_count
+    )
+    results = []
+    for token, send_response in zip(chunk, batch_response.responses):
+        if send_response.success:
+            results.append({
+                "success": True,
+                "token": token,
+                "error_type": None,
+                "error_message": None,
+                "message_id": send_response.message_id
+            })
+        else:
+            logger.error("Error enviando notificación al token %s: %s", token, send_response.exception)
+            results.append(_build_error_result(token, send_response.exception))
+    return results
+
+def _chunk_tokens(fcm_tokens: List[str]) -> List[List[str]]:
+    return [fcm_tokens[start:start + FCM_MULTICAST_LIMIT] for start in range(0, len(fcm_tokens), FCM_MULTICAST_LIMIT)]
+
+def send_fcm_multicast(fcm_tokens: List[str], title: str, body: str) -> List[dict]:
+    """
+    Envía la misma notificación a varios dispositivos usando FCM multicast.
+
+    Los tokens se agrupan en bloques de hasta FCM_MULTICAST_LIMIT, de modo que
+    cada bloque cuesta una sola solicitud HTTPS a FCM.
+
+    Args:
+        fcm_tokens (List[str]): Tokens de registro FCM de los dispositivos destino.
+        title (str): El título de la notificación.
+        body (str): El cuerpo del mensaje de la notificación.
+
+    Returns:
+        List[dict]: Un resultado por token, en el mismo orden de entrada y con el
+        mismo formato que send_fcm_notification. A diferencia de esta, los tokens
+        de otro proyecto no lanzan SenderIdMismatchError: se reportan con
+        should_delete_token.
+    """
+    if not fcm_tokens:
+        return []
+
+    if not firebase_admin._apps:
+        return _firebase_not_initialized_results(fcm_tokens)
+
+    results = []
+    for chunk in _chunk_tokens(fcm_tokens):
+        results.extend(_send_multicast_chunk(chunk, title, body))
+    return results
+
+async def send_fcm_multicast_async(fcm_tokens: List[str], title: str, body: str) -> List[dict]:
+    """
+    Versión asíncrona de send_fcm_multicast para el camino async de las solicitudes.
+
+    firebase-admin no ofrece una API asyncio, así que cada bloque multicast se envía
+    en un hilo con asyncio.to_thread y los bloques se envían a la vez. Dentro de un
+    bloque, send_each_for_multicast ya envía a los dispositivos de forma concurrente.
+    El bucle de eventos queda libre mientras FCM responde.
+
+    Returns:
+        List[dict]: Un resultado por token, en el mismo orden y formato que send_fcm_multicast.
+    """
+    if not fcm_tokens:
+        return []
+
+    if not firebase_admin._apps:
+        return _firebase_not_initialized_results(fcm_tokens)
+
+    chunk_results = await asyncio.gather(*(
+        asyncio.to_thread(_send_multicast_chunk, chunk, title, body)
+        for chunk in _chunk_tokens(fcm_tokens)
+    ))
+    return [result for results in chunk_results for result in results]
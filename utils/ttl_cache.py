@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+import threading
+import time
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe in-process cache bounded by size (LRU eviction) and by age (TTL).
+
+    Expired entries are dropped lazily when they are read or when the cache needs room.
+    With `stale_ttl` they are kept that much longer so get_stale() can still return
+    them, e.g. to keep serving while the source of truth is unreachable.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic, stale_ttl: float = 0.0):
+        """
+        Args:
+            maxsize (int): Máximo de entradas; al superarlo se descarta la menos usada.
+            ttl (float): Segundos de vida por defecto de cada entrada.
+            clock (Callable[[], float]): Reloj monotónico (inyectable en pruebas).
+            stale_ttl (float): Segundos que una entrada vencida sigue disponible para get_stale().
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value, or `default` if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            now = self._clock()
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def get_stale(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value even if expired, as long as it is within `stale_ttl`"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at + self.stale_ttl <= self._clock():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries when full"""
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def replace(self, key: Hashable, value: V) -> bool:
+        """Replace a live entry keeping its expiry. Returns False if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= self._clock():
+                return False
+            self._entries[key] = (entry[0], value)
+            return True
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove an entry. Returns True if it was cached."""
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)